@@ -8,6 +8,7 @@ from swarms.utils.graph import Graph, GraphACC
 from joblib import Parallel, delayed
 from swarms.utils.results import SimulationResults
 from swarms.utils.jsonhandler import JsonPhenotypeData
+from swarms.lib.model import Sampler, Replicates
 # Global variables for width and height
 width = 100
 height = 100
@@ -165,15 +166,13 @@ def simulate_res2(env, iteration, prob=0.5):
     graph.gen_plot()
 
 
-def simulate(env, iteration, N=150):
-    """Test the performane of evolved behavior."""
-    # phenotype = agent.individual[0].phenotype
-    # phenotypes = extract_phenotype(agents)
+def build_simulation(env, iteration, N=150, seed=None):
+    """Create the simulation of the evolved behavior."""
     phenotypes = env[0]
-    threshold = 1.0
 
     sim = SimModel(
-        N, 100, 100, 10, iter=iteration, xmlstrings=phenotypes, pname=env[1])
+        N, 100, 100, 10, iter=iteration, xmlstrings=phenotypes, pname=env[1],
+        seed=seed)
     sim.build_environment_from_json()
 
     # for all agents store the information about hub
@@ -188,22 +187,32 @@ def simulate(env, iteration, N=150):
 
     simresults.save_phenotype()
     simresults.save_to_file()
+    return sim
 
-    # Iterate and execute each step in the environment
-    for i in range(iteration):
+
+def foraging_results(sim):
+    """Get the sampler storing the results of every step."""
+    def foraging(sim):
         # For every iteration we need to store the results
         # Save them into db or a file
-        sim.step()
         value = sim.food_in_hub()
         foraging_percent = (
             value * 100.0) / (sim.num_agents * 1.0)
 
         simresults = SimulationResults(
             sim.pname, sim.connect, sim.sn, sim.stepcnt, foraging_percent,
-            phenotypes[0]
+            sim.xmlstrings[0]
             )
 
         simresults.save_to_file()
+        return foraging_percent
+    return Sampler(foraging)
+
+
+def finish_simulation(sim, threshold=1.0):
+    """Store the outcome of the simulation and plot it."""
+    value = sim.food_in_hub()
+    foraging_percent = (value * 100.0) / (sim.num_agents * 1.0)
 
     # print ('food at site', len(sim.food_in_loc(sim.site.location)))
     # print ('food at hub', len(sim.food_in_loc(sim.hub.location)))
@@ -228,6 +237,27 @@ def simulate(env, iteration, N=150):
     graph.gen_plot()
 
 
+def simulate(env, iteration, N=150):
+    """Test the performane of evolved behavior."""
+    # phenotype = agent.individual[0].phenotype
+    # phenotypes = extract_phenotype(agents)
+    sim = build_simulation(env, iteration, N)
+
+    # Iterate and execute each step in the environment
+    sim.run(iteration, [foraging_results(sim)])
+    finish_simulation(sim)
+
+
+def simulate_replicates(env, iteration, replicates=16, N=150, workers=16):
+    """Test the evolved behavior in replicates built once and forked."""
+    batch = Replicates(
+        lambda seed: build_simulation(env, iteration, N, seed), replicates,
+        workers=workers)
+    batch.run(iteration, lambda sim: ([foraging_results(sim)], []))
+    for sim in batch.models:
+        finish_simulation(sim)
+
+
 def evolve(iteration):
     """Learning Algorithm block."""
     # iteration = 10000
@@ -293,8 +323,7 @@ def main(iter):
                 # env = (env.phenotypes, env.pname)
                 # aname = pname + '/' + str(N)
                 # env = (phenotypes, pname)
-                Parallel(n_jobs=16)(delayed(simulate)(
-                    env, i, 150) for i in steps)
+                simulate_replicates(env, 5000, 16, 150)
                 # Run over different probability
                 for p in [0.5, 0.6, 0.7, 0.8, 0.9, 0.99]:
                     Parallel(n_jobs=16)(delayed(
@@ -111,6 +111,12 @@ class SimModel(Model):
         #    self.grid.add_object_to_grid(f.location, f)
             # print (i,x,y)
 
+    def restore(self):
+        """Connect to the database again after the model is unpickled."""
+        connect = Connect('swarm', 'swarm', 'swarm', 'localhost')
+        self.connect = connect.tns_connect()
+        self.experiment.connect = self.connect
+
     def create_environment_object(self, jsondata, obj):
         """Create env from jsondata."""
         name = obj.__name__.lower()
@@ -5,6 +5,7 @@ from swarms.utils.jsonhandler import JsonPhenotypeData
 from swarms.utils.graph import Graph, GraphACC  # noqa : F401
 from joblib import Parallel, delayed    # noqa : F401
 from swarms.utils.results import SimulationResults
+from swarms.lib.model import Sampler
 # import py_trees
 # Global variables for width and height
 width = 200
@@ -14,14 +15,15 @@ UI = False
 
 
 def validation_loop(
-        phenotypes, iteration, parentname=None, ratio=1, threshold=10.0):
+        phenotypes, iteration, parentname=None, ratio=1, threshold=10.0,
+        world=None):
     """Validate the evolved behaviors."""
     # Create a validation environment instance
     # print('len of phenotype', len(set(phenotypes)))
     valid = ValidationModel(
         100, width, height, 10, iter=iteration, parent=parentname, ratio=ratio)
     # Build the environment
-    valid.build_environment_from_json()
+    valid.build_environment_from_json(world)
     # Create the agents in the environment from the sampled behaviors
     valid.create_agents(phenotypes=phenotypes)
     # print('total food units', valid.total_food_units)
@@ -29,14 +31,19 @@ def validation_loop(
     # py_trees.display.print_ascii_tree(valid.agents[1].bt.behaviour_tree.root)
     # py_trees.logging.level = py_trees.logging.Level.DEBUG
 
-    for i in range(iteration):
-        valid.step()
-        # print ([agent.location for agent in valid.agents])
+    def foraging(valid):
+        # Save the result of the step and sample the foraging percent
+        percent = valid.foraging_percent()
         validresults = SimulationResults(
             valid.pname, valid.connect, valid.sn, valid.stepcnt,
-            valid.foraging_percent(), phenotypes[0]
+            percent, phenotypes[0]
         )
         validresults.save_to_file()
+        return percent
+
+    # Stop as soon as all the food is in the hub
+    foraging = Sampler(foraging)
+    i = valid.run(iteration, [foraging], [foraging.reaches(100)]) - 1
 
     # print('food in the hub', valid.agents[0].get_food_in_hub(False))
     # Save the phenotype to json file
@@ -53,6 +60,12 @@ def validation_loop(
         return False
 
 
+def forked_validation(env, phenotypes, iteration, parentname):
+    """Validate the behaviors in the world of a forked evolution model."""
+    return validation_loop(
+        phenotypes, iteration, parentname=parentname, world=env)
+
+
 def test_loop(phenotypes, parentname=None, ratio=1, iteration=5000):
     """Test the phenotypes in a completely different environment."""
     # Create a validation environment instance
@@ -73,46 +86,69 @@ def test_loop(phenotypes, parentname=None, ratio=1, iteration=5000):
     testresults.save_to_file()
     # Save the phenotype of json file
     phenotype_to_json(test.pname, test.runid, phenotypes)
-    # Execute the BT in the environment
-    for i in range(iteration):
-        test.step()
 
+    def foraging(test):
+        # Save the result of the step and sample the foraging percent
+        percent = test.foraging_percent()
         testresults = SimulationResults(
             test.pname, test.connect, test.sn, test.stepcnt,
-            test.foraging_percent(), phenotypes[0]
+            percent, phenotypes[0]
         )
         testresults.save_to_file()
+        return percent
+
+    # Execute the BT in the environment until all the food is in the hub
+    foraging = Sampler(foraging)
+    test.run(iteration, [foraging], [foraging.reaches(100)])
 
     # Plot the result in the graph
     graph = GraphACC(test.pname, 'simulation.csv')
     graph.gen_plot()
 
 
-def learning_phase(iteration, early_stop=False):
-    """Learning Algorithm block."""
-    # Evolution environment
-    env = EvolveModel(100, width, height, 10, iter=iteration)
-    env.build_environment_from_json()
-    env.create_agents()
+def learning_phase(iteration, early_stop=False, resume=None):
+    """Learning Algorithm block.
+
+    A checkpoint of the evolution is written to checkpoint.gz in the
+    result folder every checkpoint_step steps. Give its path as resume to
+    continue the evolution from there.
+    """
+    if resume is None:
+        # Evolution environment
+        env = EvolveModel(100, width, height, 10, iter=iteration)
+        env.build_environment_from_json()
+        env.create_agents()
+    else:
+        env = EvolveModel.load_checkpoint(resume)
     # Validation Step parameter
     # Run the validation test every these many steps
     validation_step = 6000
+    # Write a checkpoint every these many steps in the background
+    checkpoint_step = 2000
+    checkpoint = None
+    validations = []
 
     # Iterate and execute each step in the environment
     # Take a step i number of step in evolution environment
     # Take a 1000 step in validation environment sampling from the evolution
     # Make the validation envronmnet same as the evolution environment
-    for i in range(iteration):
+    for i in range(env.stepcnt - 1, iteration):
         # Take a step in evolution
         env.step()
+        if (i + 1) % checkpoint_step == 0:
+            if checkpoint is not None:
+                checkpoint.join()
+            checkpoint = env.save_checkpoint(
+                env.pname + '/checkpoint.gz', background=True)
         # print (env.stepcnt)
         if (i + 1) % validation_step == 0:
             try:
                 phenotypes = env.behavior_sampling_objects(ratio_value=0.1)
                 # save the phenotype to json file
                 phenotype_to_json(env.pname, env.runid, phenotypes)
-                validation_loop(
-                    phenotypes, 5000, parentname=env.pname)
+                # Validate in a forked copy while the evolution continues
+                validations.append(env.fork(
+                    forked_validation, phenotypes, 5000, env.pname))
             except ValueError:
                 pass
             # Plot the fitness in the graph
@@ -130,6 +166,12 @@ def learning_phase(iteration, early_stop=False):
                 # Return phenotypes
                 return phenotypes
             """
+    # Wait for the validations still running
+    for validation in validations:
+        try:
+            validation.result()
+        except ValueError:
+            pass
     # Update the experiment table
     env.experiment.update_experiment()
 
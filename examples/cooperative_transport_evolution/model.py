@@ -81,6 +81,12 @@ class CTModel(Model):
         # Empty list of hold the agents
         self.agents = []
 
+    def restore(self):
+        """Connect to the database again after loading a checkpoint."""
+        connect = Connect('swarm', 'swarm', 'swarm', 'localhost')
+        self.connect = connect.tns_connect()
+        self.experiment.connect = self.connect
+
     def create_agents(self, random_init=True, phenotypes=None):
         """Initialize agents in the environment."""
         # This is abstract class. Each class inherting this
@@ -106,18 +112,28 @@ class CTModel(Model):
             i += 1
         return temp_list
 
-    def build_environment_from_json(self):
-        """Build env from jsondata."""
-        jsondata = JsonData.load_json_file(filename)
+    def build_environment_from_json(self, world=None):
+        """Build env from jsondata.
+
+        With world, the objects of the json file are taken from that model
+        instead, like for a validation forked from the evolution model.
+        """
         # Create a instance of JsonData to store object that
         # needs to be sent to UI
         self.render = JsonData()
         self.render.objects = {}
-        # First create the agents in the environment
-        for name in jsondata.keys():
-            obj = eval(name.capitalize())
-            self.render.objects[name] = self.create_environment_object(
-                jsondata, obj)
+        if world is not None:
+            for name, objects in world.render.objects.items():
+                for obj in objects:
+                    self.grid.add_object_to_grid(obj.location, obj)
+                self.render.objects[name] = objects
+        else:
+            jsondata = JsonData.load_json_file(filename)
+            # First create the agents in the environment
+            for name in jsondata.keys():
+                obj = eval(name.capitalize())
+                self.render.objects[name] = self.create_environment_object(
+                    jsondata, obj)
 
         self.hub = self.render.objects['hub'][0]
         self.total_food_units = 0
@@ -74,6 +74,12 @@ class ForagingModel(Model):
         # Empty list of hold the agents
         self.agents = []
 
+    def restore(self):
+        """Connect to the database again after loading a checkpoint."""
+        connect = Connect('swarm', 'swarm', 'swarm', 'localhost')
+        self.connect = connect.tns_connect()
+        self.experiment.connect = self.connect
+
     def create_agents(self, random_init=True, phenotypes=None):
         """Initialize agents in the environment."""
         # This is abstract class. Each class inherting this
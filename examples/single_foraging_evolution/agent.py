@@ -332,9 +332,14 @@ class LearningAgent(ForagingAgent):
         self.phenotypes[self.individual[0].phenotype] = (
             self.individual[0].fitness)
 
-        # Find the nearby agents
-        cellmates = self.model.grid.get_objects_from_grid(
-            type(self).__name__, self.location)
+        # Find the nearby agents. The agent index answers for the whole
+        # swarm with the locations at the start of the step
+        agent_index = getattr(self.model, 'agent_index', None)
+        if agent_index is not None:
+            cellmates = agent_index.cellmates(self)
+        else:
+            cellmates = self.model.grid.get_objects_from_grid(
+                type(self).__name__, self.location)
 
         # If neighbours found, store the genome
         if len(cellmates) > 1:
@@ -3,7 +3,7 @@
 from swarms.lib.model import Model
 from swarms.lib.time import SimultaneousActivation
 # RandomActivation, StagedActivation
-from swarms.lib.space import Grid
+from swarms.lib.space import Grid, AgentIndex
 from swarms.utils.jsonhandler import JsonData
 from swarms.utils.results import Best, Experiment
 from swarms.utils.db import Connect
@@ -85,6 +85,12 @@ class ForagingModel(Model):
         # Empty list of hold the agents
         self.agents = []
 
+    def restore(self):
+        """Connect to the database again after loading a checkpoint."""
+        connect = Connect('swarm', 'swarm', 'swarm', 'localhost')
+        self.connect = connect.tns_connect()
+        self.experiment.connect = self.connect
+
     def create_agents(self, random_init=True, phenotypes=None):
         """Initialize agents in the environment."""
         # This is abstract class. Each class inherting this
@@ -110,18 +116,28 @@ class ForagingModel(Model):
             i += 1
         return temp_list
 
-    def build_environment_from_json(self):
-        """Build env from jsondata."""
-        jsondata = JsonData.load_json_file(filename)
+    def build_environment_from_json(self, world=None):
+        """Build env from jsondata.
+
+        With world, the objects of the json file are taken from that model
+        instead, like for a validation forked from the evolution model.
+        """
         # Create a instance of JsonData to store object that
         # needs to be sent to UI
         self.render = JsonData()
         self.render.objects = {}
-        # First create the agents in the environment
-        for name in jsondata.keys():
-            obj = eval(name.capitalize())
-            self.render.objects[name] = self.create_environment_object(
-                jsondata, obj)
+        if world is not None:
+            for name, objects in world.render.objects.items():
+                for obj in objects:
+                    self.grid.add_object_to_grid(obj.location, obj)
+                self.render.objects[name] = objects
+        else:
+            jsondata = JsonData.load_json_file(filename)
+            # First create the agents in the environment
+            for name in jsondata.keys():
+                obj = eval(name.capitalize())
+                self.render.objects[name] = self.create_environment_object(
+                    jsondata, obj)
 
         self.hub = self.render.objects['hub'][0]
         self.total_food_units = 0
@@ -253,10 +269,18 @@ class EvolveModel(ForagingModel):
 
     def __init__(
             self, N, width, height, grid=10, iter=100000,
-            seed=None, name="EvoSForge", viewer=False):
-        """Initialize the attributes."""
+            seed=None, name="EvoSForge", viewer=False, indexed=False):
+        """Initialize the attributes.
+
+        With indexed the learning agents look up their cellmates in an
+        AgentIndex of the locations at the start of the step instead of
+        the live grid.
+        """
         super(EvolveModel, self).__init__(
             N, width, height, grid, iter, seed, name, viewer)
+        self.agent_index = None
+        if indexed:
+            self.agent_index = AgentIndex(self, 'LearningAgent')
 
     def create_agents(self, random_init=True, phenotypes=None):
         """Initialize agents in the environment."""
@@ -379,6 +403,10 @@ class EvolveModel(ForagingModel):
         except FloatingPointError:
             pass
 
+        # Index the learning agents before any of them moves
+        if self.agent_index is not None:
+            self.agent_index.rebuild()
+
         # Next step
         self.schedule.step()
         # input('Enter to continue' + str(self.stepcnt))
@@ -0,0 +1,209 @@
+"""Script to benchmark the behaviors of the swarm framework.
+
+Every benchmark prints its own results. Run it with the swarms package
+installed
+
+    python scripts/benchmark_behaviors.py
+"""
+
+import timeit
+
+import numpy as np
+from py_trees.trees import BehaviourTree
+from swarms.behaviors.scbehaviors import Explore
+from swarms.lib.agent import Agent
+from swarms.lib.model import Model
+from swarms.lib.objects import Hub, Sites, Food
+from swarms.lib.space import Grid
+from swarms.lib.time import BaseScheduler
+from swarms.utils.bt import BTConstruct, FORAGING_PHENOTYPE, templates
+
+
+class ExploreAgent(Agent):
+    """Agent which only explores."""
+
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        self.location = (0, 0)
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+        self.moveable = True
+        self.shared_content = dict()
+        explore = Explore('Explore')
+        explore.setup(0, self, None)
+        self.behaviour_tree = BehaviourTree(explore)
+
+    def step(self):
+        self.behaviour_tree.tick()
+
+
+def explore_benchmark(agents=1000, steps=20, buffer_sizes=(None, 1024)):
+    """Measure the Explore ticks per second."""
+    for streams in [False, True]:
+        for buffer_size in buffer_sizes:
+            model = Model(123, streams=streams, buffer_size=buffer_size)
+            model.grid = Grid(500, 500, 10)
+            model.schedule = BaseScheduler(model)
+            for i in range(agents):
+                agent = ExploreAgent(i, model)
+                model.grid.add_object_to_grid(agent.location, agent)
+                model.schedule.add(agent)
+            elapsed = timeit.timeit(model.schedule.step, number=steps)
+            print('{:>7} streams {:>5} buffer: {:10.0f} ticks/s'.format(
+                str(streams), str(buffer_size), agents * steps / elapsed))
+
+
+class PhenotypeAgent(Agent):
+    """Agent which ticks the behavior tree of a phenotype."""
+
+    def __init__(self, name, model, phenotype, compiled):
+        super().__init__(name, model)
+        self.location = (0, 0)
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+        self.moveable = True
+        self.carryable = False
+        self.shared_content = {'Hub': {model.hub}}
+        self.bt = BTConstruct(None, self, phenotype, compiled=compiled)
+        self.bt.construct()
+
+    def step(self):
+        self.bt.tick()
+
+
+def phenotype_model(agents, phenotype, compiled, seed=123):
+    """Create a foraging world with agents ticking the phenotype."""
+    model = Model(seed)
+    model.grid = Grid(100, 100, 10)
+    model.schedule = BaseScheduler(model)
+    model.hub = Hub(0, (0, 0), 11)
+    site = Sites(1, (30, -30), 5)
+    for item in [model.hub, site]:
+        model.grid.add_object_to_grid(item.location, item)
+    for i in range(agents):
+        food = Food(i, site.location, site.radius)
+        food.agent_name = None
+        food.phenotype = dict()
+        model.grid.add_object_to_grid(food.location, food)
+        agent = PhenotypeAgent(i, model, phenotype, compiled)
+        model.grid.add_object_to_grid(agent.location, agent)
+        model.schedule.add(agent)
+    return model
+
+
+def compiled_benchmark(agents=100, steps=100):
+    """Compare the agent ticks per second of py_trees and compiled trees."""
+    explore = (
+        '<?xml version="1.0" encoding="UTF-8"?><Sequence>'
+        '<act>Explore</act></Sequence>')
+    for name, phenotype in [
+            ('explore', explore), ('foraging', FORAGING_PHENOTYPE)]:
+        results = []
+        for compiled in [False, True]:
+            model = phenotype_model(agents, phenotype, compiled)
+            elapsed = min(timeit.repeat(
+                model.schedule.step, number=steps // 5, repeat=5))
+            results.append(agents * steps // 5 / elapsed)
+        print('{:>8}: {:8.0f} py_trees {:8.0f} compiled {:5.1f}x'.format(
+            name, *results, results[1] / results[0]))
+
+
+def construct_benchmark(agents=100, phenotypes=5, repeat=5):
+    """Measure the construction time per agent and the cache hit rate.
+
+    Like the validation models, the agents share a handful of phenotypes.
+    Without the cache every agent parses its phenotype.
+    """
+    explore = (
+        '<Sequence><cond>NeighbourObjects</cond><act>Explore</act>'
+        '</Sequence>')
+    population = [
+        FORAGING_PHENOTYPE[:-len('</Sequence>')] + explore * i + '</Sequence>'
+        for i in range(phenotypes)]
+    model = phenotype_model(0, FORAGING_PHENOTYPE, False)
+    for size in [0, templates.size]:
+        templates.clear()
+        templates.size = size
+
+        def construct():
+            for i in range(agents):
+                PhenotypeAgent(i, model, population[i % phenotypes], False)
+
+        elapsed = min(timeit.repeat(construct, number=1, repeat=repeat))
+        print('{:>8} cache: {:8.1f} us per agent {:5.1%} hit rate'.format(
+            size, elapsed / agents * 1e6, templates.hit_rate()))
+
+
+def perception_benchmark(agents=100, steps=100):
+    """Count the grid queries per agent tick of the sensing behaviors.
+
+    Without the perception every sense queries the grid, so the senses
+    are the queries before it. The sensing phenotype checks the hub, the
+    sites, the food and anything around before it explores.
+    """
+    sensing = ''.join(
+        '<Selector><cond>NeighbourObjects_{0}</cond>'
+        '<cond>NeighbourObjects_{0}_invert</cond></Selector>'.format(name)
+        for name in ['Hub', 'Sites', 'Food'])
+    sensing = (
+        '<?xml version="1.0" encoding="UTF-8"?><Sequence>' + sensing +
+        '<Selector><cond>NeighbourObjects</cond><act>Explore</act>'
+        '</Selector><Sequence><act>Explore</act></Sequence></Sequence>')
+    for name, phenotype in [
+            ('sensing', sensing), ('foraging', FORAGING_PHENOTYPE)]:
+        model = phenotype_model(agents, phenotype, True)
+        for _ in range(steps):
+            model.schedule.step()
+        perceptions = [agent.perception for agent in model.schedule.agents]
+        senses = sum(perception.senses for perception in perceptions)
+        queries = sum(perception.queries for perception in perceptions)
+        print('{:>8}: {:5.2f} queries before {:5.2f} after per tick'.format(
+            name, senses / (agents * steps), queries / (agents * steps)))
+
+
+def batch_move_benchmark(agents=(1000, 10000), steps=20):
+    """Compare Explore moving each agent with moves batched per step."""
+    for total in agents:
+        results = []
+        for batch_moves in [False, True]:
+            model = Model(123)
+            model.grid = Grid(500, 500, 10)
+            model.grid.batch_moves = batch_moves
+            model.schedule = BaseScheduler(model)
+            for i in range(total):
+                agent = ExploreAgent(i, model)
+                model.grid.add_object_to_grid(agent.location, agent)
+                model.schedule.add(agent)
+            results.append(min(timeit.repeat(
+                model.schedule.step, number=steps // 5, repeat=5)) / (
+                    steps // 5))
+        print('{:>8}: {:6d} agents {:8.4f}s one by one {:8.4f}s batched '
+              'per step'.format('moves', total, *results))
+
+
+def draw_benchmark(draws=100000):
+    """Measure scalar draws per second of the random streams."""
+    for buffer_size in [None, 1024]:
+        random = Model(123, buffer_size=buffer_size).random
+        for name, draw in [
+                ('normal', lambda: random.normal(0, .1)),
+                ('randint', lambda: random.randint(100, 200))]:
+            elapsed = timeit.timeit(draw, number=draws)
+            print('{:>7} {:>5} buffer: {:10.0f} draws/s'.format(
+                name, str(buffer_size), draws / elapsed))
+
+
+def main():
+    """Block for the main function."""
+    draw_benchmark()
+    explore_benchmark()
+    compiled_benchmark()
+    construct_benchmark()
+    perception_benchmark()
+    batch_move_benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""Script to benchmark the grid lookups of the swarm framework.
+
+Every benchmark prints its own results. Run it with the swarms package
+installed
+
+    python scripts/benchmark_grid.py
+"""
+
+import json
+import pathlib
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+from swarms.lib.agent import Agent
+from swarms.lib.model import Model
+from swarms.lib.objects import Food, Debris, Hub, Sites, Obstacles
+from swarms.lib.space import Grid, MultiResolutionGrid, AgentIndex
+from swarms.lib.time import BaseScheduler
+
+
+def bounding_box_lookup(grid, point):
+    """Find the grid value by building and hashing the bounding box."""
+    grid_key = (grid.find_lowerbound(point), grid.find_upperbound(point))
+    return grid.grid[grid_key]
+
+
+def lookups_per_second(function, grid, points, repeat=5):
+    """Measure how many lookups the function makes in a second."""
+    def run():
+        for point in points:
+            function(grid, point)
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    return len(points) / best
+
+
+def neighborhood_benchmark(points, radii=(3, 8, 10, 12)):
+    """Compare neighborhood queries with and without footprint cache."""
+    for cache_size in [0, 65536]:
+        grid = Grid(100, 100, 10, footprint_cache_size=cache_size)
+        for radius in radii:
+            def query(grid, point):
+                return grid.get_neighborhood(point, radius)
+            rate = lookups_per_second(query, grid, points)
+            print('{:>14}: radius {:2d} {:12.0f} queries/s'.format(
+                'cache ' + str(cache_size), radius, rate))
+        print('{:>14}: {}'.format('', grid.footprint_cache_info()))
+
+
+def radius_query_benchmark(points, radius=12, foods=2000, seed=123):
+    """Compare square block and circular radius queries."""
+    grid = Grid(100, 100, 10)
+    for i, point in enumerate(random_points(100, 100, foods, seed)):
+        grid.add_object_to_grid(point, Food(i, point, radius=2))
+
+    def block(grid, point):
+        cells = grid.get_neighborhood(point, radius)
+        return grid.get_objects_from_list_of_grid('Food', cells)
+
+    def circle(grid, point):
+        return grid.query_radius(point, radius, 'Food')
+
+    sample = points[:1000]
+    for name, function in [('square block', block), ('radius', circle)]:
+        rate = lookups_per_second(function, grid, sample)
+        found = np.mean([len(function(grid, point)) for point in sample])
+        print('{:>14}: {:12.0f} queries/s {:8.1f} objects/query'.format(
+            name, rate, found))
+
+
+def full_move(grid, point, objects, newpoint):
+    """Move an object by removing and adding its whole footprint."""
+    if grid.find_cell(point) != grid.find_cell(newpoint):
+        grid.remove_object_from_grid(point, objects)
+        grid.add_object_to_grid(newpoint, objects)
+
+
+def move_benchmark(objects=100, steps=200, radius=20, seed=123):
+    """Move radius 20 objects by one grid across a grid of size 10."""
+    # Precompute the paths so only the grid updates are timed
+    grid = Grid(400, 400, 10)
+    random = np.random.RandomState(seed)
+    paths = []
+    for point in random_points(300, 300, objects, seed):
+        direction = random.rand() * 2 * np.pi
+        path = [point]
+        for _ in range(steps):
+            x = int(path[-1][0] + np.cos(direction) * 10)
+            y = int(path[-1][1] + np.sin(direction) * 10)
+            point, direction = grid.check_limits((x, y), direction)
+            path.append(point)
+        paths.append(path)
+
+    for name, move in [('full move', full_move), ('incremental', None)]:
+        grid = Grid(400, 400, 10)
+        items = []
+        for i, path in enumerate(paths):
+            item = Food(i, path[0], radius=radius)
+            grid.add_object_to_grid(path[0], item)
+            items.append(item)
+
+        def run():
+            for item, path in zip(items, paths):
+                point = path[0]
+                for newpoint in path[1:]:
+                    if move is None:
+                        grid.move_object(point, item, newpoint)
+                    else:
+                        move(grid, point, item, newpoint)
+                    point = newpoint
+
+        elapsed = min(timeit.repeat(run, number=1, repeat=1))
+        print('{:>14}: {:12.0f} moves/s'.format(
+            name, objects * steps / elapsed))
+
+
+def agent_index_benchmark(agents=(100, 1000, 10000), radius=12, seed=123):
+    """Compare per agent grid walks with one batched index query."""
+    for total in agents:
+        model = Model(seed)
+        model.grid = Grid(1600, 800, 10)
+        model.schedule = BaseScheduler(model)
+        for i, point in enumerate(random_points(1600, 800, total, seed)):
+            agent = Agent(i, model)
+            agent.location = point
+            agent.radius = radius
+            model.schedule.add(agent)
+            model.grid.add_object_to_grid(point, agent)
+
+        def grid_walk():
+            for agent in model.schedule.agents:
+                cells = model.grid.get_neighborhood(agent.location, radius)
+                model.grid.get_objects_from_list_of_grid('Agent', cells)
+
+        def batched():
+            index = AgentIndex(model)
+            index.query_all(radius)
+
+        walk = min(timeit.repeat(grid_walk, number=1, repeat=3))
+        batch = min(timeit.repeat(batched, number=1, repeat=3))
+        print('{:>14}: {:6d} agents {:9.4f}s walk {:9.4f}s batched'.format(
+            'agent index', total, walk, batch))
+
+
+def startup_benchmark(width=4000, height=4000, grid_size=10, objects=1000,
+                      seed=123):
+    """Compare the startup time and memory of dense and sparse grids."""
+    random = np.random.RandomState(seed)
+    locations = random.uniform(
+        (-width / 2, -height / 2), (width / 2, height / 2),
+        (objects, 2)).tolist()
+    for sparse in [False, True]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        grid = Grid(width, height, grid_size, sparse=sparse)
+        built = time.perf_counter() - start
+        for i, location in enumerate(locations):
+            grid.add_object_to_grid(location, Food(i, location, radius=5))
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{}x{} {:>6} grid: {:8.3f}s startup, {:8.1f} MB peak, '
+              '{} grids allocated'.format(
+                  width, height, 'sparse' if sparse else 'dense', built,
+                  memory / 2 ** 20, len(grid.grid_objects)))
+        # Release the grid so it is not freed inside the next timing
+        del grid
+
+
+def load_world(example, width, height, agents, random):
+    """Create the objects of an example world and its agent locations."""
+    filename = pathlib.Path(__file__).resolve().parent.parent.joinpath(
+        'examples', example, 'world.json')
+    jsondata = json.loads(filename.read_text())
+    classes = {'hub': Hub, 'sites': Sites, 'obstacles': Obstacles}
+    objects = []
+    for name, items in jsondata.items():
+        for i, item in enumerate(items):
+            objects.append(classes[name](
+                i, (item['x'], item['y']), item['radius']))
+    # Foods sit on the site and debris is scattered around the hub as in
+    # the example models
+    for i in range(agents):
+        if 'sites' in jsondata:
+            site = objects[-1]
+            objects.append(Food(i, site.location, site.radius))
+        else:
+            dx, dy = random.normal(0, 10, 2)
+            objects.append(Debris(i, (int(dx), int(dy)), 5))
+    locations = random.randint(
+        -width // 2, width // 2, (agents, 2)).tolist()
+    return objects, [tuple(location) for location in locations]
+
+
+def world_benchmark(
+        worlds=(('single_foraging_evolution', 100, 100),
+                ('nest_maintainence_evolution', 400, 400)),
+        agents=100, steps=200, radius=3, seed=123):
+    """Compare the single and the two level grid on the example worlds.
+
+    Every tick each agent senses its neighborhood and moves a random
+    step. Missed counts the overlapping objects a sense did not return.
+    """
+    for example, width, height in worlds:
+        random = np.random.RandomState(seed)
+        objects, locations = load_world(
+            example, width, height, agents, random)
+        grid = Grid(width, height, 10)
+        paths = []
+        for point in locations:
+            direction = random.rand() * 2 * np.pi
+            path = [point]
+            for _ in range(steps):
+                direction += random.normal(0, .1)
+                x = int(path[-1][0] + np.cos(direction) * 2)
+                y = int(path[-1][1] + np.sin(direction) * 2)
+                point, direction = grid.check_limits((x, y), direction)
+                path.append(point)
+            paths.append(path)
+
+        backends = [('grid', Grid), ('two level', MultiResolutionGrid)]
+        for name, backend in backends:
+            grid = backend(width, height, 10)
+            for item in objects:
+                grid.add_object_to_grid(item.location, item)
+            walkers = []
+            for i, path in enumerate(paths):
+                walker = Food(i, path[0], radius)
+                grid.add_object_to_grid(path[0], walker)
+                walkers.append(walker)
+            entries = sum(
+                len(bucket) for buckets in grid.grid_objects.values()
+                for bucket in buckets.values())
+
+            candidates = []
+
+            def run():
+                for step in range(steps):
+                    for walker, path in zip(walkers, paths):
+                        point = path[step]
+                        candidates.append(grid.get_objects_from_list_of_grid(
+                            None, grid.get_neighborhood(point, radius)))
+                        grid.move_object(point, walker, path[step + 1])
+
+            elapsed = timeit.timeit(run, number=1)
+            missed = 0
+            for step in range(steps):
+                for i, path in enumerate(paths):
+                    x, y = path[step]
+                    found = set(candidates[step * agents + i])
+                    missed += sum(
+                        1 for item in objects if item not in found and (
+                            item.location[0] - x) ** 2 + (
+                            item.location[1] - y) ** 2 <= (
+                            radius + item.radius) ** 2)
+            print('{:>28} {:>10}: {:9.0f} senses/s {:6.1f} candidates '
+                  '{:6d} missed {:6d} grid entries'.format(
+                      example, name, steps * agents / elapsed,
+                      np.mean([len(found) for found in candidates]),
+                      missed, entries))
+
+
+class Walker(Food):
+    """Food which walks along its direction."""
+
+    def __init__(self, id, location, direction):
+        super().__init__(id, location, radius=3)
+        self.direction = direction
+
+
+def boundary_benchmark(agents=(1000, 10000), steps=20, speed=2, seed=123):
+    """Compare per agent boundary checks and moves with the batch pass."""
+    for total in agents:
+        grid = Grid(400, 400, 10)
+        random = np.random.RandomState(seed)
+        walkers = []
+        for i, point in enumerate(random_points(400, 400, total, seed)):
+            walker = Walker(i, point, random.rand() * 2 * np.pi)
+            grid.add_object_to_grid(point, walker)
+            walkers.append(walker)
+        locations = np.array([walker.location for walker in walkers])
+        directions = np.array([walker.direction for walker in walkers])
+
+        def scalar_checks():
+            for location, direction in zip(
+                    locations.tolist(), directions.tolist()):
+                grid.check_limits(location, direction)
+
+        def scalar_moves():
+            for walker in walkers:
+                x = int(walker.location[0] + np.cos(walker.direction) * speed)
+                y = int(walker.location[1] + np.sin(walker.direction) * speed)
+                new_location, direction = grid.check_limits(
+                    (x, y), walker.direction)
+                grid.move_object(walker.location, walker, new_location)
+                walker.location = new_location
+                walker.direction = direction
+
+        results = [
+            min(timeit.repeat(scalar_checks, number=1, repeat=3)),
+            min(timeit.repeat(lambda: grid.check_limits_batch(
+                locations, directions), number=1, repeat=3)),
+            timeit.timeit(scalar_moves, number=steps) / steps,
+            timeit.timeit(lambda: grid.move_objects_forward(
+                walkers, speed), number=steps) / steps]
+        print('{:>14}: {:6d} agents {:9.4f}s checks {:9.4f}s batched, '
+              '{:9.4f}s moves {:9.4f}s batched'.format(
+                  'boundary', total, *results))
+
+
+def random_points(width, height, samples, seed):
+    """Sample integer points inside the environment."""
+    random = np.random.RandomState(seed)
+    xs = random.randint(-width // 2, width // 2, samples).tolist()
+    ys = random.randint(-height // 2, height // 2, samples).tolist()
+    return list(zip(xs, ys))
+
+
+def main(width=1600, height=800, grid_size=10, samples=100000, seed=123):
+    """Block for the main function."""
+    grid = Grid(width, height, grid_size)
+    points = random_points(width, height, samples, seed)
+
+    methods = [
+        ('bounding box', bounding_box_lookup),
+        ('find_grid', Grid.find_grid),
+        ('find_cell', Grid.find_cell)]
+    baseline = None
+    for name, function in methods:
+        rate = lookups_per_second(function, grid, points)
+        baseline = rate if baseline is None else baseline
+        print('{:>14}: {:12.0f} lookups/s ({:.2f}x)'.format(
+            name, rate, rate / baseline))
+
+    neighborhood_benchmark(random_points(100, 100, samples, seed))
+    radius_query_benchmark(random_points(100, 100, samples, seed))
+    move_benchmark()
+    agent_index_benchmark()
+    startup_benchmark()
+    world_benchmark()
+    boundary_benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Script to benchmark the model runs of the swarm framework.
+
+Every benchmark prints its own results. Run it with the swarms package
+installed
+
+    python scripts/benchmark_model.py
+"""
+
+import multiprocessing
+import os
+import tempfile
+import timeit
+
+import numpy as np
+from swarms.lib.agent import Agent
+from swarms.lib.model import Model, Replicates
+from swarms.lib.objects import Hub, Sites, Food
+from swarms.lib.space import Grid
+from swarms.lib.time import SimultaneousActivation
+
+
+class ForagingAgent(Agent):
+    """Agent walking around and remembering the grids it visited."""
+
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        self.location = (0, 0)
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+        self.shared_content = dict()
+        self.location_history = set()
+        self.phenotype = (
+            '<?xml version="1.0" encoding="UTF-8"?><Sequence>'
+            '<cond>NeighbourObjects</cond><act>Explore</act></Sequence>')
+
+    def step(self):
+        self.direction = (
+            self.direction + self.random.normal(0, .1)) % (2 * np.pi)
+        x = int(self.location[0] + np.cos(self.direction) * self.speed)
+        y = int(self.location[1] + np.sin(self.direction) * self.speed)
+        new_location, self.direction = self.model.grid.check_limits(
+            (x, y), self.direction)
+        self.model.grid.move_object(self.location, self, new_location)
+        self.location = new_location
+        self.location_history.add(new_location)
+
+
+class ForagingModel(Model):
+    """Foraging world with a hub, a site and one food per agent."""
+
+    def __init__(self, agents, width=100, height=100, seed=123):
+        super().__init__(seed)
+        self.grid = Grid(width, height, 10)
+        self.schedule = SimultaneousActivation(self)
+        self.hub = Hub(0, (0, 0), 20)
+        self.site = Sites(1, (30, -30), 10)
+        for item in [self.hub, self.site]:
+            self.grid.add_object_to_grid(item.location, item)
+        for i in range(agents):
+            food = Food(i, self.site.location, self.site.radius)
+            food.agent_name = None
+            food.phenotype = dict()
+            self.grid.add_object_to_grid(food.location, food)
+            agent = ForagingAgent(i, self)
+            self.grid.add_object_to_grid(agent.location, agent)
+            self.schedule.add(agent)
+
+    def step(self):
+        self.schedule.step()
+
+
+def checkpoint_benchmark(agents=(100, 1000, 10000), steps=1000):
+    """Measure the checkpoint size and the save and load times."""
+    path = os.path.join(tempfile.mkdtemp(), 'model.ckpt')
+    for total in agents:
+        model = ForagingModel(total, 500, 500)
+        step = timeit.timeit(model.step, number=steps // 10) / (steps // 10)
+        save = timeit.timeit(lambda: model.save_checkpoint(path), number=5) / 5
+        load = timeit.timeit(
+            lambda: ForagingModel.load_checkpoint(path), number=5) / 5
+        print(
+            '{:>10}: {:6d} agents {:8.1f} KB {:7.4f}s save {:7.4f}s load '
+            '{:7.4f}s per step'.format(
+                'checkpoint', total, os.path.getsize(path) / 1024, save, load,
+                step))
+    os.remove(path)
+
+
+def overhead_benchmark(agents=100, steps=20000, every=5000):
+    """Measure how long the run is blocked by a checkpoint every few steps.
+
+    A forked background save only blocks the run while forking.
+    """
+    path = os.path.join(tempfile.mkdtemp(), 'model.ckpt')
+    for background in [False, True]:
+        model = ForagingModel(agents)
+        process = None
+        stepping = blocked = 0
+        for i in range(steps // every):
+            stepping += timeit.timeit(model.step, number=every)
+            if process is not None:
+                process.join()
+            start = timeit.default_timer()
+            process = model.save_checkpoint(path, background=background)
+            blocked += timeit.default_timer() - start
+        if process is not None:
+            process.join()
+        print(
+            '{:>10}: {:6d} steps {:7.2f}s stepping {:7.3f}s blocked '
+            'by {} checkpoints{}'.format(
+                'overhead', steps, stepping, blocked, steps // every,
+                ' in background' if background else ''))
+    os.remove(path)
+
+
+def validate(model, agents, steps):
+    """Run a fresh model in the world of the model, like a validation."""
+    valid = ForagingModel(agents, model.grid.width, model.grid.height)
+    for _ in range(steps):
+        valid.step()
+    return valid.schedule.steps
+
+
+def validation_benchmark(
+        agents=100, steps=6000, every=1500, validation_steps=1500):
+    """Compare validations blocking the loop and forked from it."""
+    for forked in [False, True]:
+        model = ForagingModel(agents)
+
+        def run():
+            validations = []
+            for i in range(steps):
+                model.step()
+                if (i + 1) % every == 0:
+                    if forked:
+                        validations.append(model.fork(
+                            validate, agents, validation_steps))
+                    else:
+                        validate(model, agents, validation_steps)
+            return [validation.result() for validation in validations]
+        elapsed = timeit.timeit(run, number=1)
+        print('{:>10}: {:6d} steps {:7.2f}s with {} {} validations'.format(
+            'validation', steps, elapsed, steps // every,
+            'forked' if forked else 'blocking'))
+
+
+def replicate(seed, agents, steps):
+    """Build and run one replicate."""
+    model = ForagingModel(agents, seed=seed)
+    model.run(steps)
+    return seed
+
+
+def replicate_benchmark(replicates=16, agents=100, steps=500):
+    """Compare replicates in fresh processes, in one process and forked."""
+    seeds = list(range(replicates))
+    # Fresh interpreters for every run, like the joblib workers
+    context = multiprocessing.get_context('spawn')
+
+    def workers():
+        with context.Pool(replicates) as pool:
+            pool.starmap(
+                replicate, [(seed, agents, steps) for seed in seeds])
+
+    def batched(processes=None):
+        Replicates(
+            lambda seed: ForagingModel(agents, seed=seed), replicates,
+            workers=processes).run(steps)
+
+    for name, run in [
+            ('processes', workers), ('one process', batched),
+            ('forked', lambda: batched(replicates))]:
+        elapsed = timeit.timeit(run, number=1)
+        print('{:>11}: {:3d} replicates {:8.0f} replicate steps/s'.format(
+            name, replicates, replicates * steps / elapsed))
+
+
+def main():
+    """Block for the main function."""
+    checkpoint_benchmark()
+    overhead_benchmark()
+    validation_benchmark()
+    replicate_benchmark()
+
+
+if __name__ == '__main__':
+    main()
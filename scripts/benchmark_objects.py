@@ -0,0 +1,98 @@
+"""Script to benchmark the memory of the environment objects.
+
+Every benchmark prints its own results. Run it with the swarms package
+installed
+
+    python scripts/benchmark_objects.py
+"""
+
+import multiprocessing
+import resource
+import tracemalloc
+
+import numpy as np
+from swarms.lib.objects import Food, Signal, Cue
+from swarms.lib.space import Grid
+
+
+def dict_backed(cls):
+    """Get a copy of the class which keeps its attributes in a dict."""
+    return type(cls.__name__, (cls,), {})
+
+
+def object_bytes(cls, total=10000, **kwargs):
+    """Measure the bytes allocated per object of the class."""
+    tracemalloc.start()
+    items = [cls(i, (0, 0), **kwargs) for i in range(total)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return size / total
+
+
+def comm_foraging_run(compact, steps, agents, rate, seed):
+    """Create the signals and cues of a communication foraging run.
+
+    Every step each agent sends a signal or drops a cue with the given
+    rate. Both stay registered in the grid as they do in the behaviors.
+    Returns the objects created and the peak resident memory in MB.
+    """
+    food_class, signal_class, cue_class = Food, Signal, Cue
+    if not compact:
+        food_class, signal_class, cue_class = map(
+            dict_backed, (Food, Signal, Cue))
+    random = np.random.RandomState(seed)
+    grid = Grid(100, 100, 10)
+    site = food_class(0, (30, -30), radius=10)
+    foods = []
+    for i in range(agents):
+        food = food_class(i, site.location, radius=10)
+        food.agent_name = None
+        food.phenotype = dict()
+        grid.add_object_to_grid(food.location, food)
+        foods.append(food)
+    signals = []
+    created = 0
+    for step in range(steps):
+        senders = random.binomial(agents, rate)
+        droppers = random.binomial(agents, rate)
+        if not senders and not droppers:
+            continue
+        locations = random.randint(-50, 50, (senders + droppers, 2)).tolist()
+        for name, location in enumerate(locations[:senders]):
+            signal = signal_class(
+                name, tuple(location), 3, object_to_communicate=site)
+            grid.add_object_to_grid(tuple(location), signal)
+            signals.append(signal)
+        for name, location in enumerate(locations[senders:]):
+            cue = cue_class(
+                name, tuple(location), 3, object_to_communicate=site)
+            grid.add_object_to_grid(cue.location, cue)
+        created += senders + droppers
+    # Linux reports the peak resident memory in KB
+    return created, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(steps=100000, agents=100, rate=0.01, seed=123):
+    """Block for the main function."""
+    for cls, kwargs in [
+            (Food, {'radius': 2}),
+            (Signal, {'radius': 3, 'object_to_communicate': Food()}),
+            (Cue, {'radius': 3, 'object_to_communicate': Food()})]:
+        slotted = object_bytes(cls, **kwargs)
+        backed = object_bytes(dict_backed(cls), **kwargs)
+        print('{:>8}: {:6.0f} bytes slotted {:6.0f} bytes with dict'.format(
+            cls.__name__, slotted, backed))
+
+    # Fresh processes so the peaks do not include the other run
+    context = multiprocessing.get_context('spawn')
+    for compact in [True, False]:
+        with context.Pool(1) as pool:
+            created, rss = pool.apply(
+                comm_foraging_run, (compact, steps, agents, rate, seed))
+        print('{:>8}: {} steps {} objects {:8.1f} MB peak RSS'.format(
+            'slotted' if compact else 'dict', steps, created, rss))
+
+
+if __name__ == '__main__':
+    main()
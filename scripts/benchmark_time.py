@@ -0,0 +1,286 @@
+"""Script to benchmark the schedulers of the swarm framework.
+
+Every benchmark prints its own results. Run it with the swarms package
+installed
+
+    python scripts/benchmark_time.py
+"""
+
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+from swarms.lib.agent import Agent, BatchAgent, BatchAttribute
+from swarms.lib.model import Model
+from swarms.lib.space import Grid
+from swarms.lib.time import (
+    BaseScheduler, SimultaneousActivation, ParallelActivation,
+    DormantActivation, BatchActivation)
+from swarms.utils.bt import FORAGING_PHENOTYPE
+
+
+class WealthAgent(Agent):
+    """Agent of the wealth model which stages its step."""
+
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        self.wealth = 1
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+
+    def stage(self):
+        return [agent.name for agent in self.model.grid.get_objects_from_grid(
+            'WealthAgent', self.location)]
+
+    def merge(self, cellmates):
+        if self.wealth > 0 and len(cellmates) > 1:
+            other = self.model.agents[self.model.random.choice(cellmates)]
+            other.wealth += 1
+            self.wealth -= 1
+
+    def step(self):
+        self.merge(self.stage())
+
+    def advance(self):
+        x = int(self.location[0] + np.cos(self.direction) * self.speed)
+        y = int(self.location[1] + np.sin(self.direction) * self.speed)
+        new_location, direction = self.model.grid.check_limits(
+            (x, y), self.direction)
+        self.model.grid.move_object(self.location, self, new_location)
+        self.location = new_location
+        self.direction = direction
+
+
+class BatchWealthAgent(BatchAgent):
+    """Agent of the wealth model stepped by a batch kernel."""
+
+    wealth = BatchAttribute((), int)
+
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        self.wealth = 1
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+
+    @classmethod
+    def step_batch(cls, state):
+        model = state.model
+        wealth = state['wealth']
+        cells = model.grid.find_cells(state['location'])
+        order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells)
+        starts = np.cumsum(counts) - counts
+        givers = np.flatnonzero((wealth > 0) & (counts[cells] > 1))
+        picks = starts[cells[givers]] + (model.random.rand(
+            len(givers)) * counts[cells[givers]]).astype(int)
+        np.add.at(wealth, order[picks], 1)
+        wealth[givers] -= 1
+
+        directions = state['direction']
+        locations = state['location']
+        steps = np.column_stack([
+            locations[:, 0] + np.cos(directions) * 2,
+            locations[:, 1] + np.sin(directions) * 2]).astype(int)
+        new_locations, directions[:] = model.grid.check_limits_batch(
+            steps, directions)
+        state.move(new_locations.astype(int))
+
+
+class WealthModel(Model):
+    """Wealth model with a chosen scheduler."""
+
+    def __init__(
+            self, agents, width, height, schedule, seed=123,
+            agent_class=WealthAgent):
+        super().__init__(seed)
+        self.grid = Grid(width, height, 10)
+        self.schedule = schedule(self)
+        self.agents = {}
+        for i in range(agents):
+            agent = agent_class(i, self)
+            self.schedule.add(agent)
+            self.agents[i] = agent
+            x = self.random.randint(-width / 2, width / 2)
+            y = self.random.randint(-height / 2, height / 2)
+            agent.location = (x, y)
+            self.grid.add_object_to_grid((x, y), agent)
+
+    def step(self):
+        self.schedule.step()
+
+
+def schedulers(workers=(1, 2, 4, 8)):
+    """Get the schedulers to compare by name."""
+    yield 'serial', SimultaneousActivation
+    for processes in [False, True]:
+        for total in workers:
+            name = '{} {}'.format(
+                total, 'processes' if processes else 'threads')
+            yield name, lambda model, total=total, processes=processes: (
+                ParallelActivation(model, total, processes))
+
+
+def wealth_benchmark(agents=10000, width=1600, height=800, steps=10):
+    """Measure the steps per second of the wealth model."""
+    for name, schedule in schedulers():
+        model = WealthModel(agents, width, height, schedule)
+        try:
+            elapsed = timeit.timeit(model.step, number=steps)
+        except ValueError as error:
+            print('{:>14}: skipped, {}'.format(name, error))
+            continue
+        finally:
+            if hasattr(model.schedule, 'close'):
+                model.schedule.close()
+        print('{:>14}: {:6d} agents {:8.2f} steps/s'.format(
+            name, agents, steps / elapsed))
+
+
+def validation_benchmark(agents=100, steps=10):
+    """Measure the steps per second of the single foraging validation.
+
+    The behavior tree agents of the example have no stage method, so the
+    parallel activation refuses to step them and is reported as skipped.
+    """
+    example = pathlib.Path(__file__).resolve().parent.parent.joinpath(
+        'examples', 'single_foraging_evolution')
+    sys.path.insert(0, str(example))
+    try:
+        from model import ValidationModel
+    except ImportError as error:
+        print('validation model skipped:', error)
+        return
+
+    for name, schedule in schedulers():
+        model = ValidationModel(agents, 100, 100, 10, iter=steps, seed=123)
+        model.schedule = schedule(model)
+        model.build_environment_from_json()
+        model.create_agents(phenotypes=[FORAGING_PHENOTYPE])
+        try:
+            elapsed = timeit.timeit(model.step, number=steps)
+        except ValueError as error:
+            print('{:>14}: skipped, {}'.format(name, error))
+            continue
+        finally:
+            if hasattr(model.schedule, 'close'):
+                model.schedule.close()
+        print('{:>14}: {:6d} agents {:8.2f} steps/s'.format(
+            name, agents, steps / elapsed))
+
+
+class ListScheduler:
+    """Scheduler keeping the agents in a list like before the registry."""
+
+    def __init__(self, model):
+        self.model = model
+        self.agents = []
+
+    def add(self, agent):
+        self.agents.append(agent)
+
+    def remove(self, agent):
+        while agent in self.agents:
+            self.agents.remove(agent)
+
+    def step(self):
+        for agent in self.agents[:]:
+            agent.step()
+
+
+class IdleAgent(Agent):
+    """Agent with an empty step."""
+
+    def step(self):
+        pass
+
+
+def registry_benchmark(agents=(1000, 10000), removals=100, steps=10):
+    """Remove and add back agents every step like resilience runs."""
+    for total in agents:
+        results = []
+        for schedule in [ListScheduler, BaseScheduler]:
+            model = Model(123)
+            model.schedule = schedule(model)
+            population = [IdleAgent(i, model) for i in range(total)]
+            for agent in population:
+                model.schedule.add(agent)
+            random = np.random.RandomState(123)
+
+            def run():
+                for agent in random.choice(population, removals, False):
+                    model.schedule.remove(agent)
+                    model.schedule.add(agent)
+                model.schedule.step()
+
+            results.append(timeit.timeit(run, number=steps) / steps)
+        print('{:>14}: {:6d} agents {:9.4f}s list {:9.4f}s registry'.format(
+            'registry', total, *results))
+
+
+class ParkedAgent(Agent):
+    """Agent parked at the hub which only senses while it has nothing to do.
+
+    With a dormant schedule it sleeps until something enters its grid or
+    a hundred steps have passed.
+    """
+
+    def __init__(self, name, model, parked):
+        super().__init__(name, model)
+        self.parked = parked
+        self.radius = 3
+        self.location = (0, 0)
+
+    def step(self):
+        grid = self.model.grid
+        grid.get_objects_from_list_of_grid(
+            None, grid.get_neighborhood(self.location, self.radius))
+        if self.parked and isinstance(self.model.schedule, DormantActivation):
+            self.model.schedule.sleep(
+                self, steps=100, grids=[grid.find_cell(self.location)])
+
+
+def dormant_benchmark(agents=10000, parked=0.9, steps=100):
+    """Compare stepping parked agents with letting them sleep."""
+    for schedule in [BaseScheduler, DormantActivation]:
+        model = Model(123)
+        model.grid = Grid(1600, 800, 10)
+        model.schedule = schedule(model)
+        for i in range(agents):
+            model.schedule.add(ParkedAgent(i, model, i < agents * parked))
+        elapsed = timeit.timeit(model.schedule.step, number=steps)
+        active = np.mean([
+            active for active, _ in getattr(
+                model.schedule, 'activity', [(agents, 0)])])
+        print('{:>18}: {:6d} agents {:8.2f} steps/s {:8.0f} active'.format(
+            schedule.__name__, agents, steps / elapsed, active))
+
+
+def kernel_benchmark(agents=(10000, 100000), width=3200, height=3200,
+                     steps=5):
+    """Compare the wealth model stepped per agent and by a batch kernel."""
+    for total in agents:
+        results = []
+        for schedule, agent_class in [
+                (SimultaneousActivation, WealthAgent),
+                (BatchActivation, BatchWealthAgent)]:
+            model = WealthModel(
+                total, width, height, schedule, agent_class=agent_class)
+            results.append(timeit.timeit(model.step, number=steps) / steps)
+        print('{:>14}: {:6d} agents {:9.4f}s per agent {:9.4f}s kernel'.format(
+            'batch', total, *results))
+
+
+def main():
+    """Block for the main function."""
+    wealth_benchmark()
+    validation_benchmark()
+    registry_benchmark()
+    dormant_benchmark()
+    kernel_benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Registry of the behaviors the phenotypes can use.
+
+Primitive and composite behaviors register themselves by name, so the
+behavior trees are built from the names the grammar emits.
+"""
+
+from py_trees.composites import Sequence, Selector
+
+BEHAVIORS = dict()
+
+
+def register(behavior):
+    """Register a behavior class under its name.
+
+    Used as a class decorator by the behavior modules.
+    """
+    BEHAVIORS[behavior.__name__] = behavior
+    return behavior
+
+
+def get_behavior(name):
+    """Get the behavior class registered under the name."""
+    try:
+        return BEHAVIORS[name]
+    except KeyError:
+        raise ValueError(
+            'Unknown behavior {}. Registered behaviors are {}'.format(
+                name, ', '.join(sorted(BEHAVIORS)))) from None
+
+
+# The control nodes of the trees
+register(Sequence)
+register(Selector)
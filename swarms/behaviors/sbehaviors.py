@@ -3,38 +3,35 @@
 This file name is sbehaviors coz `s` stands for swarms.
 """
 
-from py_trees import Behaviour, Status, Blackboard
+from py_trees import Behaviour, Status
 import numpy as np
 from swarms.utils.distangle import get_direction
 from swarms.lib.objects import Signal, Cue
+from swarms.behaviors.registry import register
 
 
 class ObjectsStore:
     """Static class to search.
 
-    This class provides a find method to search through
-    Behavior Tree blackboard and agent content.
+    This class provides a find method to search through the
+    perception slots and the memory of an agent.
     """
 
     @staticmethod
-    def find(blackboard_content, agent_content, name, agent_name):
+    def find(agent, name):
         """Let this method implement search.
 
-        This method find implements a search through
-        blackboard dictionary. If the object is not found
-        in blackboard, then agent content is searched.
+        This method finds the objects of the type the agent sensed
+        last. If there are none, the agent memory is searched. The
+        perception slot itself is returned, so it must not be changed.
         """
         try:
-            objects = blackboard_content[name + str(agent_name)]
-            return list(objects)
+            return agent.perception.slots[name]
         except KeyError:
-            try:
-                objects = agent_content[name]
-                return list(objects)
-            except KeyError:
-                return []
+            return tuple(agent.shared_content.get(name, ()))
 
 
+@register
 class NeighbourObjects(Behaviour):
     """Sense behavior for the agents.
 
@@ -47,8 +44,6 @@ class NeighbourObjects(Behaviour):
     def __init__(self, name):
         """Init method for the sense behavior."""
         super(NeighbourObjects, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -80,20 +75,20 @@ class NeighbourObjects(Behaviour):
         """
         Sense the neighborhood.
 
-        This method gets the grid values based on the current location and
-        radius. The grids are used to search the environment. If the agents
-        find any objects, it is stored in the behavior tree blackboard which
-        is a dictionary with sets as values.
+        This method gets the objects the agent perceives around its current
+        location and radius. The grid is queried once until the agent moves
+        or the grid changes. If the agents find any objects, the carryable
+        ones are stored in the perception slots of the agent which is a
+        dictionary with lists as values, and the others in its memory.
         """
-        grids = self.agent.model.grid.get_neighborhood(
-            self.agent.location, self.agent.radius)
-        objects = self.agent.model.grid.get_objects_from_list_of_grid(
-            self.item, grids)
-        # Need to reset blackboard contents after each sense
-        self.blackboard.shared_content = dict()
+        objects = self.agent.perception.sense(
+            self.agent.model.grid, self.agent.location, self.agent.radius,
+            self.item)
+        # Only the objects of the last sense of the agent are kept
+        slots = self.agent.perception.slots = dict()
 
         if len(objects) >= 1:
-            for item in objects:
+            for item in dict.fromkeys(objects):
                 name = type(item).__name__
                 # Is the item is not carrable, its location
                 # and property doesnot change. So we can commit its
@@ -104,16 +99,16 @@ class NeighbourObjects(Behaviour):
                     except KeyError:
                         self.agent.shared_content[name] = {item}
                 else:
-                    name = name + str(self.agent.name)
                     try:
-                        self.blackboard.shared_content[name].add(item)
+                        slots[name].append(item)
                     except KeyError:
-                        self.blackboard.shared_content[name] = {item}
+                        slots[name] = [item]
             return Status.SUCCESS
         else:
             return Status.FAILURE
 
 
+@register
 class GoTo(Behaviour):
     """GoTo behavior for the agents.
 
@@ -126,8 +121,6 @@ class GoTo(Behaviour):
     def __init__(self, name):
         """Init method for the GoTo behavior."""
         super(GoTo, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -156,9 +149,7 @@ class GoTo(Behaviour):
         direction.
         """
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
             self.agent.direction = get_direction(
                 objects.location, self.agent.location)
             return Status.SUCCESS
@@ -167,6 +158,7 @@ class GoTo(Behaviour):
 
 
 # Behavior defined to move towards something
+@register
 class Towards(Behaviour):
     """Towards behaviors.
 
@@ -191,6 +183,7 @@ class Towards(Behaviour):
 
 
 # Behavior defined to move away from something
+@register
 class Away(Behaviour):
     """Away behavior."""
 
@@ -213,6 +206,7 @@ class Away(Behaviour):
 
 
 # Behavior defined for Randomwalk
+@register
 class RandomWalk(Behaviour):
     """Random walk behaviors."""
 
@@ -230,18 +224,18 @@ class RandomWalk(Behaviour):
 
     def update(self):
         """Compute random direction and set it to agent direction."""
-        delta_d = self.agent.model.random.normal(0, .1)
+        delta_d = self.agent.random.normal(0, .1)
         self.agent.direction = (self.agent.direction + delta_d) % (2 * np.pi)
         return Status.SUCCESS
 
 
+@register
 class IsMoveable(Behaviour):
     """Check is the item is moveable."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsMoveable, self).__init__(name)
-        self.blackboard = Blackboard()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -255,9 +249,7 @@ class IsMoveable(Behaviour):
     def update(self):
         """Get the object and check its movelable property."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
             if objects.moveable:
                 return Status.SUCCESS
             else:
@@ -267,6 +259,7 @@ class IsMoveable(Behaviour):
 
 
 # Behavior defined to move
+@register
 class Move(Behaviour):
     """Actually move the agent.
 
@@ -343,12 +336,21 @@ class Move(Behaviour):
             return False
 
     def update(self):
-        """Move logic for agent and fully carried object."""
+        """Move logic for agent and fully carried object.
+
+        If the grid batches moves, the agent is queued and moved with its
+        signals and fully carried objects at the end of the step.
+        """
         # Partially carried object
         if not self.update_partial_attached_objects():
             self.agent.accleration = self.agent.force / self.agent.get_weight()
             self.agent.velocity = self.agent.accleration * 1
 
+            grid = self.agent.model.grid
+            if grid.batch_moves:
+                grid.queue_move(self.agent, self.agent.velocity)
+                return Status.SUCCESS
+
             x = int(self.agent.location[0] + np.cos(
                 self.agent.direction) * self.agent.velocity)
             y = int(self.agent.location[1] + np.sin(
@@ -382,6 +384,7 @@ class Move(Behaviour):
 
 
 # Behavior define for donot move
+@register
 class DoNotMove(Behaviour):
     """Stand still behaviors."""
 
@@ -404,14 +407,13 @@ class DoNotMove(Behaviour):
 
 
 # Behavior to check carryable attribute of an object
+@register
 class IsCarryable(Behaviour):
     """Check carryable attribute of the item."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsCarryable, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, thing):
         """Setup."""
@@ -425,9 +427,7 @@ class IsCarryable(Behaviour):
     def update(self):
         """Check carryable property."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.thing, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.thing)[0]
             if objects.carryable:
                 return Status.SUCCESS
             else:
@@ -437,14 +437,13 @@ class IsCarryable(Behaviour):
 
 
 # Behavior to check carryable attribute of an object
+@register
 class IsDropable(Behaviour):
     """Check dropable property."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsDropable, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, thing):
         """Setup."""
@@ -458,9 +457,7 @@ class IsDropable(Behaviour):
     def update(self):
         """Check the dropable attribute."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.thing, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.thing)[0]
             if objects.dropable:
                 return Status.SUCCESS
             else:
@@ -470,14 +467,13 @@ class IsDropable(Behaviour):
 
 
 # Behavior define to check is the item is carrable on its own
+@register
 class IsSingleCarry(Behaviour):
     """Single carry behavior."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsSingleCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, thing):
         """Setup."""
@@ -492,9 +488,7 @@ class IsSingleCarry(Behaviour):
         """Logic to check if the object can be carried by single agent."""
         # Logic to carry
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.thing, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.thing)[0]
             if objects.weight:
                 if self.agent.get_capacity() > objects.calc_relative_weight():
                     return Status.SUCCESS
@@ -507,14 +501,13 @@ class IsSingleCarry(Behaviour):
 
 
 # Behavior define to check is the item is carrable on its own or not
+@register
 class IsMultipleCarry(Behaviour):
     """Multiple carry behaviour."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsMultipleCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, thing):
         """Setup."""
@@ -530,9 +523,7 @@ class IsMultipleCarry(Behaviour):
         try:
             # Logic to carry
             # objects = self.blackboard.shared_content[self.thing].pop()
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.thing, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.thing)[0]
             if objects.weight:
                 if self.agent.get_capacity() < objects.weight:
                     return Status.SUCCESS
@@ -544,14 +535,13 @@ class IsMultipleCarry(Behaviour):
             return Status.FAILURE
 
 
+@register
 class IsCarrying(Behaviour):
     """Condition check if the agent is carrying something."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsCarrying, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -578,14 +568,13 @@ class IsCarrying(Behaviour):
 
 
 # Behavior defined to drop the items currently carrying
+@register
 class Drop(Behaviour):
     """Drop behavior to drop items which is being carried."""
 
     def __init__(self, name):
         """Initialize."""
         super(Drop, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -625,14 +614,13 @@ class Drop(Behaviour):
             return Status.FAILURE
 
 
+@register
 class DropPartial(Behaviour):
     """Drop behavior for partially attached object."""
 
     def __init__(self, name):
         """Initialize."""
         super(DropPartial, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -676,14 +664,13 @@ class DropPartial(Behaviour):
 
 
 # Behavior defined to carry the items found
+@register
 class SingleCarry(Behaviour):
     """Carry behavior."""
 
     def __init__(self, name):
         """Initialize."""
         super(SingleCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -697,9 +684,7 @@ class SingleCarry(Behaviour):
     def update(self):
         """Carry logic to carry the object by the agent."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
             self.agent.attached_objects.append(objects)
             self.agent.model.grid.remove_object_from_grid(
                 objects.location, objects)
@@ -723,14 +708,13 @@ class SingleCarry(Behaviour):
             return Status.FAILURE
 
 
+@register
 class InitiateMultipleCarry(Behaviour):
     """Behavior to initiate multiple carry process."""
 
     def __init__(self, name):
         """Initialize."""
         super(InitiateMultipleCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -745,9 +729,7 @@ class InitiateMultipleCarry(Behaviour):
         """Logic to initiaite multiple carry process."""
         try:
             # objects = self.blackboard.shared_content[self.thing].pop()
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
             relative_weight = objects.calc_relative_weight()
             if relative_weight > 0:
                 if relative_weight - self.agent.get_capacity() >= 0:
@@ -783,14 +765,13 @@ class InitiateMultipleCarry(Behaviour):
             return Status.FAILURE
 
 
+@register
 class IsInPartialAttached(Behaviour):
     """Condition to check if the object is in partially attached list."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsInPartialAttached, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -822,14 +803,13 @@ class IsInPartialAttached(Behaviour):
             return Status.FAILURE
 
 
+@register
 class IsEnoughStrengthToCarry(Behaviour):
     """Condition to check if the agent has enough strength to carry."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsEnoughStrengthToCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -843,9 +823,7 @@ class IsEnoughStrengthToCarry(Behaviour):
     def update(self):
         """Logic to check if the agent has enough strength to carry."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
             if self.agent.get_capacity() >= objects.calc_relative_weight():
                 return Status.SUCCESS
             else:
@@ -854,14 +832,13 @@ class IsEnoughStrengthToCarry(Behaviour):
             return Status.FAILURE
 
 
+@register
 class IsMotionTrue(Behaviour):
     """Condition to check is the object is moving."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsMotionTrue, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -883,13 +860,13 @@ class IsMotionTrue(Behaviour):
             return Status.FAILURE
 
 
+@register
 class IsVisitedBefore(Behaviour):
     """Condition to check is the object is visited before."""
 
     def __init__(self, name):
         """Initialize."""
         super(IsVisitedBefore, self).__init__(name)
-        self.blackboard = Blackboard()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -903,9 +880,7 @@ class IsVisitedBefore(Behaviour):
     def update(self):
         """Logic to check is the object is visited before."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
             if objects:
                 return Status.SUCCESS
             else:
@@ -914,14 +889,13 @@ class IsVisitedBefore(Behaviour):
             return Status.FAILURE
 
 
+@register
 class MultipleCarry(Behaviour):
     """Multiple carry behavior."""
 
     def __init__(self, name):
         """Initialize."""
         super(MultipleCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -935,9 +909,7 @@ class MultipleCarry(Behaviour):
     def update(self):
         """Logic for multiple carry."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
 
             self.agent.model.grid.remove_object_from_grid(
                 objects.location, objects)
@@ -947,6 +919,7 @@ class MultipleCarry(Behaviour):
 
 
 # Lets start some communication behaviors
+@register
 class SignalDoesNotExists(Behaviour):
     """Signal exists behavior.
 
@@ -956,8 +929,6 @@ class SignalDoesNotExists(Behaviour):
     def __init__(self, name):
         """Initialize."""
         super(SignalDoesNotExists, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -972,9 +943,7 @@ class SignalDoesNotExists(Behaviour):
         """Logic for sending signal."""
         try:
             # Find the object the agent is trying to signal
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
 
             if len(self.agent.signals) > 0:
                 # Check the agetns signals array for its exitance
@@ -993,6 +962,7 @@ class SignalDoesNotExists(Behaviour):
             return Status.FAILURE
 
 
+@register
 class SendSignal(Behaviour):
     """Signalling behavior.
 
@@ -1004,8 +974,6 @@ class SendSignal(Behaviour):
     def __init__(self, name):
         """Initialize."""
         super(SendSignal, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -1019,9 +987,7 @@ class SendSignal(Behaviour):
     def update(self):
         """Logic for sending signal."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
 
             # Initialize the signal object
             signal = Signal(
@@ -1041,6 +1007,7 @@ class SendSignal(Behaviour):
             return Status.FAILURE
 
 
+@register
 class ReceiveSignal(Behaviour):
     """Receive signals from other agents.
 
@@ -1053,8 +1020,6 @@ class ReceiveSignal(Behaviour):
     def __init__(self, name):
         """Initialize."""
         super(ReceiveSignal, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item='Signal'):
         """Setup."""
@@ -1068,9 +1033,7 @@ class ReceiveSignal(Behaviour):
     def update(self):
         """Logic for receiving signal."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
             # Extract the information from the signal object and
             # store into the agent memory
             objects = objects.communicated_object
@@ -1084,6 +1047,7 @@ class ReceiveSignal(Behaviour):
             return Status.FAILURE
 
 
+@register
 class CueDoesNotExists(Behaviour):
     """Cue does not exists behavior.
 
@@ -1093,8 +1057,6 @@ class CueDoesNotExists(Behaviour):
     def __init__(self, name):
         """Initialize."""
         super(CueDoesNotExists, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -1109,16 +1071,13 @@ class CueDoesNotExists(Behaviour):
         """Logic for cue checking."""
         try:
             # Find the object the agent is trying to cue
-            grids = self.agent.model.grid.get_neighborhood(
-                self.agent.location, self.agent.radius)
-            cue_objects = self.agent.model.grid.get_objects_from_list_of_grid(
-                'Cue', grids)
+            cue_objects = self.agent.perception.sense(
+                self.agent.model.grid, self.agent.location,
+                self.agent.radius, 'Cue')
 
             if len(cue_objects) > 0:
                 # Check the agetns cue list for its exitance
-                objects = ObjectsStore.find(
-                    self.blackboard.shared_content, self.agent.shared_content,
-                    self.item, self.agent.name)[0]
+                objects = ObjectsStore.find(self.agent, self.item)[0]
                 cue_in_list = [
                     cue.object_to_communicate for cue in cue_objects]
                 if objects not in cue_in_list:
@@ -1133,6 +1092,7 @@ class CueDoesNotExists(Behaviour):
 
 
 # Communication behaviors related to cue
+@register
 class DropCue(Behaviour):
     """Drop cue in the environment.
 
@@ -1144,8 +1104,6 @@ class DropCue(Behaviour):
     def __init__(self, name):
         """Initialize."""
         super(DropCue, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Setup."""
@@ -1159,9 +1117,7 @@ class DropCue(Behaviour):
     def update(self):
         """Logic for dropping cue."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
 
             # Initialize the cue object
             cue = Cue(
@@ -1181,6 +1137,7 @@ class DropCue(Behaviour):
             return Status.FAILURE
 
 
+@register
 class PickCue(Behaviour):
     """Pick cue in the environment.
 
@@ -1191,8 +1148,6 @@ class PickCue(Behaviour):
     def __init__(self, name):
         """Initialize."""
         super(PickCue, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item='Cue'):
         """Setup."""
@@ -1206,9 +1161,7 @@ class PickCue(Behaviour):
     def update(self):
         """Logic for pickup cue."""
         try:
-            objects = ObjectsStore.find(
-                self.blackboard.shared_content, self.agent.shared_content,
-                self.item, self.agent.name)[0]
+            objects = ObjectsStore.find(self.agent, self.item)[0]
 
             # Get information from the cue. For now, the agents orients
             # its direction towards the object that is communicated
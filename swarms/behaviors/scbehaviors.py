@@ -9,9 +9,10 @@ flexibility for the user to use the primitive behaviors along with
 feature rich behaviors.
 """
 
-from py_trees import Behaviour, Blackboard
+from py_trees import Behaviour
 from py_trees.composites import Sequence, Selector
 from py_trees.trees import BehaviourTree
+from swarms.behaviors.registry import register
 from swarms.behaviors.sbehaviors import (
     GoTo, Towards, Move, Away,
     IsCarryable, IsSingleCarry, SingleCarry,
@@ -29,6 +30,7 @@ from swarms.behaviors.sbehaviors import (
 # them into a single behaviors with sequence and call it MoveTowards
 
 
+@register
 class MoveTowards(Behaviour):
     """MoveTowards behavior for the agents.
 
@@ -40,8 +42,6 @@ class MoveTowards(Behaviour):
     def __init__(self, name):
         """Init method for the MoveTowards behavior."""
         super(MoveTowards, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -85,6 +85,7 @@ class MoveTowards(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class MoveAway(Behaviour):
     """MoveAway behavior for the agents.
 
@@ -96,8 +97,6 @@ class MoveAway(Behaviour):
     def __init__(self, name):
         """Init method for the MoveAway behavior."""
         super(MoveAway, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -141,6 +140,7 @@ class MoveAway(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class CompositeSingleCarry(Behaviour):
     """CompositeSingleCarry behavior for the agents.
 
@@ -153,8 +153,6 @@ class CompositeSingleCarry(Behaviour):
     def __init__(self, name):
         """Init method for the CompositeSingleCarry behavior."""
         super(CompositeSingleCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -199,6 +197,7 @@ class CompositeSingleCarry(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class CompositeMultipleCarry(Behaviour):
     """CompositeMultipleCarry behavior for the agents.
 
@@ -211,8 +210,6 @@ class CompositeMultipleCarry(Behaviour):
     def __init__(self, name):
         """Init method for the CompositeSingleCarry behavior."""
         super(CompositeMultipleCarry, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -287,6 +284,7 @@ class CompositeMultipleCarry(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class CompositeDrop(Behaviour):
     """CompositeDrop behavior for the agents.
 
@@ -299,8 +297,6 @@ class CompositeDrop(Behaviour):
     def __init__(self, name):
         """Init method for the CompositeDrop behavior."""
         super(CompositeDrop, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -339,6 +335,7 @@ class CompositeDrop(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class CompositeDropPartial(Behaviour):
     """CompositeDropPartial behavior for the agents.
 
@@ -351,8 +348,6 @@ class CompositeDropPartial(Behaviour):
     def __init__(self, name):
         """Init method for the CompositeDrop behavior."""
         super(CompositeDropPartial, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item):
         """Have defined the setup method.
@@ -391,6 +386,7 @@ class CompositeDropPartial(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class Explore(Behaviour):
     """Explore behavior for the agents.
 
@@ -402,8 +398,6 @@ class Explore(Behaviour):
     def __init__(self, name):
         """Init method for the Explore behavior."""
         super(Explore, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item=None):
         """Have defined the setup method.
@@ -444,6 +438,7 @@ class Explore(Behaviour):
 
 
 # Communication composite behaviors
+@register
 class CompositeSendSignal(Behaviour):
     """Send signal behavior for the agents.
 
@@ -456,8 +451,6 @@ class CompositeSendSignal(Behaviour):
     def __init__(self, name):
         """Init method for the SendSignal behavior."""
         super(CompositeSendSignal, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item=None):
         """Have defined the setup method.
@@ -497,6 +490,7 @@ class CompositeSendSignal(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class CompositeReceiveSignal(Behaviour):
     """Receive signal behavior for the agents.
 
@@ -508,8 +502,6 @@ class CompositeReceiveSignal(Behaviour):
     def __init__(self, name):
         """Init method for the SendSignal behavior."""
         super(CompositeReceiveSignal, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item=None):
         """Have defined the setup method.
@@ -549,6 +541,7 @@ class CompositeReceiveSignal(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class CompositeDropCue(Behaviour):
     """Drop cue behavior for the agents.
 
@@ -560,8 +553,6 @@ class CompositeDropCue(Behaviour):
     def __init__(self, name):
         """Init method for the SendSignal behavior."""
         super(CompositeDropCue, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item=None):
         """Have defined the setup method.
@@ -601,6 +592,7 @@ class CompositeDropCue(Behaviour):
         return self.behaviour_tree.root.status
 
 
+@register
 class CompositePickCue(Behaviour):
     """Pick cue behavior for the agents.
 
@@ -612,8 +604,6 @@ class CompositePickCue(Behaviour):
     def __init__(self, name):
         """Init method for the SendSignal behavior."""
         super(CompositePickCue, self).__init__(name)
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
 
     def setup(self, timeout, agent, item=None):
         """Have defined the setup method.
@@ -6,6 +6,8 @@ Core Objects: Agent
 
 """
 
+from swarms.lib.space import Perception
+
 
 class Agent:
     """Base class for a agent."""
@@ -34,6 +36,11 @@ class Agent:
                                     partially attached to the agent. Useful
                                     for multi-carry behaviors
 
+            stream: own random stream of the agent if the model spawns
+                    streams, else None
+
+            perception: objects around the agent sensed in the tick
+
         """
         self.name = name
         self.model = model
@@ -43,6 +50,17 @@ class Agent:
         self.attached_objects = []
         self.partial_attached_objects = []
         self.signals = []
+        self.stream = None
+        self.perception = Perception()
+        if getattr(model, 'streams', False):
+            self.stream = model.spawn_random()
+
+    @property
+    def random(self):
+        """Random stream of the agent, or the model one if it has none."""
+        if self.stream is None:
+            return self.model.random
+        return self.stream
 
     def step(self):
         """Represent a single step of the agent."""
@@ -96,3 +114,66 @@ class Agent:
             return 0
         else:
             return relative_capacity
+
+
+class BatchAttribute:
+    """Agent attribute kept in a column of a batch state.
+
+    While the agent is scheduled by BatchActivation the value is a row of
+    a NumPy array shared by all the agents of its class, so batch kernels
+    can update the whole population at once. Reading it gives a tuple for
+    vector attributes and a number otherwise, and writing it writes the
+    row. Outside of a batch state the value is kept on the agent.
+    """
+
+    def __init__(self, shape=(), dtype=float):
+        """Create the attribute with the shape and type of one value."""
+        self.shape = shape
+        self.dtype = dtype
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        """Remember the attribute name."""
+        self.name = name
+
+    def __get__(self, agent, owner=None):
+        """Read the value from the batch state or the agent."""
+        if agent is None:
+            return self
+        state = agent.__dict__.get('batch_state')
+        if state is None:
+            try:
+                return agent.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name)
+        value = state.columns[self.name][agent.__dict__['batch_index']]
+        if self.shape:
+            return tuple(value.tolist())
+        return value.item()
+
+    def __set__(self, agent, value):
+        """Write the value to the batch state or the agent."""
+        state = agent.__dict__.get('batch_state')
+        if state is None:
+            agent.__dict__[self.name] = value
+        else:
+            state.columns[self.name][agent.__dict__['batch_index']] = value
+
+
+class BatchAgent(Agent):
+    """Base class for agents stepped together by a batch kernel.
+
+    Subclasses define a classmethod step_batch(state) which steps every
+    agent of the class in one call through the arrays of the state, see
+    BatchActivation. location and direction are batch attributes, and
+    subclasses can declare more with BatchAttribute.
+    """
+
+    location = BatchAttribute((2,), int)
+    direction = BatchAttribute((), float)
+
+    def __init__(self, name, model):
+        """Create a new agent outside of any batch state."""
+        super().__init__(name, model)
+        self.batch_state = None
+        self.batch_index = None
@@ -2,17 +2,200 @@
 """
 The model class for swarm framework.
 
-Core Objects: Model
+Core Objects: Model, BufferedRandom, Sampler, Replicates
 
 """
 import datetime as dt
+import gzip
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 import numpy
 
+# Model of the forked run being started, read by the forked worker
+_forked_model = None
+
+
+def _run_forked(function, args):
+    """Call the function with the model copied into the worker."""
+    return function(_forked_model, *args)
+
+
+def _fork(model, function, args):
+    """Run function(model, *args) in a worker forked right away."""
+    global _forked_model
+    executor = ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context('fork'))
+    _forked_model = model
+    try:
+        future = executor.submit(_run_forked, function, args)
+    finally:
+        _forked_model = None
+    executor.shutdown(wait=False)
+    return future
+
+
+def _run_replicates(replicates, indices, steps):
+    """Run some of the replicates in a forked worker.
+
+    Returns the steps taken, the models and the sampled values of each,
+    which are pickled back.
+    """
+    taken = replicates.run_indices(indices, steps)
+    return [
+        (taken[index], replicates.models[index], [
+            sampler.values for sampler in replicates.runs[index][0]])
+        for index in indices]
+
+
+def _rebuild(model):
+    """Build the behavior trees of an unpickled model and restore it."""
+    if model.schedule is not None:
+        for agent in model.schedule.agents:
+            bt = getattr(agent, 'bt', None)
+            if getattr(bt, 'constructed', False):
+                bt.rebuild()
+    model.restore()
+
+
+class BufferedRandom:
+    """Random stream handing out scalar draws from pre-drawn blocks.
+
+    Scalar calls of normal, rand and randint take the next number of a
+    block of standard normal or uniform numbers drawn in one call, which
+    avoids the fixed cost of a NumPy call per number. Calls with a size
+    and the other RandomState methods go to the wrapped stream. Draws
+    depend only on the seed and the order of the calls, but they differ
+    from the draws of the unbuffered stream.
+    """
+
+    def __init__(self, random, size=1024):
+        """Wrap a RandomState.
+
+        Args:
+            random: RandomState to draw the blocks from
+
+            size: numbers drawn per block
+
+        """
+        self.random = random
+        self.size = size
+        self.normals = []
+        self.uniforms = []
+
+    def __getattr__(self, name):
+        """Get the other methods from the wrapped stream."""
+        try:
+            random = vars(self)['random']
+        except KeyError:
+            raise AttributeError(name)
+        return getattr(random, name)
+
+    def standard_normal(self, size=None):
+        """Draw from the standard normal distribution."""
+        if size is not None:
+            return self.random.standard_normal(size)
+        try:
+            return self.normals.pop()
+        except IndexError:
+            self.normals = self.random.standard_normal(self.size).tolist()
+            return self.normals.pop()
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        """Draw from the normal distribution."""
+        if size is not None or not (
+                isinstance(loc, (int, float)) and
+                isinstance(scale, (int, float))):
+            return self.random.normal(loc, scale, size)
+        try:
+            return loc + scale * self.normals.pop()
+        except IndexError:
+            return loc + scale * self.standard_normal()
+
+    def rand(self, *args):
+        """Draw uniform numbers in [0, 1)."""
+        if args:
+            return self.random.rand(*args)
+        try:
+            return self.uniforms.pop()
+        except IndexError:
+            self.uniforms = self.random.random_sample(self.size).tolist()
+            return self.uniforms.pop()
+
+    def random_sample(self, size=None):
+        """Draw uniform numbers in [0, 1)."""
+        if size is not None:
+            return self.random.random_sample(size)
+        return self.rand()
+
+    def randint(self, low, high=None, size=None, dtype=int):
+        """Draw integers from low to high, high excluded."""
+        if size is not None:
+            return self.random.randint(low, high, size, dtype)
+        if high is None:
+            low, high = 0, low
+        try:
+            return low + int(self.uniforms.pop() * (high - low))
+        except IndexError:
+            return low + int(self.rand() * (high - low))
+
+
+class Sampler:
+    """Metric of a model sampled every few steps by Model.run.
+
+    function(model) is called after every period steps and the values it
+    returns are kept in values. reaches and plateau give stop predicates
+    for Model.run based on the samples.
+    """
+
+    def __init__(self, function, period=1):
+        """Create a sampler without samples.
+
+        Args:
+            function: called with the model, returns the metric
+
+            period: number of steps between two samples
+
+        """
+        self.function = function
+        self.period = period
+        self.values = []
+
+    def sample(self, model):
+        """Sample the metric of the model."""
+        value = self.function(model)
+        self.values.append(value)
+        return value
+
+    def reaches(self, value):
+        """Get a predicate true once the last sample is at least value."""
+        def reached(model):
+            return bool(self.values) and self.values[-1] >= value
+        return reached
+
+    def plateau(self, samples, tolerance=0.0):
+        """Get a predicate true once the last samples are flat.
+
+        The metric is flat when the last samples values differ by at most
+        tolerance.
+        """
+        def flat(model):
+            if len(self.values) < samples:
+                return False
+            values = self.values[-samples:]
+            return max(values) - min(values) <= tolerance
+        return flat
+
 
 class Model:
     """Base class for models."""
 
-    def __init__(self, seed=None):
+    # Attributes left out of checkpoints, like the database connection and
+    # the viewer. They are None after a load until restore sets them again
+    checkpoint_exclude = ('connect', 'ui')
+
+    def __init__(self, seed=None, streams=False, buffer_size=None):
         """Create a new model.
 
         Overload this method with the actual code to
@@ -21,9 +204,18 @@ class Model:
         Args:
             seed: seed for the random number generator
 
+            streams: give every agent and scheduler its own random stream
+                     spawned from the seed. Draws of one agent then do not
+                     depend on how many other agents drew before it
+
+            buffer_size: hand out the scalar draws of the model and its
+                         streams from blocks of this many numbers, see
+                         BufferedRandom
+
         Attributes:
             schedule: schedule object
             running: a bool indicating if the model should continue running
+            seed_sequence: root of the spawned random streams
 
         """
         # seed both the numpy and Python random number generators
@@ -32,11 +224,131 @@ class Model:
                 dt.datetime.now())) % 39916801
         else:
             self.seed = seed
-        self.random = numpy.random.RandomState(seed)    # pylint: disable=E1101
+        self.streams = streams
+        self.buffer_size = buffer_size
+        self.seed_sequence = numpy.random.SeedSequence(self.seed)
+        if streams:
+            self.random = self.spawn_random()
+        else:
+            self.random = numpy.random.RandomState(  # pylint: disable=E1101
+                seed)
+            if buffer_size:
+                self.random = BufferedRandom(self.random, buffer_size)
 
         self.running = True
         self.schedule = None
 
+    def spawn_random(self):
+        """Create a new independent random stream from the model seed.
+
+        Streams are spawned in order from the seed sequence, so the n-th
+        stream of two models with the same seed is the same. They use the
+        PCG64 generator behind the RandomState methods used by the
+        behaviors.
+        """
+        seed, = self.seed_sequence.spawn(1)
+        random = numpy.random.RandomState(numpy.random.PCG64(seed))
+        if self.buffer_size:
+            random = BufferedRandom(random, self.buffer_size)
+        return random
+
+    def __getstate__(self):
+        """Get the attributes to pickle without the excluded ones."""
+        state = vars(self).copy()
+        for name in self.checkpoint_exclude:
+            if name in state:
+                state[name] = None
+        return state
+
+    def save_checkpoint(self, path, compresslevel=1, background=False):
+        """Write the model with its grid, schedule and agents to a file.
+
+        The model is pickled and gzip compressed, including the random
+        streams. Behavior trees are stored as their xmlstring and built
+        again on load. The file is written next to path first and then
+        renamed, so a crash while writing keeps the previous checkpoint.
+
+        With background the checkpoint is written by a forked process,
+        which sees the model as it was through copy on write memory, and
+        the process is returned so the caller can join it.
+        """
+        if background:
+            process = multiprocessing.get_context('fork').Process(
+                target=self.save_checkpoint, args=(path, compresslevel))
+            process.start()
+            return process
+        temp = '{}.{}.tmp'.format(path, os.getpid())
+        with gzip.open(temp, 'wb', compresslevel=compresslevel) as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """Read a model written by save_checkpoint.
+
+        The behavior trees of the scheduled agents are built from their
+        xmlstring without drawing from the random streams, then restore
+        is called.
+        """
+        with gzip.open(path, 'rb') as file:
+            model = pickle.load(file)
+        _rebuild(model)
+        return model
+
+    def fork(self, function, *args):
+        """Run function(model, *args) in a forked copy of the model.
+
+        The worker process is forked right away, so it sees the model as
+        it is now through copy on write memory while this model keeps
+        stepping. The function has to be defined at module level and its
+        result is pickled back. Returns a concurrent.futures.Future for
+        the result. The worker must not use the database connection of
+        the model, it should open its own.
+        """
+        return _fork(self, function, args)
+
+    def restore(self):
+        """Set up what the checkpoint left out after a load.
+
+        Overload to open the database connection and the viewer again.
+        """
+        pass
+
+    def run(self, steps=None, samplers=(), stop=()):
+        """Step the model until a stop condition is met.
+
+        After each step the samplers due are sampled, then the stop
+        predicates are called with the model. The run ends when one of
+        them returns True, when the budget of steps is used up or when
+        running is set to False.
+
+        Args:
+            steps: step budget, unbounded if None
+
+            samplers: Sampler objects of the metrics to follow
+
+            stop: predicates called with the model after each step
+
+        Returns the number of steps taken.
+        """
+        taken = 0
+        while self.running and (steps is None or taken < steps):
+            taken += 1
+            if self.run_step(taken, samplers, stop):
+                break
+        return taken
+
+    def run_step(self, taken, samplers=(), stop=()):
+        """Take the step number taken of a run.
+
+        Returns True if one of the stop predicates is met.
+        """
+        self.step()
+        for sampler in samplers:
+            if taken % sampler.period == 0:
+                sampler.sample(self)
+        return any(predicate(self) for predicate in stop)
+
     def run_model(self):
         """Run the model until the end condition is reached.
 
@@ -48,3 +360,114 @@ class Model:
     def step(self):
         """Single step. Fill in here."""
         pass
+
+
+class Replicates:
+    """Independent replicates of a model built once and run together.
+
+    make(seed) builds one replicate. The seeds are generated from seed,
+    so every replicate draws its own random numbers. The grids of the
+    replicates share the layout and the footprint cache of the first
+    one, which is filled once for all of them.
+
+    With workers, run forks that many workers like Model.fork once the
+    replicates are built, so the workers do not import, parse the world
+    and build the behavior trees again. Each worker runs a contiguous
+    share of the replicates, whose models and sampled values are pickled
+    back when they are done. The models come back without what
+    checkpoint_exclude leaves out, so restore is called on them like
+    after load_checkpoint. step always steps the replicates in this
+    process.
+    """
+
+    def __init__(self, make, replicates, seed=None, workers=None):
+        """Build the replicates.
+
+        Args:
+            make: function called with a seed, returns a model
+
+            replicates: number of replicates
+
+            seed: seed of the replicate seeds
+
+            workers: number of forked workers run uses, None to run the
+                     replicates in this process
+
+        """
+        seeds = numpy.random.SeedSequence(seed).generate_state(replicates)
+        self.models = [make(int(seed)) for seed in seeds]
+        self.workers = workers
+        self.runs = None
+        self.share_layouts()
+
+    def share_layouts(self):
+        """Make the grids of the replicates share the first layout."""
+        first = getattr(self.models[0], 'grid', None)
+        if first is not None:
+            for model in self.models[1:]:
+                model.grid.share_layout(first)
+
+    def __len__(self):
+        """Return the number of replicates."""
+        return len(self.models)
+
+    def step(self):
+        """Step all the running replicates once."""
+        for model in self.models:
+            if model.running:
+                model.step()
+
+    def run(self, steps=None, setup=None):
+        """Step the replicates together until each meets its stop condition.
+
+        setup(model) returns the samplers and the stop predicates of a
+        replicate, which are used like in Model.run. Replicates which are
+        done drop out while the others keep stepping.
+
+        Returns the number of steps taken by each replicate.
+        """
+        self.runs = [
+            setup(model) if setup is not None else ((), ())
+            for model in self.models]
+        indices = list(range(len(self.models)))
+        if not self.workers or self.workers == 1:
+            taken = self.run_indices(indices, steps)
+            return [taken[index] for index in indices]
+        shares = [
+            share.tolist() for share in numpy.array_split(
+                indices, min(self.workers, len(indices)))]
+        futures = [
+            _fork(self, _run_replicates, (share, steps)) for share in shares]
+        taken = [0] * len(self.models)
+        for share, future in zip(shares, futures):
+            for index, (steps_taken, model, values) in zip(
+                    share, future.result()):
+                _rebuild(model)
+                taken[index] = steps_taken
+                self.models[index] = model
+                for sampler, sampled in zip(self.runs[index][0], values):
+                    sampler.values = sampled
+        self.share_layouts()
+        return taken
+
+    def run_indices(self, indices, steps=None):
+        """Step the replicates with these indices like run.
+
+        Returns a dictionary of the steps taken by each of them.
+        """
+        runs = self.runs
+        taken = dict.fromkeys(indices, 0)
+        active = list(indices)
+        while active:
+            running = []
+            for index in active:
+                model = self.models[index]
+                if not model.running or (
+                        steps is not None and taken[index] >= steps):
+                    continue
+                taken[index] += 1
+                samplers, stop = runs[index]
+                if not model.run_step(taken[index], samplers, stop):
+                    running.append(index)
+            active = running
+        return taken
@@ -4,7 +4,16 @@ import numpy as np
 
 
 class EnvironmentObject:
-    """Base environment object."""
+    """Base environment object.
+
+    Environment objects use __slots__ so long runs which create many
+    foods, signals and cues stay small. Models tag the objects with
+    agent_name and phenotype, so they have a slot as well. Unset slots
+    raise AttributeError like missing attributes.
+    """
+
+    __slots__ = (
+        'id', 'location', 'radius', 'carryable', 'agent_name', 'phenotype')
 
     def __init__(self, id=1, location=(0, 0), radius=20):
         """Initialize."""
@@ -17,6 +26,8 @@ class EnvironmentObject:
 class Hub(EnvironmentObject):
     """Hub object."""
 
+    __slots__ = ('dropable',)
+
     def __init__(self, id=1, location=(0, 0), radius=20):
         """Initialize."""
         super().__init__(id, location, radius)
@@ -28,6 +39,8 @@ class Hub(EnvironmentObject):
 class Sites(EnvironmentObject):
     """Site object."""
 
+    __slots__ = ('q_value',)
+
     def __init__(self, id=1, location=(0, 0), radius=20, q_value=0.5):
         """Initialize.
 
@@ -42,6 +55,8 @@ class Sites(EnvironmentObject):
 class Source(EnvironmentObject):
     """Source object."""
 
+    __slots__ = ('food_units',)
+
     def __init__(self, id=1, location=(0, 0), radius=20, food_units=0.5):
         """Initialize.
 
@@ -57,6 +72,8 @@ class Source(EnvironmentObject):
 class Obstacles(EnvironmentObject):
     """Obstacle object."""
 
+    __slots__ = ('potential_field', 'dropable')
+
     def __init__(self, id=1, location=(0, 0), radius=20):
         """Initialize."""
         super().__init__(id, location, radius)
@@ -69,6 +86,8 @@ class Obstacles(EnvironmentObject):
 class Carryable(EnvironmentObject):
     """Carryable class of object."""
 
+    __slots__ = ('weight', 'capacity', 'motion', 'agents', 'direction')
+
     def __init__(self, id=1, location=(0, 0), radius=20):
         """Initialize.
 
@@ -137,6 +156,8 @@ class Carryable(EnvironmentObject):
 class Communication(EnvironmentObject):
     """Base class for communication."""
 
+    __slots__ = ('communicated_object', 'communicated_location')
+
     def __init__(self, id=1, location=(
             0, 0), radius=20, object_to_communicate=None):
         """Initialize."""
@@ -151,6 +172,8 @@ class Communication(EnvironmentObject):
 class Signal(Communication):
     """Signal object which broadcasts information."""
 
+    __slots__ = ()
+
     def __init__(self, id=1, location=(
             0, 0), radius=20, object_to_communicate=None):
         """Initialize."""
@@ -161,6 +184,8 @@ class Signal(Communication):
 class Cue(Communication):
     """Cue object with provides stationary information."""
 
+    __slots__ = ()
+
     def __init__(self, id=1, location=(
             0, 0), radius=20, object_to_communicate=None):
         """Initialize."""
@@ -171,6 +196,8 @@ class Cue(Communication):
 class Traps(EnvironmentObject):
     """Trap object which kills the agents."""
 
+    __slots__ = ()
+
     def __init__(self, id=1, location=(0, 0), radius=20):
         """Initialize."""
         super().__init__(id, location, radius)
@@ -181,6 +208,8 @@ class Traps(EnvironmentObject):
 class Food(Carryable):
     """Food object which is carried by agents."""
 
+    __slots__ = ()
+
     def __init__(self, id=1, location=(0, 0), radius=2):
         """Initialize."""
         super().__init__(id, location, radius)
@@ -190,6 +219,8 @@ class Food(Carryable):
 class Debris(Carryable):
     """Debris object."""
 
+    __slots__ = ()
+
     def __init__(self, id=1, location=(0, 0), radius=2, weight=5):
         """Initialize."""
         super().__init__(id, location, radius)
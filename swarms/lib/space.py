@@ -6,9 +6,15 @@ Grid: base grid, a simple dictionary.
 
 """
 import math
+from collections import OrderedDict, namedtuple
+from itertools import chain
 import numpy as np
 
 
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'hit_rate', 'maxsize', 'currsize'])
+
+
 class Grid:
     """Grid class.
 
@@ -19,13 +25,21 @@ class Grid:
     # pylint: disable=too-many-instance-attributes
     # Nine is reasonable in this grid class
 
-    def __init__(self, width, height, grid_size=10):
+    def __init__(
+            self, width, height, grid_size=10, footprint_cache_size=65536,
+            sparse=False):
         """Constructors for grid.
 
         Args:
             width: total width
             height: total height
             grid_size: granularity of the size of grid
+            footprint_cache_size: maximum number of neighborhoods
+                                    remembered by get_neighborhood
+            sparse: if True, grids are materialised on first insertion
+                    and released when they become empty. The grid and
+                    grid_keys views are not built. Use it for very
+                    large worlds
 
         Attributes:
             x_limit: x-axis length in both direction
@@ -34,8 +48,32 @@ class Grid:
             grid: dictionary object which value is adjacent points
                     of grid and its value is the grid name
 
-            grid_objects: dictionary object which value is the grid name
-                            and its value is the list of environment objects
+            grid_objects: dictionary object which key is the grid name
+                            and its value is a dictionary of buckets. Each
+                            bucket is keyed by the type name of the
+                            environment objects and holds them in an
+                            insertion ordered dictionary. In sparse mode
+                            only the occupied grids have an entry
+
+            grid_keys: list which maps the grid name to its bounding box.
+                        It is the integer indexed view of grid
+
+            footprints: least recently used cache of neighborhoods keyed
+                        by the center grid and the radius in grid units
+
+            watchers: dictionary which key is the grid value and its value
+                        is a dictionary of callbacks, called once when an
+                        object enters the grid
+
+            version: count of the objects put in or taken out of grids.
+                        Perceptions of the agents are valid while it
+                        stays the same
+
+            batch_moves: if True, the Move behaviors queue their agent
+                            in moves and the scheduler moves them all with
+                            flush_moves at the end of the step
+
+            moves: queued objects with their speed
 
         """
         self.width = width
@@ -43,8 +81,21 @@ class Grid:
         self.x_limit = width / 2
         self.y_limit = height / 2
         self.grid_size = grid_size
+        self.sparse = sparse
         self.grid = dict()
         self.grid_objects = dict()
+        self.grid_keys = [None]
+        self.footprints = OrderedDict()
+        self.footprint_cache_size = footprint_cache_size
+        self.footprint_hits = 0
+        self.footprint_misses = 0
+        # Candidate count above which radius queries use NumPy
+        self.vectorise_threshold = 4096
+        # Callbacks waiting for an object to enter a grid
+        self.watchers = dict()
+        self.version = 0
+        self.batch_moves = False
+        self.moves = []
         # self.width_fix = int(self.x_limit % self.grid_size)
         # self.height_fix = int(self.y_limit % self.grid_size)
 
@@ -54,6 +105,13 @@ class Grid:
                     print("Grid size invalid")
                     exit(1)
 
+        # Number of grids along each axis
+        self.width_scale = int(self.width / self.grid_size)
+        self.height_scale = int(self.height / self.grid_size)
+        self.grid_len = self.width_scale * self.height_scale
+        if self.sparse:
+            return
+
         # Create list for x cordinate & y cordinate to create grid
         list_xcords = np.arange(
             -self.width / 2, self.width / 2, self.grid_size).tolist()
@@ -68,10 +126,30 @@ class Grid:
                 x_2 = xcord + self.grid_size
                 y_2 = ycord + self.grid_size
                 self.grid[(x_1, y_1), (x_2, y_2)] = indx
-                self.grid_objects[indx] = []
+                self.grid_keys.append(((x_1, y_1), (x_2, y_2)))
+                self.grid_objects[indx] = dict()
                 indx += 1
 
-        self.grid_len = indx - 1
+    def __getstate__(self):
+        """Pickle without the footprint cache, which fills up again."""
+        state = vars(self).copy()
+        state['footprints'] = OrderedDict()
+        return state
+
+    def share_layout(self, other):
+        """Use the grid views and the footprint cache of another grid.
+
+        Grids of replicate worlds have the same geometry, so the cached
+        footprints of one are valid for the other. Objects stay in their
+        own grid.
+        """
+        if type(other) is not type(self) or (
+                other.width, other.height, other.grid_size, other.sparse) != (
+                self.width, self.height, self.grid_size, self.sparse):
+            raise ValueError('Grids with different layouts')
+        self.grid = other.grid
+        self.grid_keys = other.grid_keys
+        self.footprints = other.footprints
 
     def modify_points(self, point):
         """Modify poitns if the location line in the grid line."""
@@ -101,14 +179,55 @@ class Grid:
             point[0] % self.grid_size), point[1] + self.grid_size - 1 * (
                 point[1] % self.grid_size))
 
+    def find_cell(self, point):
+        """Find the grid value of the point using integer arithmetic.
+
+        The grid value is derived directly from floor division of the
+        coordinates, so no bounding box is built or hashed. Points on the
+        right and top boundary of the environment belong to the last grid.
+        """
+        column = int((point[0] + self.x_limit) // self.grid_size)
+        row = int((point[1] + self.y_limit) // self.grid_size)
+        if column == self.width_scale:
+            column -= 1
+        if row == self.height_scale:
+            row -= 1
+        if 0 <= column < self.width_scale and 0 <= row < self.height_scale:
+            return row * self.width_scale + column + 1
+        print('KeyError', 'No grid key for ', point)
+        exit()
+
+    def find_cells(self, points):
+        """Find the grid values of an array of points.
+
+        Gives the same values as find_cell for each row of points. Raises
+        ValueError if a point is outside of the environment.
+        """
+        points = np.asarray(points, dtype=float)
+        columns = np.floor_divide(
+            points[:, 0] + self.x_limit, self.grid_size).astype(int)
+        rows = np.floor_divide(
+            points[:, 1] + self.y_limit, self.grid_size).astype(int)
+        columns[columns == self.width_scale] -= 1
+        rows[rows == self.height_scale] -= 1
+        if ((columns < 0) | (columns >= self.width_scale) | (rows < 0) | (
+                rows >= self.height_scale)).any():
+            raise ValueError('No grid key for points')
+        return rows * self.width_scale + columns + 1
+
+    def get_grid_key(self, grid_value):
+        """Get the bounding box of a grid from its grid value."""
+        if not self.sparse:
+            return self.grid_keys[grid_value]
+        row, column = divmod(grid_value - 1, self.width_scale)
+        x_1 = column * self.grid_size - self.x_limit
+        y_1 = row * self.grid_size - self.y_limit
+        return ((x_1, y_1), (x_1 + self.grid_size, y_1 + self.grid_size))
+
     def find_grid(self, point):
         """Find the grid based on the point passed."""
-        grid_key = (self.find_lowerbound(point), self.find_upperbound(point))
-        try:
-            return grid_key, self.grid[grid_key]
-        except KeyError:
-            print('KeyError', 'No grid key for ', grid_key)
-            exit()
+        grid_value = self.find_cell(point)
+        return self.get_grid_key(grid_value), grid_value
 
     def get_horizontal_neighbours(self, center_grid, scale, width_scale):
         """Get the neighboring horizontal grids."""
@@ -127,51 +246,188 @@ class Grid:
         horizontal_grid = list(range(horizontal_start, horizontal_end, 1))
         return horizontal_grid
 
+    def compute_footprint(self, center_grid, scale):
+        """Compute the neighboring grids of a grid.
+
+        Scale is the radius in grid units. A scale of zero only covers
+        the center grid.
+        """
+        if scale == 0:
+            return (center_grid,)
+        width_scale = int(self.width / self.grid_size)
+        horizontal_grid = self.get_horizontal_neighbours(
+            center_grid, scale, width_scale)
+        vertical_grid = list(range(
+            center_grid - scale * width_scale, center_grid +
+            1 + scale * width_scale, width_scale))
+        h_v_grid = []
+        for grid in vertical_grid:
+            h_v_grid += self.get_horizontal_neighbours(
+                grid, scale, width_scale)
+        all_grid = h_v_grid + horizontal_grid
+        all_grid = [grid for grid in all_grid if grid > 0 and
+                    grid <= self.grid_len]
+        return tuple(set(all_grid))
+
+    def get_scale(self, radius):
+        """Get the radius in grid units used by the neighborhood."""
+        if self.grid_size >= radius:
+            return 0
+        return int(radius / self.grid_size)
+
+    def get_grid_footprint(self, center_grid, scale):
+        """Get the neighborhood of a grid from the footprint cache."""
+        key = (center_grid, scale)
+        try:
+            footprint = self.footprints[key]
+            self.footprints.move_to_end(key)
+            self.footprint_hits += 1
+            return footprint
+        except KeyError:
+            self.footprint_misses += 1
+
+        footprint = self.compute_footprint(center_grid, scale)
+        self.cache_footprint(key, footprint)
+        return footprint
+
     # Find the adjacent grid based on radius
     def get_neighborhood(self, point, radius):
-        """Get the neighboring grids."""
-        all_grid = []
-        center_grid_key, center_grid = self.find_grid(point)
+        """Get the neighboring grids.
 
-        if self.grid_size >= radius:
-            return [center_grid]
-        else:
-            scale = int(radius / self.grid_size)
-            width_scale = int(self.width / self.grid_size)
-            horizontal_grid = self.get_horizontal_neighbours(
-                center_grid, scale, width_scale)
-            vertical_grid = list(range(
-                center_grid - scale * width_scale, center_grid +
-                1 + scale * width_scale, width_scale))
-            h_v_grid = []
-            for grid in vertical_grid:
-                h_v_grid += self.get_horizontal_neighbours(
-                    grid, scale, width_scale)
-            all_grid = h_v_grid + horizontal_grid
-            all_grid = [grid for grid in all_grid if grid > 0 and
-                        grid <= self.grid_len]
-        return list(set(all_grid))
+        The neighborhood only depends on the center grid and the radius,
+        so it is computed once and served from the footprint cache
+        afterwards. The returned tuple is shared and must not be changed.
+        """
+        return self.get_grid_footprint(
+            self.find_cell(point), self.get_scale(radius))
+
+    def cache_footprint(self, key, footprint):
+        """Remember a footprint and evict the least recently used one."""
+        if self.footprint_cache_size > 0:
+            self.footprints[key] = footprint
+            if len(self.footprints) > self.footprint_cache_size:
+                self.footprints.popitem(last=False)
+
+    def footprint_cache_info(self):
+        """Report the hit rate and the size of the footprint cache."""
+        total = self.footprint_hits + self.footprint_misses
+        hit_rate = self.footprint_hits / total if total else 0.0
+        return CacheInfo(
+            self.footprint_hits, self.footprint_misses, hit_rate,
+            self.footprint_cache_size, len(self.footprints))
+
+    def insert_into_grid(self, grid, name, objects):
+        """Put the object in the type bucket of a single grid."""
+        self.version += 1
+        buckets = self.grid_objects.get(grid)
+        if buckets is None:
+            buckets = self.grid_objects[grid] = dict()
+        try:
+            buckets[name][objects] = None
+        except KeyError:
+            buckets[name] = {objects: None}
+        if self.watchers and grid in self.watchers:
+            for callback in self.watchers.pop(grid).values():
+                callback(grid, objects)
+
+    def watch(self, grid_value, key, callback):
+        """Call back once when an object enters the grid.
+
+        The callback gets the grid value and the object. A later watch with
+        the same key on the same grid replaces it.
+        """
+        try:
+            self.watchers[grid_value][key] = callback
+        except KeyError:
+            self.watchers[grid_value] = {key: callback}
+
+    def unwatch(self, grid_value, key):
+        """Stop watching the grid with the key."""
+        callbacks = self.watchers.get(grid_value)
+        if callbacks is not None:
+            callbacks.pop(key, None)
+            if not callbacks:
+                del self.watchers[grid_value]
+
+    def discard_from_grid(self, grid, name, objects):
+        """Take the object out of the type bucket of a single grid.
+
+        Raises ValueError if the object is not in the grid.
+        """
+        self.version += 1
+        try:
+            buckets = self.grid_objects[grid]
+            bucket = buckets[name]
+            del bucket[objects]
+        except KeyError:
+            raise ValueError('Object not in grid', grid, objects)
+        if self.sparse and not bucket:
+            # Empty grids cost nothing in sparse mode
+            del buckets[name]
+            if not buckets:
+                del self.grid_objects[grid]
 
     def add_object_to_grid(self, point, objects):
         """Add object to a given grid."""
         grid_values = self.get_neighborhood(point, objects.radius)
+        name = type(objects).__name__
         for grid in grid_values:
-            self.grid_objects[grid].append(objects)
+            self.insert_into_grid(grid, name, objects)
 
     # Remove object to the given grid
     def remove_object_from_grid(self, point, objects):
-        """Remove object from the given grid."""
+        """Remove object from the given grid.
+
+        Raises ValueError if the object is not in the grid.
+        """
         grid_values = self.get_neighborhood(point, objects.radius)
+        name = type(objects).__name__
         for grid in grid_values:
-            self.grid_objects[grid].remove(objects)
+            self.discard_from_grid(grid, name, objects)
+
+    def get_footprint_change(self, grid, new_grid, scale):
+        """Get the grids an object leaves and enters when it moves.
+
+        The change is the symmetric difference of the old and the new
+        neighborhood. It only depends on the two center grids and the
+        scale, so it is kept in the footprint cache as well.
+        """
+        key = ('move', grid, new_grid, scale)
+        try:
+            change = self.footprints[key]
+            self.footprints.move_to_end(key)
+            self.footprint_hits += 1
+            return change
+        except KeyError:
+            self.footprint_misses += 1
+
+        old_footprint = self.get_grid_footprint(grid, scale)
+        new_footprint = self.get_grid_footprint(new_grid, scale)
+        old_grids = set(old_footprint)
+        new_grids = set(new_footprint)
+        change = (
+            tuple(value for value in old_footprint if value not in new_grids),
+            tuple(value for value in new_footprint if value not in old_grids))
+        self.cache_footprint(key, change)
+        return change
 
     def move_object(self, point, objects, newpoint):
-        """Move object from the give grid to new grid."""
-        grid_key, grid_value = self.find_grid(point)
-        new_grid_key, new_grid_value = self.find_grid(newpoint)
-        if grid_value != new_grid_value:
-            self.remove_object_from_grid(point, objects)
-            self.add_object_to_grid(newpoint, objects)
+        """Move object from the give grid to new grid.
+
+        Only the grids which the object leaves or enters are touched, so a
+        move to the next grid changes one row or column of the footprint.
+        """
+        grid = self.find_cell(point)
+        new_grid = self.find_cell(newpoint)
+        if grid == new_grid:
+            return
+        left, entered = self.get_footprint_change(
+            grid, new_grid, self.get_scale(objects.radius))
+        name = type(objects).__name__
+        for grid in left:
+            self.discard_from_grid(grid, name, objects)
+        for grid in entered:
+            self.insert_into_grid(grid, name, objects)
 
     # Check limits for the environment boundary
     def check_limits(self, i, d):
@@ -191,26 +447,668 @@ class Grid:
             d = np.pi + d
         return ((x, y), d)
 
-    # Using fancy search to find the object in the particular grid
+    def check_limits_batch(self, locations, directions):
+        """Check the locations of a batch of objects are valid.
+
+        Gives the same values as check_limits applied to each row of the
+        locations array and its direction, without a Python loop.
+        """
+        locations = np.array(locations, dtype=float)
+        directions = np.array(directions, dtype=float)
+        for axis, limit in [(0, self.x_limit), (1, self.y_limit)]:
+            values = locations[:, axis]
+            over = values > limit
+            values[over] = values[over] - (values[over] - limit) - 2
+            under = values < -limit
+            values[under] = values[under] - (values[under] + limit) + 2
+            outside = over | under
+            directions[outside] = np.pi + directions[outside]
+        return locations, directions
+
+    def move_objects_forward(self, objects, speeds, directions=None):
+        """Move a batch of objects along their direction.
+
+        New locations and the boundary checks are computed for the whole
+        batch at once, then each object is moved in the grid. speeds is a
+        number or one speed per object. Objects need a location and a
+        direction, which are updated. directions replaces the direction of
+        each object if given. Like the Move behavior, the signals of an
+        object are moved in the grid with it and its attached objects take
+        its new location. An object must be at most once in the batch.
+        """
+        if not objects:
+            return
+        locations = np.array([item.location for item in objects], dtype=float)
+        if directions is None:
+            directions = [item.direction for item in objects]
+        directions = np.array(directions, dtype=float)
+        speeds = np.asarray(speeds, dtype=float)
+        # Truncate towards zero like int()
+        steps = np.column_stack([
+            locations[:, 0] + np.cos(directions) * speeds,
+            locations[:, 1] + np.sin(directions) * speeds]).astype(int)
+        new_locations, new_directions = self.check_limits_batch(
+            steps, directions)
+        for item, (x, y), direction in zip(
+                objects, new_locations.astype(int).tolist(),
+                new_directions.tolist()):
+            new_location = (x, y)
+            self.move_object(item.location, item, new_location)
+            for signal in getattr(item, 'signals', ()):
+                self.move_object(item.location, signal, new_location)
+            item.location = new_location
+            item.direction = direction
+            for attached in getattr(item, 'attached_objects', ()):
+                attached.location = new_location
+
+    def queue_move(self, item, speed):
+        """Queue an object to move forward with the next flush."""
+        self.moves.append((item, speed, item.direction))
+
+    def flush_moves(self):
+        """Move the queued objects forward like they would have moved.
+
+        Objects queued several times move once per batch, in the order
+        their moves were queued. A move goes along the direction the
+        object had when it was queued. If the direction did not change
+        since its previous move, the direction that move left, turned at
+        the boundary, is used instead. The same rule keeps a direction
+        set after the last move.
+        """
+        moves, self.moves = self.moves, []
+        batches = []
+        count = dict()
+        for item, speed, direction in moves:
+            index = count.get(item, 0)
+            count[item] = index + 1
+            if index == len(batches):
+                batches.append([])
+            batches[index].append((item, speed, direction))
+        current = {item: item.direction for item in count}
+        queued = dict()
+        for batch in batches:
+            objects, speeds, directions = zip(*batch)
+            directions = [
+                item.direction if queued.get(item) == direction else direction
+                for item, direction in zip(objects, directions)]
+            queued.update(
+                (item, direction) for item, _, direction in batch)
+            self.move_objects_forward(objects, speeds, directions)
+        for item, direction in current.items():
+            if direction != queued[item]:
+                item.direction = direction
+
+    # Using type buckets to find the object in the particular grid
     def get_objects(self, object_name, grid_value):
-        """Use fancy search to find objects in a grid."""
+        """Read the objects of a type from a grid bucket.
+
+        If object_name is None, objects of all the types are returned.
+        """
+        buckets = self.grid_objects.get(grid_value, {})
         if object_name:
-            return list(filter(
-                lambda x: type(x).__name__ == object_name,
-                self.grid_objects[grid_value]))
+            try:
+                return list(buckets[object_name])
+            except KeyError:
+                return []
         else:
-            return list(filter(
-                lambda x: type(x).__name__ != 'list',
-                self.grid_objects[grid_value]))
+            object_list = []
+            for bucket in buckets.values():
+                object_list += bucket
+            return object_list
 
     def get_objects_from_grid(self, object_name, point):
         """Get objects from grid given a location."""
-        grid_key, grid_value = self.find_grid(point)
-        return self.get_objects(object_name, grid_value)
+        return self.get_objects(object_name, self.find_cell(point))
 
     def get_objects_from_list_of_grid(self, object_name, grid_list):
         """Get list of objects from grid list."""
         object_list = []
+        grid_objects = self.grid_objects
+        if not object_name:
+            for grid in grid_list:
+                buckets = grid_objects.get(grid)
+                if buckets:
+                    for bucket in buckets.values():
+                        object_list += bucket
+            return object_list
+
         for grid in grid_list:
-            object_list += self.get_objects(object_name, grid)
+            try:
+                object_list += grid_objects[grid][object_name]
+            except KeyError:
+                pass
         return object_list
+
+    def compute_circle_footprint(self, center_grid, radius):
+        """Compute the grids which can intersect a circle of the radius.
+
+        A grid is kept if its distance to the center grid is within radius,
+        so the circle around any point of the center grid is covered. The
+        grids in the corners of the square block are pruned.
+        """
+        column = (center_grid - 1) % self.width_scale
+        row = (center_grid - 1) // self.width_scale
+        reach = int(math.ceil(radius / self.grid_size))
+        grids = []
+        for grid_row in range(
+                max(row - reach, 0), min(row + reach + 1, self.height_scale)):
+            gap_y = max(abs(grid_row - row) - 1, 0) * self.grid_size
+            for grid_column in range(
+                    max(column - reach, 0),
+                    min(column + reach + 1, self.width_scale)):
+                gap_x = max(abs(grid_column - column) - 1, 0) * self.grid_size
+                if gap_x * gap_x + gap_y * gap_y <= radius * radius:
+                    grids.append(grid_row * self.width_scale + grid_column + 1)
+        return tuple(grids)
+
+    def get_circle_grids(self, point, radius):
+        """Get the grids which can intersect the circle around the point."""
+        center_grid = self.find_cell(point)
+        key = (center_grid, 'circle', radius)
+        try:
+            footprint = self.footprints[key]
+            self.footprints.move_to_end(key)
+            self.footprint_hits += 1
+            return footprint
+        except KeyError:
+            self.footprint_misses += 1
+
+        footprint = self.compute_circle_footprint(center_grid, radius)
+        self.cache_footprint(key, footprint)
+        return footprint
+
+    def query_radius(self, point, radius, object_name=None):
+        """Get the objects whose location is within radius of the point.
+
+        Candidates are read from the grids intersecting the circle and
+        filtered by distance. Large candidate sets are filtered with a
+        vectorised check. Objects without a location, like signals which
+        travel with their agent, are kept if they are registered in one of
+        those grids.
+        """
+        grids = self.get_circle_grids(point, radius)
+        candidates = self.get_objects_from_list_of_grid(object_name, grids)
+        if len(grids) > 1:
+            # Objects spanning many grids are found once in each of them
+            candidates = list(dict.fromkeys(candidates))
+        unlocated = [item for item in candidates if item.location is None]
+        if unlocated:
+            candidates = [
+                item for item in candidates if item.location is not None]
+
+        x, y = point[0], point[1]
+        radius_square = radius * radius
+        if len(candidates) < self.vectorise_threshold:
+            return [
+                item for item in candidates if (item.location[0] - x) ** 2 + (
+                    item.location[1] - y) ** 2 <= radius_square] + unlocated
+
+        locations = np.fromiter(
+            chain.from_iterable(item.location for item in candidates),
+            dtype=float, count=2 * len(candidates)).reshape(-1, 2)
+        delta = locations - (x, y)
+        inside = np.flatnonzero(
+            np.einsum('ij,ij->i', delta, delta) <= radius_square)
+        return [candidates[i] for i in inside.tolist()] + unlocated
+
+
+class Perception:
+    """Objects around an agent sensed once per tick.
+
+    The first sense of a tick queries the grid once for all the objects in
+    the radius of the agent. Later senses in the tick get the objects of a
+    type from that query, in the order the grid gives them, until the agent
+    moves or an object enters or leaves a grid.
+
+    Attributes:
+        objects: objects of the last query in grid order
+
+        types: objects of the last query partitioned by type name, filled
+                in when a type is asked for
+
+        senses: number of senses
+
+        queries: number of senses which queried the grid
+
+        slots: carryable objects of the last sense of the behaviors by
+                type name, without repeats in grid order
+
+    """
+
+    def __init__(self):
+        """Create an empty perception."""
+        self.key = None
+        self.objects = []
+        self.types = dict()
+        self.senses = 0
+        self.queries = 0
+        self.slots = dict()
+
+    def __getstate__(self):
+        """Pickle without the objects, the next sense queries again."""
+        state = vars(self).copy()
+        state.update(key=None, objects=[], types=dict())
+        return state
+
+    def sense(self, grid, location, radius, object_name=None):
+        """Get the objects of the type around the location.
+
+        Gives the same list as get_objects_from_list_of_grid of the
+        neighborhood. All the objects are returned if object_name is None.
+        """
+        self.senses += 1
+        key = (grid, grid.version, location, radius)
+        if key != self.key:
+            self.objects = grid.get_objects_from_list_of_grid(
+                None, grid.get_neighborhood(location, radius))
+            self.types = None
+            self.key = key
+            self.queries += 1
+        if not object_name:
+            return list(self.objects)
+        if self.types is None:
+            self.types = dict()
+            for item in self.objects:
+                try:
+                    self.types[type(item).__name__].append(item)
+                except KeyError:
+                    self.types[type(item).__name__] = [item]
+        return list(self.types.get(object_name, ()))
+
+
+class Neighborhood(tuple):
+    """Grid values of a MultiResolutionGrid query.
+
+    The anchor is the row, the column and the scale of the query on the
+    fine level, used to narrow the objects of the grids down to the ones
+    Grid would find.
+    """
+
+    def __new__(cls, grids, anchor):
+        """Create the grid values with the anchor of the query."""
+        neighborhood = super().__new__(cls, grids)
+        neighborhood.anchor = anchor
+        return neighborhood
+
+    def __reduce__(self):
+        """Pickle the anchor with the grid values."""
+        return (type(self), (tuple(self), self.anchor))
+
+
+class MultiResolutionGrid(Grid):
+    """Two level grid for environments with very different object radii.
+
+    Each object is kept in the single grid containing its location. Objects
+    whose diameter fits in grid_size live on the fine level and larger
+    objects like hubs, sites and obstacles live on the coarse level.
+    Queries widen their square on each level by the largest radius kept
+    there, and the objects found are narrowed down to the ones whose
+    neighborhood on the fine level meets the query neighborhood, like Grid
+    finds them. Grid values of the coarse level are numbered after the
+    fine ones, so the grid values of get_neighborhood work with the query
+    methods of Grid.
+    """
+
+    def __init__(
+            self, width, height, grid_size=10, coarse_size=None,
+            footprint_cache_size=65536, sparse=False):
+        """Constructors for multi resolution grid.
+
+        Args:
+            width: total width
+            height: total height
+            grid_size: granularity of the fine level
+            coarse_size: granularity of the coarse level. By default the
+                            smallest multiple of grid_size, at least four
+                            times larger, which divides the environment
+            footprint_cache_size: maximum number of neighborhoods
+                                    remembered by the fine level
+            sparse: if True, grids are materialised on first insertion
+
+        Attributes:
+            coarse: sparse grid used to locate the coarse grids
+            level_radius: largest radius of the objects kept on the fine
+                            and the coarse level. It only grows
+            anchors: row, column and scale on the fine level of each
+                        object, which Grid would use for its neighborhood
+
+        """
+        super().__init__(
+            width, height, grid_size, footprint_cache_size, sparse)
+        if coarse_size is None:
+            coarse_size = self.get_coarse_size()
+        self.coarse = Grid(width, height, coarse_size, 0, sparse=True)
+        self.level_radius = [0, 0]
+        self.anchors = dict()
+
+    def get_coarse_size(self):
+        """Get the default grid size of the coarse level."""
+        cells = math.gcd(
+            int(self.x_limit / self.grid_size),
+            int(self.y_limit / self.grid_size))
+        factor = 4
+        while factor < cells and cells % factor != 0:
+            factor += 1
+        return min(factor, cells) * self.grid_size
+
+    def get_level(self, radius):
+        """Get the level which keeps objects of the radius."""
+        return 0 if 2 * radius <= self.grid_size else 1
+
+    def get_object_grid(self, point, radius):
+        """Get the grid value which keeps an object at the point."""
+        if 2 * radius <= self.grid_size:
+            return self.find_cell(point)
+        return self.grid_len + self.coarse.find_cell(point)
+
+    def get_square_grids(self, level, offset, point, reach):
+        """Get the grid values of a level intersecting a square.
+
+        The square is centered on the point and its half width is reach.
+        """
+        grid_size = level.grid_size
+        columns = range(
+            max(int((point[0] - reach + level.x_limit) // grid_size), 0),
+            min(int((point[0] + reach + level.x_limit) // grid_size),
+                level.width_scale - 1) + 1)
+        rows = range(
+            max(int((point[1] - reach + level.y_limit) // grid_size), 0),
+            min(int((point[1] + reach + level.y_limit) // grid_size),
+                level.height_scale - 1) + 1)
+        offset += 1
+        width_scale = level.width_scale
+        return [
+            row * width_scale + column + offset
+            for row in rows for column in columns]
+
+    def get_anchor(self, point, scale):
+        """Get the row, the column and the scale of a point."""
+        row, column = divmod(self.find_cell(point) - 1, self.width_scale)
+        return (row, column, scale)
+
+    def get_neighborhood(self, point, radius):
+        """Get the grid values on both levels near the point.
+
+        The objects found in them are the ones Grid finds in its
+        neighborhood of the radius.
+        """
+        return self.get_level_grids(point, radius, self.get_scale(radius))
+
+    def get_circle_grids(self, point, radius):
+        """Get the grid values used by radius queries.
+
+        The objects found in them are the ones Grid finds in its grids
+        which can intersect the circle.
+        """
+        return self.get_level_grids(
+            point, radius, int(math.ceil(radius / self.grid_size)))
+
+    def get_level_grids(self, point, radius, scale):
+        """Get the grid values on both levels reaching scale grids around.
+
+        The grids can hold every object whose neighborhood on the fine
+        level is within scale grids of the grid containing the point, so
+        they only depend on that grid and are kept in the footprint cache.
+        """
+        center_grid = self.find_cell(point)
+        fine_radius, coarse_radius = self.level_radius
+        key = (center_grid, 'levels', radius, scale, fine_radius,
+               coarse_radius)
+        try:
+            footprint = self.footprints[key]
+            self.footprints.move_to_end(key)
+            self.footprint_hits += 1
+            return footprint
+        except KeyError:
+            self.footprint_misses += 1
+
+        # Widen the squares by half a grid to cover the whole grid
+        row, column = divmod(center_grid - 1, self.width_scale)
+        center = (
+            (column + 0.5) * self.grid_size - self.x_limit,
+            (row + 0.5) * self.grid_size - self.y_limit)
+        half = self.grid_size / 2
+        reach = max(radius, scale * self.grid_size)
+        grids = self.get_square_grids(
+            self, 0, center, reach + fine_radius + half)
+        if coarse_radius:
+            grids += self.get_square_grids(
+                self.coarse, self.grid_len, center,
+                reach + coarse_radius + half)
+        footprint = Neighborhood(grids, (row, column, scale))
+        self.cache_footprint(key, footprint)
+        return footprint
+
+    def get_objects_from_list_of_grid(self, object_name, grid_list):
+        """Get list of objects from grid list.
+
+        Objects of a neighborhood are narrowed down to the ones whose
+        neighborhood on the fine level meets the query neighborhood.
+        """
+        objects = super().get_objects_from_list_of_grid(
+            object_name, grid_list)
+        try:
+            row, column, scale = grid_list.anchor
+        except AttributeError:
+            return objects
+        anchors = self.anchors
+        found = []
+        for item in objects:
+            item_row, item_column, item_scale = anchors[item]
+            reach = scale + item_scale
+            if abs(item_row - row) <= reach and abs(
+                    item_column - column) <= reach:
+                found.append(item)
+        return found
+
+    def add_object_to_grid(self, point, objects):
+        """Add object to the grid of its level."""
+        level = self.get_level(objects.radius)
+        if objects.radius > self.level_radius[level]:
+            self.level_radius[level] = objects.radius
+        self.insert_into_grid(
+            self.get_object_grid(point, objects.radius),
+            type(objects).__name__, objects)
+        self.anchors[objects] = self.get_anchor(
+            point, self.get_scale(objects.radius))
+
+    def remove_object_from_grid(self, point, objects):
+        """Remove object from the grid of its level.
+
+        Raises ValueError if the object is not in the grid.
+        """
+        self.discard_from_grid(
+            self.get_object_grid(point, objects.radius),
+            type(objects).__name__, objects)
+        del self.anchors[objects]
+
+    def move_object(self, point, objects, newpoint):
+        """Move object from the give grid to new grid."""
+        self.anchors[objects] = self.get_anchor(
+            newpoint, self.get_scale(objects.radius))
+        grid = self.get_object_grid(point, objects.radius)
+        new_grid = self.get_object_grid(newpoint, objects.radius)
+        if grid == new_grid:
+            return
+        name = type(objects).__name__
+        self.discard_from_grid(grid, name, objects)
+        self.insert_into_grid(new_grid, name, objects)
+
+    def get_objects_from_grid(self, object_name, point):
+        """Get objects which can overlap the point."""
+        return self.get_objects_from_list_of_grid(
+            object_name, self.get_neighborhood(point, 0))
+
+
+class AgentIndex:
+    """Array backed spatial index for the agents of a model.
+
+    Companion of the Grid class. The agent locations are stored in NumPy
+    arrays and bucketed by grid value with a counting sort, so the agents
+    of a grid are a contiguous slice of the index. The index is rebuilt
+    once per scheduler step and answers the neighbour queries of the whole
+    swarm in one vectorised call.
+
+    Locations are a snapshot taken when the index is built. Agents which
+    move during the step are still found at their old grid until the next
+    step.
+    """
+
+    def __init__(self, model, agent_type=None):
+        """Create an empty index.
+
+        Args:
+            model: model with a grid and a schedule
+
+            agent_type: name of the agent class to index. All the agents
+                        in the schedule are indexed if it is None
+
+        Attributes:
+            agents: list of indexed agents. Index of an agent in this list
+                    is its position in the arrays
+
+            locations: array of shape (n, 2) with the agent locations
+
+            cells: array with zero based grid value of each agent
+
+            order: agent positions sorted by their grid
+
+            cell_start: offsets of each grid inside order
+
+        """
+        self.model = model
+        self.grid = model.grid
+        self.agent_type = agent_type
+        self.agents = []
+        self.positions = dict()
+        self.locations = np.zeros((0, 2))
+        self.cells = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.cell_start = np.zeros(
+            self.grid.grid_len + 1, dtype=np.int64)
+        self.built_step = None
+        self.queries = dict()
+
+    def rebuild(self, agents=None):
+        """Index the current location of the agents."""
+        if agents is None:
+            agents = self.model.schedule.agents
+        if self.agent_type is not None:
+            agents = [
+                agent for agent in agents
+                if type(agent).__name__ == self.agent_type]
+        self.agents = list(agents)
+        self.positions = {
+            agent: position for position, agent in enumerate(self.agents)}
+        self.locations = np.array(
+            [agent.location for agent in self.agents],
+            dtype=float).reshape(-1, 2)
+
+        grid = self.grid
+        columns = np.floor(
+            (self.locations[:, 0] + grid.x_limit) / grid.grid_size)
+        rows = np.floor(
+            (self.locations[:, 1] + grid.y_limit) / grid.grid_size)
+        # Points on the right and top boundary belong to the last grid
+        columns = np.clip(columns, 0, grid.width_scale - 1).astype(np.int64)
+        rows = np.clip(rows, 0, grid.height_scale - 1).astype(np.int64)
+        self.columns = columns
+        self.rows = rows
+        self.cells = rows * grid.width_scale + columns
+
+        # Counting sort over the grid values
+        counts = np.bincount(self.cells, minlength=grid.grid_len)
+        self.cell_start = np.zeros(grid.grid_len + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.cell_start[1:])
+        self.order = np.argsort(self.cells, kind='stable')
+
+        self.built_step = self.model.schedule.steps
+        self.queries = dict()
+
+    def refresh(self):
+        """Rebuild the index if the scheduler has taken a step."""
+        if self.built_step != self.model.schedule.steps:
+            self.rebuild()
+
+    def cellmates(self, agent):
+        """Get the agents sharing the grid of the agent.
+
+        The indexed location of the agent is used, so the agent itself is
+        part of the result like it is for Grid.get_objects_from_grid.
+        """
+        self.refresh()
+        try:
+            cell = self.cells[self.positions[agent]]
+        except KeyError:
+            cell = self.grid.find_cell(agent.location) - 1
+        start, end = self.cell_start[cell], self.cell_start[cell + 1]
+        return [self.agents[position] for position in self.order[start:end]]
+
+    def query_all(self, radius):
+        """Find the neighbours within radius of every indexed agent.
+
+        Returns the neighbours in compressed sparse row form. Neighbours of
+        the agent at position i are neighbours[offsets[i]:offsets[i + 1]].
+        An agent is not its own neighbour.
+        """
+        self.refresh()
+        try:
+            return self.queries[radius]
+        except KeyError:
+            pass
+
+        grid = self.grid
+        total = len(self.agents)
+        reach = int(np.ceil(radius / grid.grid_size))
+        sources = []
+        targets = []
+        for d_row in range(-reach, reach + 1):
+            for d_column in range(-reach, reach + 1):
+                # Skip the grids which can not intersect the circle
+                gap_x = max(abs(d_column) - 1, 0) * grid.grid_size
+                gap_y = max(abs(d_row) - 1, 0) * grid.grid_size
+                if gap_x * gap_x + gap_y * gap_y > radius * radius:
+                    continue
+                columns = self.columns + d_column
+                rows = self.rows + d_row
+                valid = np.flatnonzero(
+                    (columns >= 0) & (columns < grid.width_scale) &
+                    (rows >= 0) & (rows < grid.height_scale))
+                cells = rows[valid] * grid.width_scale + columns[valid]
+                starts = self.cell_start[cells]
+                counts = self.cell_start[cells + 1] - starts
+                pairs = counts.sum()
+                if pairs == 0:
+                    continue
+                # Expand every agent into one pair per candidate neighbour
+                firsts = np.repeat(np.cumsum(counts) - counts, counts)
+                ranks = np.arange(pairs) - firsts
+                sources.append(np.repeat(valid, counts))
+                targets.append(self.order[np.repeat(starts, counts) + ranks])
+
+        if sources:
+            sources = np.concatenate(sources)
+            targets = np.concatenate(targets)
+            delta = self.locations[sources] - self.locations[targets]
+            keep = (np.einsum('ij,ij->i', delta, delta) <= radius * radius) & (
+                sources != targets)
+            sources = sources[keep]
+            targets = targets[keep]
+            sort = np.argsort(sources, kind='stable')
+            sources = sources[sort]
+            targets = targets[sort]
+        else:
+            sources = targets = np.zeros(0, dtype=np.int64)
+
+        offsets = np.zeros(total + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=total), out=offsets[1:])
+        self.queries[radius] = (offsets, targets)
+        return offsets, targets
+
+    def neighbours(self, agent, radius):
+        """Get the agents within radius of the agent."""
+        offsets, targets = self.query_all(radius)
+        position = self.positions[agent]
+        return [
+            self.agents[target] for target in targets[
+                offsets[position]:offsets[position + 1]]]
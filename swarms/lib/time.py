@@ -21,6 +21,50 @@ Key concepts:
 
 """
 
+import functools
+import heapq
+import multiprocessing
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from swarms.lib.agent import BatchAttribute
+
+# Answer of a forked worker whose replica is out of step with the model
+_STALE = 'stale'
+
+
+def _lockstep(schedule, connection):
+    """Keep a forked replica of a parallel schedule in step and stage.
+
+    Every message carries the changes staged in the last step with the
+    random streams of the agents after staging, which the replica merges
+    like the main process did, the fingerprint the main process has after
+    merging them and the slice of agents to stage. The answer is the
+    staged changes of the slice and the streams they drew from.
+    """
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        pending, fingerprint, start, stop = message
+        try:
+            if pending is not None:
+                changes, streams = pending
+                schedule.set_streams(streams)
+                schedule.merge_staged(changes)
+            if schedule.fingerprint() != fingerprint:
+                connection.send(_STALE)
+                break
+            agents = schedule.get_staging()[start:stop]
+            changes = [agent.stage() for agent in agents]
+            connection.send(
+                (changes, [getattr(agent, 'stream', None)
+                           for agent in agents]))
+        except Exception as error:  # pylint: disable=W0703
+            connection.send(error)
+            break
+
 
 class BaseScheduler:
     """Simplest scheduler.
@@ -38,7 +82,49 @@ class BaseScheduler:
         self.model = model
         self.steps = 0
         self.time = 0
-        self.agents = []
+        # Registry of the scheduled agents keyed by the order they were
+        # added in, with the keys of each agent for constant time removal
+        self.registry = dict()
+        self.registry_keys = dict()
+        self.registry_count = 0
+        self._agents = []
+        # Registry keys and agents in the shuffled activation order, written
+        # back into the registry when the schedule changes
+        self._order = None
+        # Own stream for the activation order if the model spawns streams
+        self.stream = None
+        if getattr(model, 'streams', False):
+            self.stream = model.spawn_random()
+
+    @property
+    def random(self):
+        """Random stream of the scheduler, or the model one if it has none."""
+        if self.stream is None:
+            return self.model.random
+        return self.stream
+
+    @property
+    def agents(self):
+        """List of the scheduled agents in activation order.
+
+        The list is rebuilt after the schedule changes instead of being
+        changed in place, so a step can iterate it while agents are added
+        or removed. Treat it as read only.
+        """
+        if self._agents is None:
+            self._agents = list(self.registry.values())
+        return self._agents
+
+    @agents.setter
+    def agents(self, agents):
+        """Replace the scheduled agents, keeping the given order."""
+        self.registry = dict()
+        self.registry_keys = dict()
+        self.registry_count = 0
+        self._agents = None
+        self._order = None
+        for agent in agents:
+            BaseScheduler.add(self, agent)
 
     def add(self, agent):
         """Add an Agent object to the schedule.
@@ -48,7 +134,15 @@ class BaseScheduler:
             have a step() method.
 
         """
-        self.agents.append(agent)
+        self.keep_order()
+        key = self.registry_count
+        self.registry_count += 1
+        self.registry[key] = agent
+        try:
+            self.registry_keys[agent].append(key)
+        except KeyError:
+            self.registry_keys[agent] = [key]
+        self._agents = None
 
     def remove(self, agent):
         """Remove all instances of a given agent from the schedule.
@@ -57,19 +151,53 @@ class BaseScheduler:
             agent: An agent object.
 
         """
-        while agent in self.agents:
-            self.agents.remove(agent)
+        self.keep_order()
+        for key in self.registry_keys.pop(agent, ()):
+            del self.registry[key]
+        self._agents = None
+
+    def shuffle_agents(self):
+        """Shuffle the activation order with the scheduler random stream.
+
+        The registry keys and the agents are permuted together in arrays
+        of their own, so the agents keep their keys and the registry is
+        only reordered when the schedule changes. The draws are those of
+        shuffling the agent list.
+        """
+        if self._order is None:
+            agents = np.empty(len(self.registry), dtype=object)
+            agents[:] = list(self.registry.values())
+            self._order = (np.fromiter(self.registry, int), agents)
+        keys, agents = self._order
+        permutation = self.random.permutation(len(keys))
+        self._order = (keys[permutation], agents[permutation])
+        self._agents = self._order[1].tolist()
+
+    def keep_order(self):
+        """Reorder the registry like the last shuffle before it changes."""
+        if self._order is not None:
+            registry = self.registry
+            self.registry = {
+                key: registry[key] for key in self._order[0].tolist()}
+            self._order = None
 
     def step(self):
         """Execute the step of all the agents, one at a time."""
-        for agent in self.agents[:]:
+        for agent in self.agents:
             agent.step()
+        self.flush_moves()
         self.steps += 1
         self.time += 1
 
+    def flush_moves(self):
+        """Move the agents the Move behaviors queued in the grid."""
+        grid = getattr(self.model, 'grid', None)
+        if getattr(grid, 'moves', None):
+            grid.flush_moves()
+
     def get_agent_count(self):
         """Return the current number of agents in the queue."""
-        return len(self.agents)
+        return len(self.registry)
 
 
 class RandomActivation(BaseScheduler):
@@ -86,9 +214,10 @@ class RandomActivation(BaseScheduler):
 
     def step(self):
         """Execute the step of all agents, one at a time, in random order."""
-        self.model.random.shuffle(self.agents)
-        for agent in self.agents[:]:
+        self.shuffle_agents()
+        for agent in self.agents:
             agent.step()
+        self.flush_moves()
         self.steps += 1
         self.time += 1
 
@@ -104,10 +233,11 @@ class SimultaneousActivation(BaseScheduler):
 
     def step(self):
         """Step all agents, then advance them."""
-        for agent in self.agents[:]:
+        for agent in self.agents:
             agent.step()
-        for agent in self.agents[:]:
+        for agent in self.agents:
             agent.advance()
+        self.flush_moves()
         self.steps += 1
         self.time += 1
 
@@ -150,12 +280,476 @@ class StagedActivation(BaseScheduler):
     def step(self):
         """Execute all the stages for all agents."""
         if self.shuffle:
-            self.model.random.shuffle(self.agents)
+            self.shuffle_agents()
         for stage in self.stage_list:
-            for agent in self.agents[:]:
+            for agent in self.agents:
                 getattr(agent, stage)()  # Run stage
             if self.shuffle_between_stages:
-                self.model.random.shuffle(self.agents)
+                self.shuffle_agents()
             self.time += self.stage_time
 
+        self.flush_moves()
         self.steps += 1
+
+
+class ParallelActivation(SimultaneousActivation):
+    """Simultaneous activation with the step phase run by a worker pool.
+
+    Agents split their step into stage and merge. stage() reads the model
+    and returns the changes the agent wants to make without making them.
+    The agents are partitioned into contiguous slices and the workers
+    stage one slice each. merge(staged) then applies the changes of every
+    agent in the order they were added, before all agents advance, so the
+    result does not depend on the number of workers. Randomness belongs in
+    merge, which runs in the main process. Agents without a stage method
+    are stepped during the merge, and a step raises ValueError if no agent
+    has one.
+
+    With processes=True the workers are forked once and each keeps a
+    replica of the model. Every step sends them the changes staged in the
+    last step, which they merge like the main process, so the replicas
+    stay in step without copying the model. Staged changes are pickled
+    back with the random streams of the staged agents, and must refer to
+    other agents by name rather than by object.
+    The workers are forked again when agents are added or removed, and
+    when the steps, the grid version or the model random stream of a
+    replica do not match the model. The replicas do not see other changes
+    made outside of the step, like setting an agent attribute, so call
+    invalidate() after making them.
+    """
+
+    def __init__(self, model, workers=2, processes=False):
+        """Create an empty parallel activation schedule.
+
+        Args:
+            model: Model object associated with the schedule.
+            workers: Number of workers staging the agents.
+            processes: If True, use forked processes instead of threads.
+
+        """
+        super().__init__(model)
+        self.workers = workers
+        self.processes = processes
+        self.executor = None
+        self.pool = None
+        self.pending = None
+
+    def add(self, agent):
+        """Add an agent and fork the workers again before the next step."""
+        super().add(agent)
+        self.invalidate()
+
+    def remove(self, agent):
+        """Remove an agent and fork the workers again before the next step."""
+        super().remove(agent)
+        self.invalidate()
+
+    @SimultaneousActivation.agents.setter
+    def agents(self, agents):
+        """Replace the agents and drop the forked replicas."""
+        BaseScheduler.agents.fset(self, agents)
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop the forked replicas, which are forked again when needed.
+
+        Call after changing the model outside of the step in a way the
+        fingerprint does not cover.
+        """
+        if self.pool is not None:
+            for process, connection in self.pool:
+                try:
+                    connection.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                connection.close()
+                process.join()
+            self.pool = None
+            self.pending = None
+
+    def get_slices(self, total):
+        """Partition the agents into one contiguous slice per worker."""
+        size, extra = divmod(total, self.workers)
+        slices = []
+        start = 0
+        for i in range(self.workers):
+            stop = start + size + (1 if i < extra else 0)
+            slices.append((start, stop))
+            start = stop
+        return slices
+
+    def get_staging(self):
+        """Get the agents with a stage method.
+
+        Raises ValueError if there are none, since nothing would run in
+        parallel.
+        """
+        staging = [agent for agent in self.agents if hasattr(agent, 'stage')]
+        if not staging:
+            raise ValueError(
+                'No agent has a stage method to run in parallel')
+        return staging
+
+    def fingerprint(self):
+        """Summarise the model state the forked replicas must match."""
+        grid = getattr(self.model, 'grid', None)
+        return (
+            self.steps, self.registry_count, len(self.registry),
+            getattr(grid, 'version', None),
+            hash(pickle.dumps(self.model.random)))
+
+    def set_streams(self, streams):
+        """Take the random streams the staging agents drew from."""
+        for agent, stream in zip(self.get_staging(), streams):
+            if stream is not None:
+                agent.stream = stream
+
+    def start_processes(self):
+        """Fork the workers, each with a replica of the current model."""
+        self.invalidate()
+        context = multiprocessing.get_context('fork')
+        pool = []
+        for _ in range(self.workers):
+            connection, child = context.Pipe()
+            process = context.Process(
+                target=_lockstep, args=(self, child), daemon=True)
+            process.start()
+            child.close()
+            pool.append((process, connection))
+        self.pool = pool
+        self.pending = None
+
+    def stage_in_processes(self, agents):
+        """Stage the slices of the agents in the forked workers."""
+        if self.pool is None:
+            self.start_processes()
+        fingerprint = self.fingerprint()
+        slices = self.get_slices(len(agents))
+        for (_, connection), (start, stop) in zip(self.pool, slices):
+            connection.send((self.pending, fingerprint, start, stop))
+        answers = [connection.recv() for _, connection in self.pool]
+        for answer in answers:
+            if isinstance(answer, Exception):
+                self.close()
+                raise answer
+        if any(answer == _STALE for answer in answers):
+            self.start_processes()
+            return self.stage_in_processes(agents)
+        staged = [changes for chunk, _ in answers for changes in chunk]
+        streams = [stream for _, chunk in answers for stream in chunk]
+        self.set_streams(streams)
+        self.pending = (staged, streams)
+        return [staged]
+
+    def stage_agents(self, agents):
+        """Stage the agents with the workers and keep their order."""
+        if self.workers == 1 or len(agents) < 2:
+            return [agent.stage() for agent in agents]
+        if self.processes:
+            staged = self.stage_in_processes(agents)
+        else:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.workers)
+            staged = self.executor.map(
+                lambda bounds: [
+                    agent.stage() for agent in agents[
+                        bounds[0]:bounds[1]]], self.get_slices(len(agents)))
+        return [changes for chunk in staged for changes in chunk]
+
+    def merge_staged(self, staged):
+        """Merge the staged changes in order, then advance all agents."""
+        agents = self.agents
+        changes = dict(zip(map(id, self.get_staging()), staged))
+        for agent in agents:
+            try:
+                agent_changes = changes[id(agent)]
+            except KeyError:
+                agent.step()
+            else:
+                agent.merge(agent_changes)
+        for agent in agents:
+            agent.advance()
+        self.flush_moves()
+        self.steps += 1
+        self.time += 1
+
+    def step(self):
+        """Stage all agents in parallel, merge them, then advance them."""
+        staged = self.stage_agents(self.get_staging())
+        self.merge_staged(staged)
+
+    def __getstate__(self):
+        """Pickle without the workers, started again when needed."""
+        state = vars(self).copy()
+        state.update(executor=None, pool=None, pending=None)
+        return state
+
+    def close(self):
+        """Shut down the thread and process workers."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.invalidate()
+
+
+class DormantActivation(BaseScheduler):
+    """A scheduler which skips agents while they are dormant.
+
+    Agents which have nothing to do put themselves to sleep with sleep()
+    and name their wake conditions: a number of steps, objects entering
+    some grids, or a signal sent with signal(). Dormant agents are not
+    visited by step, which activates the awake agents one at a time in
+    the order they were added. Wake times are kept in a priority queue.
+
+    Attributes:
+        active_agents: number of agents stepped in the last step
+        dormant_agents: number of agents skipped in the last step
+        activity: list of (active, dormant) counts for every step
+
+    """
+
+    def __init__(self, model):
+        """Create an empty dormant activation schedule."""
+        super().__init__(model)
+        # Dormant agents with their sleep number and watched grids
+        self.dormant = dict()
+        self.waiting_signal = set()
+        self.wake_times = []
+        self.sleep_count = 0
+        self._awake = (None, None)
+        self.active_agents = 0
+        self.dormant_agents = 0
+        self.activity = []
+
+    def remove(self, agent):
+        """Remove all instances of a given agent from the schedule."""
+        self.wake(agent)
+        super().remove(agent)
+
+    @property
+    def awake(self):
+        """List of the awake agents in activation order."""
+        agents = self.agents
+        source, awake = self._awake
+        if source is not agents:
+            dormant = self.dormant
+            awake = [agent for agent in agents if agent not in dormant]
+            self._awake = (agents, awake)
+        return awake
+
+    def sleep(self, agent, steps=None, grids=(), signal=False):
+        """Make the agent dormant until a wake condition fires.
+
+        Args:
+            agent: An agent of the schedule.
+            steps: Wake the agent after this many steps.
+            grids: Wake the agent when an object enters one of the grids.
+            signal: Wake the agent when signal() is called for it.
+
+        """
+        self.wake(agent)
+        self.sleep_count += 1
+        number = self.sleep_count
+        grids = tuple(grids)
+        self.dormant[agent] = (number, grids)
+        if steps is not None:
+            heapq.heappush(
+                self.wake_times, (self.steps + steps, number, agent))
+        for grid_value in grids:
+            self.watch_grid(agent, grid_value)
+        if signal:
+            self.waiting_signal.add(agent)
+        self._awake = (None, None)
+
+    def watch_grid(self, agent, grid_value):
+        """Wake the agent when another object enters the grid."""
+        self.model.grid.watch(
+            grid_value, agent, functools.partial(self.entered, agent))
+
+    def entered(self, agent, grid_value, objects):
+        """Wake the agent unless it entered the watched grid itself."""
+        if objects is agent:
+            self.watch_grid(agent, grid_value)
+        else:
+            self.wake(agent)
+
+    def wake(self, agent):
+        """Make the agent active again from the next step."""
+        try:
+            number, grids = self.dormant.pop(agent)
+        except KeyError:
+            return
+        for grid_value in grids:
+            self.model.grid.unwatch(grid_value, agent)
+        self.waiting_signal.discard(agent)
+        self._awake = (None, None)
+
+    def signal(self, agent):
+        """Send a signal to the agent, waking it if it waits for one."""
+        if agent in self.waiting_signal:
+            self.wake(agent)
+
+    def wake_timers(self):
+        """Wake the agents whose wake time has come."""
+        wake_times = self.wake_times
+        while wake_times and wake_times[0][0] <= self.steps:
+            _, number, agent = heapq.heappop(wake_times)
+            # The agent may have been woken and put to sleep since
+            if self.dormant.get(agent, (None,))[0] == number:
+                self.wake(agent)
+
+    def step(self):
+        """Execute the step of the awake agents, one at a time."""
+        self.wake_timers()
+        awake = self.awake
+        for agent in awake:
+            agent.step()
+        self.active_agents = len(awake)
+        self.dormant_agents = self.get_agent_count() - self.active_agents
+        self.activity.append((self.active_agents, self.dormant_agents))
+        self.flush_moves()
+        self.steps += 1
+        self.time += 1
+
+
+class BatchState:
+    """Arrays holding the batch attributes of the agents of one class.
+
+    Row i of every column belongs to agents[i]. Columns are read with
+    state['location'], which gives a view of the rows in use. Removing an
+    agent moves the last row into its place.
+    """
+
+    def __init__(self, model, agent_class):
+        """Create empty columns for the batch attributes of the class."""
+        self.model = model
+        self.agent_class = agent_class
+        self.agents = []
+        self.attributes = dict()
+        for cls in reversed(agent_class.__mro__):
+            for name, value in vars(cls).items():
+                if isinstance(value, BatchAttribute):
+                    self.attributes[name] = value
+        self.capacity = 16
+        self.columns = {
+            name: np.zeros(
+                (self.capacity,) + attribute.shape, dtype=attribute.dtype)
+            for name, attribute in self.attributes.items()}
+
+    def __len__(self):
+        """Return the number of agents in the state."""
+        return len(self.agents)
+
+    def __getitem__(self, name):
+        """Get the column of the attribute for the agents in the state."""
+        return self.columns[name][:len(self.agents)]
+
+    def add(self, agent):
+        """Move the batch attributes of the agent into a new row."""
+        index = len(self.agents)
+        if index == self.capacity:
+            self.capacity *= 2
+            for name, column in self.columns.items():
+                grown = np.zeros(
+                    (self.capacity,) + column.shape[1:], dtype=column.dtype)
+                grown[:index] = column[:index]
+                self.columns[name] = grown
+        for name in self.attributes:
+            value = agent.__dict__.pop(name, None)
+            self.columns[name][index] = 0 if value is None else value
+        self.agents.append(agent)
+        agent.batch_index = index
+        agent.batch_state = self
+
+    def remove(self, agent):
+        """Move the batch attributes of the agent back onto it."""
+        index = agent.batch_index
+        values = {name: getattr(agent, name) for name in self.attributes}
+        last = len(self.agents) - 1
+        if index != last:
+            moved = self.agents[last]
+            for column in self.columns.values():
+                column[index] = column[last]
+            self.agents[index] = moved
+            moved.batch_index = index
+        self.agents.pop()
+        agent.batch_state = None
+        agent.batch_index = None
+        for name, value in values.items():
+            setattr(agent, name, value)
+
+    def move(self, locations):
+        """Set new locations and move the agents in the model grid.
+
+        Only the agents whose grid changes are moved in the grid, which
+        is found for all the locations at once.
+        """
+        grid = self.model.grid
+        old = self['location']
+        changed = np.flatnonzero(
+            grid.find_cells(old) != grid.find_cells(locations))
+        old_points = old[changed].tolist()
+        new_points = np.asarray(locations)[changed].tolist()
+        for i, point, newpoint in zip(
+                changed.tolist(), old_points, new_points):
+            grid.move_object(tuple(point), self.agents[i], tuple(newpoint))
+        old[:] = locations
+
+
+class BatchActivation(BaseScheduler):
+    """A scheduler which steps the agents of a class with one kernel call.
+
+    Agents whose class has a step_batch classmethod, like subclasses of
+    BatchAgent, keep their batch attributes in a BatchState per class
+    while they are scheduled. Each step calls step_batch(state) once per
+    class, in the order the classes were first added, then steps the
+    other agents one at a time in the order they were added.
+    """
+
+    def __init__(self, model):
+        """Create an empty batch activation schedule."""
+        super().__init__(model)
+        self.states = dict()
+        self._others = (None, None)
+
+    @property
+    def others(self):
+        """List of the agents stepped one at a time, in activation order."""
+        agents = self.agents
+        source, others = self._others
+        if source is not agents:
+            others = [
+                agent for agent in agents
+                if agent.__dict__.get('batch_state') is None]
+            self._others = (agents, others)
+        return others
+
+    def add(self, agent):
+        """Add an Agent object to the schedule."""
+        if hasattr(type(agent), 'step_batch'):
+            if agent.batch_state is not None:
+                return
+            try:
+                state = self.states[type(agent)]
+            except KeyError:
+                state = self.states[type(agent)] = BatchState(
+                    self.model, type(agent))
+            state.add(agent)
+        super().add(agent)
+
+    def remove(self, agent):
+        """Remove the agent and keep its batch attributes on it."""
+        if getattr(agent, 'batch_state', None) is not None:
+            agent.batch_state.remove(agent)
+        super().remove(agent)
+
+    def step(self):
+        """Run the kernel of every class, then step the other agents."""
+        for agent_class, state in self.states.items():
+            if state.agents:
+                agent_class.step_batch(state)
+        for agent in self.others:
+            agent.step()
+        self.flush_moves()
+        self.steps += 1
+        self.time += 1
@@ -1,20 +1,33 @@
 """This is the mapper class which maps the xml file."""
 
 
+import dis
+import itertools
+from collections import OrderedDict, namedtuple
 import xml.etree.ElementTree as ET
 import py_trees
-from py_trees.composites import Sequence, Selector  # noqa: F401
+from py_trees import Behaviour, Status
+from py_trees.composites import Sequence, Selector
+from py_trees.trees import BehaviourTree
 
-from swarms.behaviors.scbehaviors import (      # noqa: F401
-    MoveTowards, MoveAway, Explore, CompositeSingleCarry,
-    CompositeMultipleCarry, CompositeDrop, CompositeDropCue,
-    CompositePickCue, CompositeSendSignal, CompositeReceiveSignal,
-    CompositeDropPartial
-    )
-from swarms.behaviors.sbehaviors import (       # noqa: F401
-    IsCarrying, NeighbourObjects, Move, IsDropable,
-    IsVisitedBefore, IsInPartialAttached
-    )
+# Importing the behaviors registers them
+from swarms.behaviors import sbehaviors, scbehaviors    # noqa: F401
+from swarms.behaviors.registry import get_behavior
+
+# Hand written foraging behavior of the single foraging example, used to
+# validate the example and to test and benchmark the behavior trees
+FORAGING_PHENOTYPE = (
+    '<?xml version="1.0" encoding="UTF-8"?><Sequence><Sequence><Sequence>'
+    '<Sequence><Sequence><cond>NeighbourObjects</cond><act>Explore</act>'
+    '</Sequence> <Sequence><cond>NeighbourObjects</cond>'
+    '<act>CompositeSingleCarry_Food</act></Sequence></Sequence> <Sequence>'
+    '<cond>IsDropable_Hub</cond><act>CompositeDrop_Food</act></Sequence>'
+    '</Sequence> <Sequence><cond>IsDropable_Hub</cond>'
+    '<cond>IsDropable_Hub</cond><act>CompositeDrop_Food</act></Sequence>'
+    '</Sequence> <Selector><Selector><cond>IsDropable_Hub</cond>'
+    '<act>MoveTowards_Hub</act></Selector> <Selector>'
+    '<cond>IsDropable_Hub</cond><cond>NeighbourObjects</cond>'
+    '<act>MoveTowards_Sites</act></Selector></Selector></Sequence>')
 
 
 class BTConstruct:
@@ -24,17 +37,27 @@ class BTConstruct:
     Behavior Trees
     """
 
-    def __init__(self, filename, agent, xmlstring=None):
+    def __init__(self, filename, agent, xmlstring=None, compiled=False):
         """Initialize the attributes for mapper.
 
         Args:
             filename: name of xml file that is to be mapped into BT
             agent: agent object
             xmlstring: xml stream instead of file
+            compiled: also lower the tree into a CompiledBT which tick uses
         """
         self.filename = filename
         self.xmlstring = xmlstring
         self.agent = agent
+        self.compiled = compiled
+        self.constructed = False
+
+    def __getstate__(self):
+        """Pickle without the tree, which rebuild creates again."""
+        state = vars(self).copy()
+        for name in ['root', 'behaviour_tree', 'compiled_tree']:
+            state.pop(name, None)
+        return state
 
     def xmlfy(self):
         """Convert [] to <>."""
@@ -42,71 +65,458 @@ class BTConstruct:
         self.xmlstring = self.xmlstring.replace(']', '>')
         self.xmlstring = self.xmlstring.replace('%', '"')
 
-    def create_bt(self, root):
-        """Recursive method to construct BT."""
-        if len(list(root)) == 0:
-            node_text = root.text
-            # If the behavior needs to look for specific item
-            if node_text.find('_') != -1:
-                nodeval = node_text.split('_')
-                # Check for behavior inversion
-                if len(nodeval) == 2:
-                    method, item = nodeval
-                    behavior = eval(method)(method + str(
-                        self.agent.model.random.randint(
-                            100, 200)) + '_' + item)
-                else:
-                    method, item, _ = nodeval
-                    behavior = py_trees.meta.inverter(eval(method))(
-                        method + str(
-                            self.agent.model.random.randint(
-                                100, 200)) + '_' + item + '_inv')
-
-                behavior.setup(0, self.agent, item)
-
-            else:
-                method = node_text
-                behavior = eval(method)(method + str(
-                    self.agent.model.random.randint(100, 200)))
-                behavior.setup(0, self.agent, None)
-            return behavior
-        else:
-            list1 = []
-            for node in list(root):
-                if node.tag not in ['cond', 'act']:
-                    composits = eval(node.tag)(node.tag + str(
-                        self.agent.model.random.randint(10, 90)))
-                list1.append(self.create_bt(node))
-                try:
-                    if composits:
-                        composits.add_children(list1.pop())
-                        list1.append(composits)
-                except (AttributeError, IndexError, UnboundLocalError) as e:
-                    pass
-
-            return list1
-
     def construct(self):
-        """Create a tree from xml."""
+        """Create a tree from xml.
+
+        The xml string is parsed once per process into a template kept in
+        the template cache.
+        """
         if self.xmlstring is not None:
             self.xmlfy()
-            tree = ET.fromstring(self.xmlstring)
-            self.root = tree
-
+            template = templates.get(self.xmlstring)
         elif self.filename is not None:
-            tree = ET.parse(self.filename)
-            self.root = tree.getroot()
+            template = BTTemplate(ET.parse(self.filename).getroot())
         else:
             print("Cannont create BT. Check the filename or stream")
             exit()
 
-        whole_list = self.create_bt(self.root)
-        top = eval(self.root.tag)('Root' + self.root.tag)
-        top.add_children(whole_list)
+        self.root = template.root
+        top = template.instantiate(self.agent)
         self.behaviour_tree = py_trees.trees.BehaviourTree(top)
+        if self.compiled:
+            self.compiled_tree = CompiledBT(top)
+        self.constructed = True
         # py_trees.logging.level = py_trees.logging.Level.DEBUG
         # py_trees.display.print_ascii_tree(top)
 
+    def tick(self):
+        """Tick the compiled tree if there is one, else the py_trees tree."""
+        if self.compiled:
+            return self.compiled_tree.tick()
+        self.behaviour_tree.tick()
+        return self.behaviour_tree.root.status
+
+    def rebuild(self):
+        """Create the tree again, like after loading a checkpoint."""
+        self.construct()
+
     def visualize(self, name='bt.png'):
         """Save bt graph to a file."""
         py_trees.display.render_dot_tree(self.behaviour_tree.root, name=name)
+
+
+# Behavior or composite of a template. Leaves have no children, the
+# suffix follows the drawn number in their name.
+TemplateNode = namedtuple(
+    'TemplateNode', ['behavior', 'name', 'item', 'suffix', 'children'])
+
+
+class BTTemplate:
+    """Parsed and validated tree of a phenotype.
+
+    The behavior classes are looked up once in the behavior registry,
+    instantiate creates the behaviors of an agent from them without going
+    through the xml again.
+    """
+
+    def __init__(self, root):
+        """Parse the tree under the xml root."""
+        self.root = root
+        self.behavior = get_behavior(root.tag)
+        self.nodes = self.parse(root)
+
+    def parse(self, root):
+        """Get the template nodes of the children of an xml node."""
+        if len(root) == 0:
+            raise ValueError(
+                'Composite {} has no behaviors'.format(root.tag))
+        nodes = []
+        for node in root:
+            if node.tag not in ['cond', 'act']:
+                nodes.append(TemplateNode(
+                    get_behavior(node.tag), node.tag, None, '',
+                    self.parse(node)))
+            elif len(node) > 0:
+                raise ValueError('Behavior {} has children'.format(node.tag))
+            elif any(child.children is not None for child in nodes):
+                raise ValueError(
+                    'Behavior {} follows a composite in {}'.format(
+                        node.text, root.tag))
+            else:
+                nodes.append(self.parse_behavior(node.text))
+        return tuple(nodes)
+
+    def parse_behavior(self, text):
+        """Get the template node of a behavior like Explore or IsDropable_Hub.
+
+        A third part inverts the behavior.
+        """
+        if text.find('_') == -1:
+            return TemplateNode(get_behavior(text), text, None, '', None)
+        nodeval = text.split('_')
+        if len(nodeval) == 2:
+            method, item = nodeval
+            return TemplateNode(
+                get_behavior(method), method, item, '_' + item, None)
+        method, item, _ = nodeval
+        return TemplateNode(
+            py_trees.meta.inverter(get_behavior(method)), method, item,
+            '_' + item + '_inv', None)
+
+    def instantiate(self, agent):
+        """Create the behaviors of the agent under a new root composite.
+
+        Nodes are numbered in the order of the xml to keep their names
+        apart.
+        """
+        top = self.behavior('Root' + self.root.tag)
+        top.add_children(self.create(self.nodes, agent, itertools.count(1)))
+        return top
+
+    def create(self, nodes, agent, numbers):
+        """Create the behaviors of the template nodes."""
+        behaviors = []
+        for node in nodes:
+            if node.children is None:
+                behavior = node.behavior(
+                    node.name + str(next(numbers)) + node.suffix)
+                behavior.setup(0, agent, node.item)
+            else:
+                behavior = node.behavior(node.name + str(next(numbers)))
+                behavior.add_children(
+                    self.create(node.children, agent, numbers))
+            behaviors.append(behavior)
+        return behaviors
+
+
+class TemplateCache:
+    """Least recently used cache of the templates of phenotypes.
+
+    Agents of a process share the templates, so a phenotype given to many
+    agents or constructed again after a genetic step is parsed once.
+    """
+
+    def __init__(self, size=1024):
+        """Initialize the cache.
+
+        Args:
+            size: maximum number of phenotypes kept
+        """
+        self.templates = OrderedDict()
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, xmlstring):
+        """Get the template of the xml string, parsing it on a miss."""
+        try:
+            template = self.templates[xmlstring]
+            self.templates.move_to_end(xmlstring)
+            self.hits += 1
+            return template
+        except KeyError:
+            self.misses += 1
+
+        template = BTTemplate(ET.fromstring(xmlstring))
+        if self.size > 0:
+            self.templates[xmlstring] = template
+            if len(self.templates) > self.size:
+                self.templates.popitem(last=False)
+        return template
+
+    def hit_rate(self):
+        """Get the share of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Forget the templates and the counts."""
+        self.templates.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Templates of the phenotypes constructed in this process
+templates = TemplateCache()
+
+
+# Every class made by py_trees.meta.inverter shares this update code
+_INVERTER = py_trees.meta.inverter(Behaviour).update.__code__
+
+
+class CompiledBT:
+    """Behavior tree lowered into a chain of closures.
+
+    The py_trees tree stays the reference, the compiled tree ticks the
+    same behaviour instances with the same Sequence, Selector and inverter
+    semantics, including the running child bookkeeping and the initialise
+    and terminate calls. It only leaves out the generators, logging and
+    visitors of py_trees, hooks which do nothing, and stopping subtrees
+    which have not been ticked since they were stopped. Composite behaviors
+    which tick a behaviour_tree of their own in update, like all the
+    scbehaviors, are inlined. The statuses are kept by the closures, so
+    the status attributes of the py_trees nodes are not updated.
+    """
+
+    def __init__(self, root):
+        """Lower the tree under root."""
+        self.root = root
+        self.tick_root, _, self.stop, _ = _lower(root)
+        self.status = Status.INVALID
+        self.count = 0
+
+    def tick(self):
+        """Tick the tree once and return the status of the root."""
+        status = self.tick_root()
+        if status.__class__ is not Status:
+            status = Status.INVALID
+        self.status = status
+        self.count += 1
+        return status
+
+
+def _is_noop(function):
+    """Check if the function does nothing but return None."""
+    for instruction in dis.get_instructions(function):
+        if instruction.opname in ['RESUME', 'NOP', 'RETURN_VALUE']:
+            continue
+        if instruction.opname in ['LOAD_CONST', 'RETURN_CONST'] and (
+                instruction.argval is None):
+            continue
+        return False
+    return True
+
+
+def _hook(node, name):
+    """Get the bound method, or None if the node does nothing in it."""
+    function = getattr(type(node), name)
+    if function is getattr(Behaviour, name) or _is_noop(function):
+        return None
+    return getattr(node, name)
+
+
+def _lower(node):
+    """Lower a py_trees node into its tick, reset and stop closures.
+
+    Reset stops the node if its status is not INVALID, like Sequence does
+    with its children before it starts over. The last item tells if there
+    are no terminate hooks under the node, so stop has nothing to call for
+    a subtree which has not been ticked since it was stopped. Behaviors
+    without hooks have no state that matters, so their tick is update
+    itself and they have no reset and stop, the parent checks the status.
+    """
+    tick = type(node).tick
+    if getattr(type(node).update, '__code__', None) is _INVERTER:
+        return _lower_inverter(node)
+    elif tick is Sequence.tick:
+        return _lower_sequence(node)
+    elif tick is Selector.tick:
+        return _lower_selector(node)
+    elif tick is Behaviour.tick:
+        return _lower_behaviour(node)
+    return _lower_reference(node)
+
+
+def _lower_children(node):
+    """Lower the children into tuples of ticks, resets, stops and pures."""
+    lowered = [_lower(child) for child in node.children]
+    return tuple(zip(*lowered)) or ((), (), (), ())
+
+
+def _present(closures):
+    """Leave out the missing resets or stops."""
+    return tuple(closure for closure in closures if closure is not None)
+
+
+def _lower_behaviour(node):
+    """Lower a behavior like Behaviour.tick does."""
+    initialise = _hook(node, 'initialise')
+    terminate = _hook(node, 'terminate')
+    if isinstance(getattr(node, 'behaviour_tree', None), BehaviourTree):
+        update = _lower(node.behaviour_tree.root)[0]
+    else:
+        update = node.update
+    if initialise is None and terminate is None:
+        return update, None, None, True
+    status = Status.INVALID
+
+    def tick():
+        nonlocal status
+        if status is not Status.RUNNING and initialise is not None:
+            initialise()
+        new_status = update()
+        if new_status.__class__ is not Status:
+            new_status = Status.INVALID
+        if new_status is not Status.RUNNING and terminate is not None:
+            terminate(new_status)
+        status = new_status
+        return new_status
+
+    def reset():
+        if status is not Status.INVALID:
+            stop()
+
+    def stop():
+        nonlocal status
+        if terminate is not None:
+            terminate(Status.INVALID)
+        status = Status.INVALID
+
+    return tick, reset, stop, terminate is None
+
+
+def _lower_inverter(node):
+    """Lower an inverter, which ticks the original and swaps its result."""
+    tick_original, _, stop_original, pure = _lower(node.original)
+    initialise = _hook(node, 'initialise')
+    status = Status.INVALID
+
+    def tick():
+        nonlocal status
+        if status is not Status.RUNNING and initialise is not None:
+            initialise()
+        original = tick_original()
+        if original is Status.SUCCESS:
+            status = Status.FAILURE
+        elif original is Status.FAILURE:
+            status = Status.SUCCESS
+        elif original.__class__ is Status:
+            status = original
+        else:
+            status = Status.INVALID
+        return status
+
+    def reset():
+        if status is not Status.INVALID:
+            stop()
+
+    def stop():
+        nonlocal status
+        if stop_original is not None:
+            stop_original()
+        status = Status.INVALID
+
+    return tick, reset, stop, pure
+
+
+def _lower_sequence(node):
+    """Lower a Sequence, which resumes from its running child."""
+    ticks, resets, stops, pures = _lower_children(node)
+    resets, stops = _present(resets), _present(stops)
+    initialise = _hook(node, 'initialise')
+    update = _hook(node, 'update')
+    terminate = _hook(node, 'terminate')
+    pure = terminate is None and all(pures)
+    status = Status.INVALID
+    index = 0
+    ticked = False
+
+    def tick():
+        nonlocal status, index, ticked
+        ticked = True
+        if status is not Status.RUNNING:
+            index = 0
+            for reset_child in resets:
+                reset_child()
+            if initialise is not None:
+                initialise()
+        if update is not None:
+            update()
+        for tick_child in ticks[index:] if index else ticks:
+            child = tick_child()
+            if child is not Status.SUCCESS:
+                if child.__class__ is not Status:
+                    child = Status.INVALID
+                status = child
+                return child
+            index += 1
+        index -= 1
+        if terminate is not None:
+            terminate(Status.SUCCESS)
+        status = Status.SUCCESS
+        return status
+
+    def reset():
+        if status is not Status.INVALID:
+            stop()
+
+    def stop():
+        nonlocal status, index, ticked
+        if ticked or not pure:
+            ticked = False
+            for stop_child in stops:
+                stop_child()
+            if terminate is not None:
+                terminate(Status.INVALID)
+        index = -1
+        status = Status.INVALID
+
+    return tick, reset, stop, pure
+
+
+def _lower_selector(node):
+    """Lower a Selector, which ticks its children by priority."""
+    ticks, resets, stops, pures = _lower_children(node)
+    # Resets of the lower priority children of each child
+    lower = [_present(resets[i + 1:]) for i in range(len(ticks))]
+    stops = _present(stops)
+    initialise = _hook(node, 'initialise')
+    update = _hook(node, 'update')
+    terminate = _hook(node, 'terminate')
+    pure = terminate is None and all(pures)
+    status = Status.INVALID
+    current = None
+    ticked = False
+
+    def tick():
+        nonlocal status, current, ticked
+        ticked = True
+        if status is not Status.RUNNING and initialise is not None:
+            initialise()
+        if update is not None:
+            update()
+        previous = current
+        for i, tick_child in enumerate(ticks):
+            child = tick_child()
+            if child is Status.RUNNING or child is Status.SUCCESS:
+                current = i
+                status = child
+                if previous != i:
+                    # Interrupted, invalidate the lower priority children
+                    for reset_child in lower[i]:
+                        reset_child()
+                return child
+        current = len(ticks) - 1 if ticks else None
+        status = Status.FAILURE
+        return status
+
+    def reset():
+        if status is not Status.INVALID:
+            stop()
+
+    def stop():
+        nonlocal status, current, ticked
+        if ticked or not pure:
+            ticked = False
+            for stop_child in stops:
+                stop_child()
+            if terminate is not None:
+                terminate(Status.INVALID)
+        current = None
+        status = Status.INVALID
+
+    return tick, reset, stop, pure
+
+
+def _lower_reference(node):
+    """Tick any other node, like a Parallel, through py_trees itself."""
+    def tick():
+        for _ in node.tick():
+            pass
+        return node.status
+
+    def reset():
+        if node.status != Status.INVALID:
+            node.stop(Status.INVALID)
+
+    return tick, reset, node.stop, False
@@ -27,6 +27,12 @@ class Experiment:
         self.grid = grid
         self.phenotype = phenotype
 
+    def __getstate__(self):
+        """Pickle without the database connection."""
+        state = vars(self).copy()
+        state['connect'] = None
+        return state
+
     def insert_experiment(self):
         """Call db function to insert record into db."""
         dbexec = Dbexecute(self.connect)
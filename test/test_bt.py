@@ -0,0 +1,142 @@
+import xml.etree.ElementTree as ET
+from unittest import TestCase
+
+import numpy as np
+from py_trees.composites import Sequence, Selector
+from swarms.behaviors.sbehaviors import IsCarrying, NeighbourObjects
+from swarms.behaviors.scbehaviors import Explore
+from swarms.behaviors.registry import BEHAVIORS, get_behavior, register
+from swarms.lib.agent import Agent
+from swarms.lib.model import Model
+from swarms.utils.bt import BTConstruct, BTTemplate, TemplateCache, templates
+
+PHENOTYPE = (
+    '<?xml version="1.0" encoding="UTF-8"?><Sequence><Selector>'
+    '<cond>IsCarrying_Food_invert</cond><act>Explore</act></Selector>'
+    '<Sequence><cond>NeighbourObjects_Food</cond><act>Explore</act>'
+    '</Sequence></Sequence>')
+
+
+def tree(node, depth=0):
+    """ Get the names and types of a tree, one line per node """
+    kind = type(getattr(node, 'original', node)).__name__
+    lines = ['{}{} {}'.format(' ' * depth, node.name, kind)]
+    for child in node.children:
+        lines += tree(child, depth + 2)
+    return lines
+
+
+class TestTemplates(TestCase):
+
+    def setUp(self):
+        templates.clear()
+        self.model = Model(7)
+
+    def construct(self, phenotype=PHENOTYPE):
+        agent = Agent(0, self.model)
+        agent.shared_content = dict()
+        agent.bt = BTConstruct(None, agent, phenotype)
+        agent.bt.construct()
+        return agent
+
+    def test_phenotype_is_parsed_once(self):
+        first = self.construct()
+        second = self.construct()
+        self.assertEqual((templates.misses, templates.hits), (1, 1))
+        self.assertEqual(templates.hit_rate(), 0.5)
+        first_root = first.bt.behaviour_tree.root
+        second_root = second.bt.behaviour_tree.root
+        self.assertIsNot(first_root.children[0], second_root.children[0])
+        self.assertIs(first_root.children[1].children[1].agent, first)
+        self.assertIs(second_root.children[1].children[1].agent, second)
+
+    def test_nodes_are_numbered_without_drawing(self):
+        state = self.model.random.get_state()
+        self.assertEqual(tree(self.construct().bt.behaviour_tree.root), [
+            'RootSequence Sequence',
+            '  Selector1 Selector',
+            '    IsCarrying2_Food_inv IsCarrying',
+            '    Explore3 Explore',
+            '  Sequence4 Sequence',
+            '    NeighbourObjects5_Food NeighbourObjects',
+            '    Explore6 Explore'])
+        self.assertEqual(
+            tree(self.construct().bt.behaviour_tree.root),
+            tree(self.construct().bt.behaviour_tree.root))
+        np.testing.assert_equal(self.model.random.get_state(), state)
+
+    def test_template_nodes(self):
+        template = BTTemplate(ET.fromstring(PHENOTYPE))
+        self.assertIs(template.behavior, Sequence)
+        selector, sequence = template.nodes
+        self.assertEqual(
+            (selector.behavior, sequence.behavior), (Selector, Sequence))
+        inverted, explore = selector.children
+        self.assertEqual(
+            (inverted.name, inverted.item, inverted.suffix),
+            ('IsCarrying', 'Food', '_Food_inv'))
+        self.assertIs(explore.behavior, Explore)
+        self.assertIsNone(explore.children)
+        self.assertIs(sequence.children[0].behavior, NeighbourObjects)
+
+        root = self.construct().bt.behaviour_tree.root
+        behavior = root.children[0].children[0]
+        self.assertIsInstance(behavior.original, IsCarrying)
+        self.assertTrue(behavior.name.endswith('_Food_inv'))
+
+    def test_brackets_share_the_template(self):
+        self.construct()
+        self.construct(PHENOTYPE.replace('<', '[').replace('>', ']'))
+        self.assertEqual((templates.misses, templates.hits), (1, 1))
+
+    def test_invalid_phenotypes(self):
+        for phenotype in [
+                '<Sequence><Selector><act>Explore</act></Selector>'
+                '<act>Explore</act></Sequence>',
+                '<Sequence><act><act>Explore</act></act></Sequence>',
+                '<Sequence><Selector></Selector></Sequence>',
+                '<Sequence></Sequence>']:
+            with self.assertRaises(ValueError):
+                self.construct(phenotype)
+
+    def test_unknown_behaviors(self):
+        for phenotype in [
+                '<Sequence><act>Dance</act></Sequence>',
+                '<Sequence><act>Dance_Hub</act></Sequence>',
+                '<Parallel><act>Explore</act></Parallel>',
+                '<Sequence><Loop><act>Explore</act></Loop></Sequence>']:
+            with self.assertRaisesRegex(ValueError, 'Unknown behavior'):
+                self.construct(phenotype)
+        self.assertEqual(templates.templates, {})
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TemplateCache(2)
+        phenotypes = [
+            '<Sequence><act>{}</act></Sequence>'.format(name)
+            for name in ['Explore', 'NeighbourObjects', 'IsCarrying_Food']]
+        for phenotype in phenotypes[:2] + phenotypes[:1] + phenotypes[2:]:
+            cache.get(phenotype)
+        self.assertEqual(
+            list(cache.templates), [phenotypes[0], phenotypes[2]])
+        self.assertEqual((cache.misses, cache.hits), (3, 1))
+
+
+class TestRegistry(TestCase):
+
+    def test_behaviors_register_themselves(self):
+        for name in [
+                'Sequence', 'Selector', 'RandomWalk', 'NeighbourObjects',
+                'IsCarrying', 'Explore', 'CompositeDropCue']:
+            self.assertIs(get_behavior(name), BEHAVIORS[name])
+        self.assertIs(get_behavior('Explore'), Explore)
+
+    def test_register(self):
+        @register
+        class Dance(Explore):
+            pass
+        try:
+            self.assertIs(get_behavior('Dance'), Dance)
+        finally:
+            del BEHAVIORS['Dance']
+        with self.assertRaisesRegex(ValueError, 'Unknown behavior Dance'):
+            get_behavior('Dance')
@@ -0,0 +1,188 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from swarms.lib.agent import Agent
+from swarms.lib.model import Model
+from swarms.lib.space import Grid
+from swarms.lib.time import RandomActivation, DormantActivation
+from swarms.lib.objects import Food
+from swarms.utils.bt import BTConstruct
+
+PHENOTYPE = (
+    '<?xml version="1.0" encoding="UTF-8"?><Sequence><act>RandomWalk</act>'
+    '</Sequence>')
+
+
+class CheckpointAgent(Agent):
+    """ An agent walking with a behavior tree and picking up food """
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        self.location = (0, 0)
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+        self.shared_content = dict()
+        self.bt = BTConstruct(None, self, PHENOTYPE)
+        self.bt.construct()
+
+    def step(self):
+        self.bt.behaviour_tree.tick()
+        grid = self.model.grid
+        x = int(self.location[0] + np.cos(self.direction) * self.speed)
+        y = int(self.location[1] + np.sin(self.direction) * self.speed)
+        new_location, self.direction = grid.check_limits(
+            (x, y), self.direction)
+        grid.move_object(self.location, self, new_location)
+        self.location = new_location
+        for food in grid.get_objects_from_grid('Food', self.location):
+            self.shared_content['Food'] = {food}
+            if not self.attached_objects:
+                self.attached_objects.append(food)
+        self.model.log.append((
+            self.name, self.location, self.direction,
+            len(self.attached_objects)))
+
+
+class CheckpointModel(Model):
+    """ A model with food, agents and a database connection """
+    def __init__(self, agents, seed, streams=False):
+        super().__init__(seed, streams=streams)
+        self.grid = Grid(100, 100, 10)
+        self.schedule = RandomActivation(self)
+        self.connect = object()
+        self.log = []
+        for i in range(5):
+            food = Food(i, (5 * i, 5 * i), 5)
+            food.agent_name = None
+            food.phenotype = dict()
+            self.grid.add_object_to_grid(food.location, food)
+        for i in range(agents):
+            agent = CheckpointAgent(i, self)
+            self.grid.add_object_to_grid(agent.location, agent)
+            self.schedule.add(agent)
+
+    def step(self):
+        self.schedule.step()
+
+    def restore(self):
+        self.connect = 'reconnected'
+
+
+class TestCheckpoint(TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'model.ckpt')
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def check_resume(self, model):
+        for _ in range(20):
+            model.step()
+        model.save_checkpoint(self.path)
+        for _ in range(30):
+            model.step()
+        expected = model.log[-30 * len(model.schedule.agents):]
+
+        loaded = CheckpointModel.load_checkpoint(self.path)
+        loaded.log = []
+        for _ in range(30):
+            loaded.step()
+        self.assertEqual(loaded.log, expected)
+        return loaded
+
+    def test_resume_gives_the_same_run(self):
+        loaded = self.check_resume(CheckpointModel(10, 7))
+        self.assertEqual(loaded.connect, 'reconnected')
+        agent = loaded.schedule.agents[0]
+        self.assertTrue(agent.bt.constructed)
+        self.assertIs(agent.bt.behaviour_tree.root.children[0].agent, agent)
+        self.assertIs(agent.model, loaded)
+        self.assertEqual(
+            loaded.grid.get_objects_from_grid(
+                'CheckpointAgent', agent.location).count(agent), 1)
+
+    def test_resume_with_streams(self):
+        self.check_resume(CheckpointModel(10, 7, streams=True))
+
+    def test_background_save(self):
+        model = CheckpointModel(10, 7)
+        for _ in range(5):
+            model.step()
+        process = model.save_checkpoint(self.path, background=True)
+        model.step()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        loaded = CheckpointModel.load_checkpoint(self.path)
+        loaded.step()
+        self.assertEqual(loaded.log[-10:], model.log[-10:])
+
+    def test_tree_is_stored_as_xml(self):
+        model = CheckpointModel(2, 7)
+        state = model.schedule.agents[0].bt.__getstate__()
+        self.assertNotIn('behaviour_tree', state)
+        self.assertEqual(state['xmlstring'], PHENOTYPE)
+
+    def test_connection_is_left_out(self):
+        model = CheckpointModel(2, 7)
+        model.save_checkpoint(self.path)
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.path)), ['model.ckpt'])
+        with patch.object(CheckpointModel, 'restore'):
+            loaded = Model.load_checkpoint(self.path)
+        self.assertIsNone(loaded.connect)
+        self.assertEqual(len(loaded.schedule.agents), 2)
+
+    def test_dormant_watchers_are_saved(self):
+        model = CheckpointModel(2, 7)
+        model.schedule = DormantActivation(model)
+        sleeper, walker = [CheckpointAgent(i, model) for i in range(2)]
+        sleeper.location = (30, 30)
+        walker.location = (25, 35)
+        for agent in [sleeper, walker]:
+            model.schedule.add(agent)
+            model.grid.add_object_to_grid(agent.location, agent)
+        model.schedule.sleep(
+            sleeper, grids=[model.grid.find_cell(sleeper.location)])
+        model.save_checkpoint(self.path)
+
+        loaded = CheckpointModel.load_checkpoint(self.path)
+        sleeper, walker = loaded.schedule.agents
+        self.assertEqual(loaded.schedule.awake, [walker])
+        loaded.grid.move_object(walker.location, walker, (35, 35))
+        self.assertEqual(loaded.schedule.awake, [sleeper, walker])
+
+
+def run_forked(model, steps):
+    # Steps the forked copy of the model and sends back its log
+    model.log = []
+    for _ in range(steps):
+        model.step()
+    return model.log, model.connect
+
+
+class TestFork(TestCase):
+
+    def test_fork_runs_from_the_current_state(self):
+        model = CheckpointModel(10, 7)
+        for _ in range(5):
+            model.step()
+        path = os.path.join(tempfile.mkdtemp(), 'model.ckpt')
+        model.save_checkpoint(path)
+        future = model.fork(run_forked, 10)
+        for _ in range(20):
+            model.step()
+
+        expected = CheckpointModel.load_checkpoint(path)
+        os.remove(path)
+        expected.log = []
+        for _ in range(10):
+            expected.step()
+        log, connect = future.result()
+        self.assertEqual(log, expected.log)
+        self.assertIsNotNone(connect)
+        self.assertEqual(len(model.log), 250)
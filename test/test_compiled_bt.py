@@ -0,0 +1,210 @@
+import pickle
+from unittest import TestCase
+
+import numpy as np
+import py_trees
+from py_trees import Behaviour, Status
+from py_trees.composites import Sequence, Selector, Parallel
+from py_trees.trees import BehaviourTree
+from swarms.lib.agent import Agent
+from swarms.lib.model import Model
+from swarms.lib.space import Grid
+from swarms.lib.time import BaseScheduler
+from swarms.lib.objects import Hub, Sites, Food
+from swarms.utils.bt import BTConstruct, CompiledBT, FORAGING_PHENOTYPE
+
+
+# Foraging behavior of the single foraging example with an inverted check
+PHENOTYPE = FORAGING_PHENOTYPE.replace(
+    '<cond>IsDropable_Hub</cond><cond>IsDropable_Hub</cond>',
+    '<cond>IsCarrying_Food_invert</cond><cond>IsDropable_Hub</cond>')
+
+STATUSES = [
+    Status.SUCCESS, Status.FAILURE, Status.RUNNING, Status.INVALID, None]
+
+
+class Scripted(Behaviour):
+    """ A behavior returning the statuses of its script in turn """
+    def __init__(self, name, script, log):
+        super().__init__(name)
+        self.script = script
+        self.log = log
+        self.ticks = 0
+
+    def update(self):
+        self.log.append((self.name, 'update'))
+        status = self.script[self.ticks % len(self.script)]
+        self.ticks += 1
+        return status
+
+
+class Hooked(Scripted):
+    """ A scripted behavior which logs its initialise and terminate """
+    def initialise(self):
+        self.log.append((self.name, 'initialise'))
+
+    def terminate(self, new_status):
+        self.log.append((self.name, 'terminate', new_status))
+
+
+class Nested(Behaviour):
+    """ A behavior ticking a tree of its own like the composites do """
+    def __init__(self, name, root):
+        super().__init__(name)
+        self.behaviour_tree = BehaviourTree(root)
+
+    def update(self):
+        self.behaviour_tree.tick()
+        return self.behaviour_tree.root.status
+
+
+def random_tree(random, log, depth=0, names=None):
+    """ Build a random tree of scripted behaviors """
+    names = [0] if names is None else names
+    names[0] += 1
+    name = str(names[0])
+    kind = random.randint(5) if depth < 4 else 0
+    if kind in [0, 1]:
+        script = [STATUSES[i] for i in random.choice(
+            len(STATUSES), random.randint(1, 6), p=[.4, .3, .2, .05, .05])]
+        behavior = random.choice([Scripted, Hooked])
+        if kind == 1:
+            behavior = py_trees.meta.inverter(behavior)
+        return behavior(name, script, log)
+    elif kind in [2, 3]:
+        composite = [Sequence, Selector][kind - 2](name)
+        composite.add_children([
+            random_tree(random, log, depth + 1, names)
+            for _ in range(random.randint(1, 5))])
+        return composite
+    return Nested(name, random_tree(random, log, depth + 1, names))
+
+
+class TestCompiledBT(TestCase):
+
+    def check_trees(self, seed, ticks=30):
+        logs = [[], []]
+        roots = [
+            random_tree(np.random.RandomState(seed), log) for log in logs]
+        tree = BehaviourTree(roots[0])
+        compiled = CompiledBT(roots[1])
+        for _ in range(ticks):
+            tree.tick()
+            self.assertEqual(compiled.tick(), tree.root.status)
+        self.assertEqual(logs[1], logs[0])
+        return logs[0]
+
+    def test_random_trees_tick_like_py_trees(self):
+        for seed in range(300):
+            self.check_trees(seed)
+
+    def test_running_children_are_resumed(self):
+        log = []
+        root = Sequence('root')
+        root.add_children([
+            Scripted('a', [Status.SUCCESS], log),
+            Scripted('b', [Status.RUNNING, Status.SUCCESS], log)])
+        compiled = CompiledBT(root)
+        statuses = [compiled.tick() for _ in range(3)]
+        self.assertEqual(
+            statuses, [Status.RUNNING, Status.SUCCESS, Status.RUNNING])
+        self.assertEqual(log, [
+            ('a', 'update'), ('b', 'update'), ('b', 'update'),
+            ('a', 'update'), ('b', 'update')])
+
+    def test_hooks_are_called(self):
+        log = []
+        leaf = Hooked('leaf', [Status.RUNNING, Status.SUCCESS], log)
+        root = Sequence('root')
+        root.add_children([leaf])
+        compiled = CompiledBT(root)
+        statuses = [compiled.tick() for _ in range(3)]
+        self.assertEqual(
+            statuses, [Status.RUNNING, Status.SUCCESS, Status.RUNNING])
+        self.assertEqual(log, [
+            ('leaf', 'initialise'), ('leaf', 'update'),
+            ('leaf', 'update'), ('leaf', 'terminate', Status.SUCCESS),
+            ('leaf', 'terminate', Status.INVALID),
+            ('leaf', 'initialise'), ('leaf', 'update')])
+
+    def test_other_composites_tick_through_py_trees(self):
+        logs = [[], []]
+        roots = []
+        for log in logs:
+            root = Parallel('parallel')
+            root.add_children([
+                Hooked('a', [Status.SUCCESS], log),
+                Scripted('b', [Status.RUNNING, Status.FAILURE], log)])
+            roots.append(root)
+        tree = BehaviourTree(roots[0])
+        compiled = CompiledBT(roots[1])
+        for _ in range(4):
+            tree.tick()
+            self.assertEqual(compiled.tick(), tree.root.status)
+        self.assertEqual(logs[1], logs[0])
+
+
+class ForagingAgent(Agent):
+    """ An agent foraging with the behaviors of a phenotype """
+    def __init__(self, name, model, compiled):
+        super().__init__(name, model)
+        self.location = (0, 0)
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+        self.moveable = True
+        self.carryable = False
+        self.shared_content = {'Hub': {model.hub}}
+        self.bt = BTConstruct(None, self, PHENOTYPE, compiled=compiled)
+        self.bt.construct()
+
+    def step(self):
+        self.model.log.append((self.name, self.bt.tick(), self.location))
+
+
+class ForagingModel(Model):
+    """ A model with a hub, a site with food and foraging agents """
+    def __init__(self, agents, seed, compiled):
+        super().__init__(seed)
+        self.grid = Grid(100, 100, 10)
+        self.schedule = BaseScheduler(self)
+        self.log = []
+        self.hub = Hub(id=1, location=(0, 0), radius=11)
+        self.grid.add_object_to_grid(self.hub.location, self.hub)
+        site = Sites(id=2, location=(30, -30), radius=5)
+        self.grid.add_object_to_grid(site.location, site)
+        for i in range(20):
+            food = Food(i, location=site.location, radius=site.radius)
+            food.agent_name = None
+            food.phenotype = dict()
+            self.grid.add_object_to_grid(food.location, food)
+        for i in range(agents):
+            agent = ForagingAgent(i, self, compiled)
+            self.grid.add_object_to_grid(agent.location, agent)
+            self.schedule.add(agent)
+
+    def step(self):
+        self.schedule.step()
+
+
+class TestCompiledPhenotype(TestCase):
+
+    def test_phenotype_runs_like_py_trees(self):
+        models = [ForagingModel(20, 123, compiled) for compiled in [
+            False, True]]
+        for _ in range(100):
+            for model in models:
+                model.step()
+        self.assertEqual(models[1].log, models[0].log)
+        self.assertEqual(
+            [agent.direction for agent in models[1].schedule.agents],
+            [agent.direction for agent in models[0].schedule.agents])
+
+    def test_compiled_tree_is_rebuilt(self):
+        model = ForagingModel(2, 123, True)
+        bt = model.schedule.agents[0].bt
+        self.assertNotIn('compiled_tree', bt.__getstate__())
+        bt = pickle.loads(pickle.dumps(bt))
+        bt.rebuild()
+        self.assertIsInstance(bt.compiled_tree, CompiledBT)
+        self.assertIn(bt.tick(), list(Status))
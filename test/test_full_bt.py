@@ -6,7 +6,6 @@ from swarms.lib.space import Grid
 from unittest import TestCase
 from swarms.utils.bt import BTConstruct
 import py_trees
-from py_trees import Blackboard
 import numpy as np
 # import xml.etree.ElementTree as ET
 
@@ -50,9 +49,6 @@ class GEBTAgent(Agent):
         # Define a BTContruct object
         self.bt = BTConstruct(None, self)
 
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
-
         self.shared_content = dict()
 
         # Grammatical Evolution part
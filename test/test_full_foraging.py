@@ -121,8 +121,6 @@ class XMLTestAgent(Agent):
         self.timestamp += 1
         self.location_history.add(self.location)
         self.behaviour_tree.tick()
-        # self.blackboard = Blackboard()
-        # self.blackboard.shared_content = dict()
         self.food_collected = len(self.get_food_in_hub())
         self.overall_fitness()
 
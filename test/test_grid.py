@@ -2,7 +2,14 @@
 
 import unittest
 
-from swarms.lib.space import Grid
+import numpy as np
+
+from swarms.lib.agent import Agent
+from swarms.lib.model import Model
+from swarms.lib.objects import Food, Hub
+from swarms.lib.space import (
+    Grid, MultiResolutionGrid, AgentIndex, Perception)
+from swarms.lib.time import BaseScheduler
 
 """
 Simple grid for testing
@@ -91,14 +98,14 @@ class TestGrid(unittest.TestCase):
         '''
         point = (-2, -2)
         radius = 5
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [8, 9, 10, 14, 15, 16, 20, 21, 22])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [8, 9, 10, 14, 15, 16, 20, 21, 22])
 
         radius = 9
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius),
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)),
         [1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 13, 14, 15, 16, 17, 19, 20, 21, 22, 23, 25, 26, 27, 28, 29])
 
         radius = 4
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [15])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [15])
 
     def test_neighbour_grid_equal_width_height_big_radius(self):
         '''
@@ -107,7 +114,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (11, 11)
         radius = 17
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius),
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)),
         [8, 9, 10, 11, 12, 14, 15, 16, 17, 18, 20, 21, 22, 23, 24, 26, 27, 28, 29, 30,
         32, 33, 34, 35, 36])
 
@@ -118,7 +125,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (10, 6)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [35, 36, 23, 24, 29, 30])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [35, 36, 23, 24, 29, 30])
 
     def test_neighbour_grid_equal_width_height_upper_verticle(self):
         '''
@@ -127,7 +134,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (-2, 10)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [32, 33, 34, 26, 27, 28])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [32, 33, 34, 26, 27, 28])
 
     def test_neighbour_grid_equal_width_height_lower_verticle(self):
         '''
@@ -136,7 +143,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (6, -10)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [4, 5, 6, 10, 11, 12])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [4, 5, 6, 10, 11, 12])
 
     def test_neighbour_grid_equal_width_height_left_horizontal(self):
         '''
@@ -145,7 +152,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (-10, 2)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [13, 14, 19, 20, 25, 26])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [13, 14, 19, 20, 25, 26])
 
     def test_neighbour_grid_equal_width_height_bottom_left(self):
         '''
@@ -154,7 +161,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (-10, -10)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [8, 1, 2, 7])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [8, 1, 2, 7])
 
     def test_neighbour_grid_equal_width_height_top_left(self):
         '''
@@ -163,7 +170,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (-10, 10)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [32, 25, 26, 31])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [32, 25, 26, 31])
 
     def test_neighbour_grid_equal_width_height_bottom_right(self):
         '''
@@ -172,7 +179,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (10, -10)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [11, 12, 5, 6])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [11, 12, 5, 6])
 
     def test_neighbour_grid_equal_width_height_top_right(self):
         '''
@@ -181,7 +188,7 @@ class TestGrid(unittest.TestCase):
         '''
         point = (10, 10)
         radius = 6
-        self.assertEqual(self.grid_four_equal_width_height.get_neighborhood(point, radius), [35, 36, 29, 30])
+        self.assertEqual(list(self.grid_four_equal_width_height.get_neighborhood(point, radius)), [35, 36, 29, 30])
 
     def test_neighbour_grid_unequal_width_height(self):
         '''
@@ -191,10 +198,10 @@ class TestGrid(unittest.TestCase):
         point = (-2, -2)
 
         radius = 4
-        self.assertEqual(self.grid_four_unequal_width_height.get_neighborhood(point, radius), [9])
+        self.assertEqual(list(self.grid_four_unequal_width_height.get_neighborhood(point, radius)), [9])
 
         radius = 5
-        self.assertEqual(self.grid_four_unequal_width_height.get_neighborhood(point, radius), [2, 3, 4, 8, 9, 10, 14, 15, 16])
+        self.assertEqual(list(self.grid_four_unequal_width_height.get_neighborhood(point, radius)), [2, 3, 4, 8, 9, 10, 14, 15, 16])
 
     def test_neighbour_grid_unequal_width_height_big_radius(self):
         '''
@@ -204,7 +211,7 @@ class TestGrid(unittest.TestCase):
         point = (11, 7)
 
         radius = 17
-        self.assertEqual(self.grid_four_unequal_width_height.get_neighborhood(point, radius),
+        self.assertEqual(list(self.grid_four_unequal_width_height.get_neighborhood(point, radius)),
         [2, 3, 4, 5, 6, 8, 9, 10, 11, 12, 14, 15, 16, 17, 18, 20, 21, 22, 23, 24])
 
     def test_neighbour_grid_five(self):
@@ -215,10 +222,10 @@ class TestGrid(unittest.TestCase):
         point = (2, -2)
 
         radius = 5
-        self.assertEqual(self.grid_five.get_neighborhood(point, radius), [7])
+        self.assertEqual(list(self.grid_five.get_neighborhood(point, radius)), [7])
 
         radius = 6
-        self.assertEqual(self.grid_five.get_neighborhood(point, radius), [2, 3, 4, 6, 7, 8, 10, 11, 12])
+        self.assertEqual(list(self.grid_five.get_neighborhood(point, radius)), [2, 3, 4, 6, 7, 8, 10, 11, 12])
 
     def test_modify_points(self):
         '''
@@ -232,3 +239,451 @@ class TestGrid(unittest.TestCase):
         self.assertEqual(self.grid_five.modify_points(point), (6, 6))
         # This point is the starting point. Modify point should increase it
         self.assertEqual(self.grid_five.modify_points((-10, -10)), (-9, -9))
+
+    def test_check_limits_batch_matches_scalar(self):
+        '''
+        Ensure the batch boundary check gives the values of check_limits
+        '''
+        grid = Grid(100, 100, grid_size=10)
+        random = np.random.RandomState(123)
+        locations = np.vstack([
+            random.uniform(-60, 60, (500, 2)),
+            random.randint(-55, 55, (500, 2)),
+            [[50, 50], [-50, -50], [51, -51], [50.5, 49.5]]])
+        directions = random.uniform(0, 2 * np.pi, len(locations))
+        batch_locations, batch_directions = grid.check_limits_batch(
+            locations, directions)
+        for i, (location, direction) in enumerate(
+                zip(locations.tolist(), directions.tolist())):
+            new_location, new_direction = grid.check_limits(
+                location, direction)
+            self.assertEqual(
+                tuple(batch_locations[i].tolist()), new_location)
+            self.assertEqual(batch_directions[i], new_direction)
+
+    def test_find_cell_matches_bounding_box_lookup(self):
+        '''
+        Ensure the integer grid lookup agrees with the bounding box lookup
+        for every point inside the environment, including grid lines
+        '''
+        for grid in [
+                self.grid_four_equal_width_height,
+                self.grid_four_unequal_width_height, self.grid_five]:
+            for x in range(-grid.width // 2, grid.width // 2 + 1):
+                for y in range(-grid.height // 2, grid.height // 2 + 1):
+                    for point in [(x, y), (x + 0.5, y - 0.5)]:
+                        grid_key = (
+                            grid.find_lowerbound(point),
+                            grid.find_upperbound(point))
+                        if grid_key not in grid.grid:
+                            continue
+                        self.assertEqual(
+                            grid.find_cell(point), grid.grid[grid_key])
+                        self.assertEqual(
+                            grid.find_grid(point),
+                            (grid_key, grid.grid[grid_key]))
+
+    def test_neighbour_grid_footprint_cache(self):
+        '''
+        Ensure neighbourhoods are immutable and served from the
+        footprint cache on repeated queries
+        '''
+        grid = self.grid_four_equal_width_height
+        first = grid.get_neighborhood((-2, -2), 5)
+        self.assertIsInstance(first, tuple)
+        # Another point in the same grid with the same radius is a hit
+        second = grid.get_neighborhood((-1, -3), 5)
+        self.assertIs(first, second)
+        info = grid.footprint_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+        self.assertEqual(info.hit_rate, 0.5)
+
+    def test_neighbour_grid_footprint_cache_is_bounded(self):
+        '''
+        Ensure the footprint cache evicts the least recently used entry
+        '''
+        grid = Grid(24, 24, grid_size=4, footprint_cache_size=2)
+        grid.get_neighborhood((-2, -2), 5)
+        grid.get_neighborhood((2, 2), 5)
+        grid.get_neighborhood((-2, -2), 5)
+        grid.get_neighborhood((6, 6), 5)
+        self.assertEqual(grid.footprint_cache_info().currsize, 2)
+        self.assertIn((grid.find_cell((-2, -2)), 1), grid.footprints)
+        self.assertNotIn((grid.find_cell((2, 2)), 1), grid.footprints)
+        # The evicted neighbourhood is still computed correctly
+        self.assertEqual(
+            list(grid.get_neighborhood((2, 2), 5)),
+            list(Grid(24, 24, grid_size=4).get_neighborhood((2, 2), 5)))
+
+
+class TestGridBuckets(unittest.TestCase):
+    '''
+    Testing the type partitioned object buckets of the grid
+    '''
+
+    def setUp(self):
+        self.grid = Grid(20, 20, grid_size=5)
+        self.hub = Hub(location=(2, 2), radius=5)
+        self.foods = [Food(i, location=(2, 2), radius=2) for i in range(3)]
+        self.grid.add_object_to_grid(self.hub.location, self.hub)
+        for food in self.foods:
+            self.grid.add_object_to_grid(food.location, food)
+
+    def test_get_objects_by_type(self):
+        self.assertEqual(self.grid.get_objects('Food', 11), self.foods)
+        self.assertEqual(self.grid.get_objects('Hub', 11), [self.hub])
+        self.assertEqual(self.grid.get_objects('Sites', 11), [])
+        self.assertEqual(
+            self.grid.get_objects(None, 11), [self.hub] + self.foods)
+        self.assertEqual(
+            self.grid.get_objects_from_list_of_grid('Food', [10, 11]),
+            self.foods)
+
+    def test_remove_object(self):
+        self.grid.remove_object_from_grid((2, 2), self.foods[1])
+        self.assertEqual(
+            self.grid.get_objects('Food', 11),
+            [self.foods[0], self.foods[2]])
+        with self.assertRaises(ValueError):
+            self.grid.remove_object_from_grid((2, 2), self.foods[1])
+
+    def test_move_object(self):
+        food = self.foods[0]
+        self.grid.move_object((2, 2), food, (-7, -7))
+        self.assertNotIn(food, self.grid.get_objects('Food', 11))
+        self.assertEqual(
+            self.grid.get_objects_from_grid('Food', (-7, -7)), [food])
+
+    def test_move_large_object(self):
+        '''
+        Ensure incremental moves of objects spanning many grids leave the
+        same grid contents as adding the object at its new location
+        '''
+        grid = Grid(100, 100, grid_size=10)
+        expected = Grid(100, 100, grid_size=10)
+        debris = Food(1, location=(0, 0), radius=20)
+        grid.add_object_to_grid(debris.location, debris)
+        for point in [(11, 0), (11, 12), (-30, 40), (-30, 40), (49, -49)]:
+            grid.move_object(debris.location, debris, point)
+            debris.location = point
+            occupied = {
+                value for value, buckets in grid.grid_objects.items()
+                if debris in buckets.get('Food', {})}
+            self.assertEqual(
+                occupied, set(expected.get_neighborhood(point, 20)))
+
+    def test_share_layout(self):
+        replicate = Grid(20, 20, grid_size=5)
+        replicate.share_layout(self.grid)
+        self.assertIs(replicate.footprints, self.grid.footprints)
+        self.assertEqual(replicate.get_objects('Food', 11), [])
+        food = Food(9, location=(2, 2), radius=2)
+        replicate.add_object_to_grid(food.location, food)
+        self.assertEqual(replicate.get_objects('Food', 11), [food])
+        self.assertEqual(self.grid.get_objects('Food', 11), self.foods)
+        with self.assertRaises(ValueError):
+            Grid(40, 20, grid_size=5).share_layout(self.grid)
+
+
+class TestGridRadiusQuery(unittest.TestCase):
+    '''
+    Testing the circular radius queries of the grid
+    '''
+
+    def setUp(self):
+        self.grid = Grid(100, 100, grid_size=10)
+        random = np.random.RandomState(123)
+        self.foods = []
+        for i in range(300):
+            location = tuple(random.randint(-50, 50, 2).tolist())
+            food = Food(i, location=location, radius=2)
+            self.grid.add_object_to_grid(location, food)
+            self.foods.append(food)
+        self.hub = Hub(location=(0, 0), radius=10)
+        self.grid.add_object_to_grid(self.hub.location, self.hub)
+
+    def test_circle_grids_prune_corners(self):
+        grids = self.grid.get_circle_grids((5, 5), 12)
+        self.assertTrue(
+            set(grids) < set(self.grid.get_neighborhood((5, 5), 25)))
+        # Grid with the corner (-20, -20) to (-10, -10) is too far
+        self.assertNotIn(self.grid.find_cell((-15, -15)), grids)
+        self.assertIn(self.grid.find_cell((-5, -5)), grids)
+
+    def test_query_radius_matches_brute_force(self):
+        for point, radius in [((0, 0), 10), ((5, 5), 12), ((-47, 33), 25)]:
+            expected = {
+                food for food in self.foods if np.hypot(
+                    food.location[0] - point[0],
+                    food.location[1] - point[1]) <= radius}
+            for threshold in [0, 4096]:
+                # Both the python and the vectorised distance check
+                self.grid.vectorise_threshold = threshold
+                found = self.grid.query_radius(point, radius, 'Food')
+                self.assertEqual(len(found), len(set(found)))
+                self.assertEqual(set(found), expected)
+
+    def test_query_radius_excludes_square_corners(self):
+        def outside(foods):
+            return [
+                food for food in foods if np.hypot(*food.location) > 15]
+        cells = self.grid.get_neighborhood(self.hub.location, 15)
+        in_cells = self.grid.get_objects_from_list_of_grid('Food', cells)
+        in_hub = self.grid.query_radius(self.hub.location, 15, 'Food')
+        self.assertNotEqual(outside(in_cells), [])
+        self.assertEqual(outside(in_hub), [])
+        self.assertEqual(
+            self.grid.query_radius((0, 0), 1, 'Hub'), [self.hub])
+
+    def test_query_radius_finds_large_objects_once(self):
+        grid = Grid(100, 100, grid_size=10)
+        hub = Hub(location=(0, 0), radius=20)
+        grid.add_object_to_grid(hub.location, hub)
+        for radius in [5, 10]:
+            for name in [None, 'Hub']:
+                self.assertEqual(
+                    grid.query_radius((3, 3), radius, name), [hub])
+
+
+class TestSparseGrid(unittest.TestCase):
+    '''
+    Testing the lazily allocated grid against the dense grid
+    '''
+
+    def setUp(self):
+        self.dense = Grid(100, 60, grid_size=10)
+        self.sparse = Grid(100, 60, grid_size=10, sparse=True)
+
+    def test_nothing_allocated(self):
+        self.assertEqual(self.sparse.grid_objects, {})
+        self.assertEqual(self.sparse.grid, {})
+        self.assertEqual(self.sparse.grid_len, self.dense.grid_len)
+        self.assertEqual(self.sparse.get_objects(None, 7), [])
+
+    def test_find_grid_matches_dense(self):
+        random = np.random.RandomState(123)
+        points = [(-50, -30), (50, 30), (0, 0), (49.9, -30)] + [
+            tuple(point) for point in random.uniform(
+                (-50, -30), (50, 30), (200, 2)).tolist()]
+        for point in points:
+            self.assertEqual(
+                self.sparse.find_grid(point), self.dense.find_grid(point))
+
+    def test_objects_match_dense(self):
+        hub = Hub(location=(0, 0), radius=15)
+        food = Food(1, location=(-45, 25), radius=2)
+        for grid in [self.dense, self.sparse]:
+            grid.add_object_to_grid(hub.location, hub)
+            grid.add_object_to_grid(food.location, food)
+            grid.move_object((-45, 25), food, (12, 3))
+        food.location = (12, 3)
+        for value in range(1, self.dense.grid_len + 1):
+            self.assertEqual(
+                self.sparse.get_objects(None, value),
+                self.dense.get_objects(None, value))
+        self.assertEqual(
+            self.sparse.query_radius((10, 0), 5, 'Food'), [food])
+
+    def test_empty_grids_are_freed(self):
+        food = Food(1, location=(0, 0), radius=12)
+        self.sparse.add_object_to_grid(food.location, food)
+        self.assertEqual(len(self.sparse.grid_objects), 9)
+        self.sparse.move_object(food.location, food, (40, 20))
+        self.assertEqual(
+            set(self.sparse.grid_objects),
+            set(self.sparse.get_neighborhood((40, 20), 12)))
+        self.sparse.remove_object_from_grid((40, 20), food)
+        self.assertEqual(self.sparse.grid_objects, {})
+        with self.assertRaises(ValueError):
+            self.sparse.remove_object_from_grid((40, 20), food)
+
+
+class TestMultiResolutionGrid(unittest.TestCase):
+    '''
+    Testing the two level grid against brute force overlap checks
+    '''
+
+    def setUp(self):
+        self.grid = MultiResolutionGrid(200, 200, grid_size=10)
+        random = np.random.RandomState(123)
+        self.objects = []
+        for i in range(200):
+            location = tuple(random.randint(-100, 100, 2).tolist())
+            radius = int(random.choice([2, 3, 5, 10, 12, 20]))
+            food = Food(i, location=location, radius=radius)
+            self.grid.add_object_to_grid(location, food)
+            self.objects.append(food)
+
+    def test_objects_kept_in_single_grid(self):
+        self.assertEqual(self.grid.coarse.grid_size, 50)
+        self.assertEqual(self.grid.level_radius, [5, 20])
+        registered = [
+            item for buckets in self.grid.grid_objects.values()
+            for item in buckets.get('Food', {})]
+        self.assertEqual(sorted(registered, key=id), sorted(
+            self.objects, key=id))
+        hub = Hub(location=(0, 0), radius=10)
+        self.grid.add_object_to_grid(hub.location, hub)
+        self.assertEqual(
+            self.grid.get_objects('Hub', self.grid.grid_len + 11), [hub])
+
+    def test_neighborhood_matches_grid(self):
+        grid = Grid(200, 200, grid_size=10)
+        for item in self.objects:
+            grid.add_object_to_grid(item.location, item)
+        random = np.random.RandomState(7)
+        for item in self.objects[:50]:
+            location = tuple(random.randint(-100, 100, 2).tolist())
+            for backend in [grid, self.grid]:
+                backend.move_object(item.location, item, location)
+            item.location = location
+        for point in random.uniform(-100, 100, (500, 2)).tolist():
+            for radius in [0, 3, 15, 25]:
+                expected = grid.get_objects_from_list_of_grid(
+                    'Food', grid.get_neighborhood(point, radius))
+                found = self.grid.get_objects_from_list_of_grid(
+                    'Food', self.grid.get_neighborhood(point, radius))
+                self.assertEqual(len(found), len(set(found)))
+                self.assertEqual(set(found), set(expected))
+            self.assertEqual(
+                set(self.grid.get_objects_from_grid('Food', point)),
+                set(grid.get_objects_from_grid('Food', point)))
+            self.assertEqual(
+                set(self.grid.query_radius(point, 12)),
+                set(grid.query_radius(point, 12)))
+
+    def test_query_radius_matches_brute_force(self):
+        for point, radius in [((0, 0), 10), ((5, 5), 12), ((-97, 33), 25)]:
+            expected = {
+                item for item in self.objects if np.hypot(
+                    item.location[0] - point[0],
+                    item.location[1] - point[1]) <= radius}
+            self.assertEqual(
+                set(self.grid.query_radius(point, radius, 'Food')),
+                expected)
+
+    def test_move_and_remove_object(self):
+        for item in self.objects[:20]:
+            self.grid.move_object(item.location, item, (-99, 99))
+            item.location = (-99, 99)
+        self.assertTrue(
+            set(self.objects[:20]) <= set(
+                self.grid.get_objects_from_grid('Food', (-99, 99))))
+        item = self.objects[0]
+        self.grid.remove_object_from_grid(item.location, item)
+        self.assertNotIn(
+            item, self.grid.get_objects_from_grid('Food', (-99, 99)))
+        with self.assertRaises(ValueError):
+            self.grid.remove_object_from_grid(item.location, item)
+
+
+class IndexedAgent(Agent):
+    def __init__(self, name, model, location):
+        super().__init__(name, model)
+        self.location = location
+        self.radius = 3
+
+
+class TestAgentIndex(unittest.TestCase):
+    '''
+    Testing the array backed agent index against the grid
+    '''
+
+    def setUp(self):
+        self.model = Model(seed=123)
+        self.model.grid = Grid(100, 100, grid_size=10)
+        self.model.schedule = BaseScheduler(self.model)
+        for i in range(200):
+            location = tuple(self.model.random.randint(-50, 50, 2))
+            agent = IndexedAgent(i, self.model, location)
+            self.model.schedule.add(agent)
+            self.model.grid.add_object_to_grid(location, agent)
+        self.index = AgentIndex(self.model, 'IndexedAgent')
+
+    def test_cellmates_match_grid(self):
+        for agent in self.model.schedule.agents:
+            self.assertEqual(
+                set(self.index.cellmates(agent)),
+                set(self.model.grid.get_objects_from_grid(
+                    'IndexedAgent', agent.location)))
+
+    def test_neighbours_match_brute_force(self):
+        agents = self.model.schedule.agents
+        locations = np.array([agent.location for agent in agents])
+        for radius in [3, 12, 25]:
+            for agent in agents:
+                distance = np.linalg.norm(
+                    locations - np.array(agent.location), axis=1)
+                expected = {
+                    other for other, dist in zip(agents, distance)
+                    if dist <= radius and other is not agent}
+                self.assertEqual(
+                    set(self.index.neighbours(agent, radius)), expected)
+
+    def test_rebuild_once_per_step(self):
+        agent = self.model.schedule.agents[0]
+        self.index.cellmates(agent)
+        old_location = agent.location
+        agent.location = (45, 45)
+        # The snapshot is kept until the scheduler takes a step
+        self.assertEqual(
+            self.index.locations[0].tolist(), list(old_location))
+        self.index.cellmates(agent)
+        self.assertEqual(
+            self.index.locations[0].tolist(), list(old_location))
+        self.model.schedule.step()
+        self.assertIn(agent, self.index.cellmates(agent))
+        self.assertEqual(self.index.locations[0].tolist(), [45, 45])
+
+
+class TestPerception(unittest.TestCase):
+    '''
+    Testing the objects sensed once per tick by the agents
+    '''
+
+    def setUp(self):
+        self.grid = Grid(20, 20, grid_size=5)
+        self.hub = Hub(location=(2, 2), radius=5)
+        self.foods = [Food(i, location=(2, 2), radius=2) for i in range(3)]
+        self.grid.add_object_to_grid(self.hub.location, self.hub)
+        for food in self.foods:
+            self.grid.add_object_to_grid(food.location, food)
+        self.perception = Perception()
+
+    def query(self, name, location=(2, 2), radius=3):
+        return self.grid.get_objects_from_list_of_grid(
+            name, self.grid.get_neighborhood(location, radius))
+
+    def test_senses_match_grid_queries(self):
+        for name in ['Food', 'Hub', 'Sites', None, 'Food']:
+            self.assertEqual(
+                self.perception.sense(self.grid, (2, 2), 3, name),
+                self.query(name))
+        self.assertEqual(
+            (self.perception.senses, self.perception.queries), (5, 1))
+
+    def test_moving_invalidates(self):
+        self.perception.sense(self.grid, (2, 2), 3, 'Food')
+        self.assertEqual(
+            self.perception.sense(self.grid, (-7, -7), 3, 'Food'),
+            self.query('Food', (-7, -7)))
+        self.perception.sense(self.grid, (-7, -7), 5, 'Food')
+        self.assertEqual(self.perception.queries, 3)
+
+    def test_grid_changes_invalidate(self):
+        self.perception.sense(self.grid, (2, 2), 3, 'Food')
+        self.grid.remove_object_from_grid((2, 2), self.foods[1])
+        self.assertEqual(
+            self.perception.sense(self.grid, (2, 2), 3, 'Food'),
+            [self.foods[0], self.foods[2]])
+        self.grid.move_object((2, 2), self.foods[0], (-7, -7))
+        self.assertEqual(
+            self.perception.sense(self.grid, (2, 2), 3, 'Food'),
+            [self.foods[2]])
+        self.assertEqual(self.perception.queries, 3)
+
+    def test_senses_are_copies(self):
+        self.perception.sense(self.grid, (2, 2), 3, 'Food').clear()
+        self.perception.sense(self.grid, (2, 2), 3).clear()
+        self.assertEqual(
+            self.perception.sense(self.grid, (2, 2), 3, 'Food'), self.foods)
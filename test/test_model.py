@@ -0,0 +1,151 @@
+import sqlite3
+from unittest import TestCase
+
+from swarms.lib.model import Model, Sampler, Replicates
+from swarms.lib.objects import Food
+from swarms.lib.space import Grid
+
+
+class CountingModel(Model):
+    """ A model whose metric grows by one every step up to a limit """
+    def __init__(self, limit=None):
+        super().__init__(7)
+        self.count = 0
+        self.limit = limit
+
+    def step(self):
+        if self.limit is None or self.count < self.limit:
+            self.count += 1
+
+
+class TestRun(TestCase):
+
+    def test_budget(self):
+        model = CountingModel()
+        self.assertEqual(model.run(25), 25)
+        self.assertEqual(model.count, 25)
+
+    def test_sampling_period(self):
+        model = CountingModel()
+        count = Sampler(lambda model: model.count, period=10)
+        model.run(35, [count])
+        self.assertEqual(count.values, [10, 20, 30])
+
+    def test_stop_when_metric_reaches(self):
+        model = CountingModel()
+        count = Sampler(lambda model: model.count, period=5)
+        self.assertEqual(model.run(100, [count], [count.reaches(12)]), 15)
+
+    def test_stop_on_plateau(self):
+        model = CountingModel(limit=20)
+        count = Sampler(lambda model: model.count, period=2)
+        taken = model.run(1000, [count], [count.plateau(4)])
+        self.assertEqual(taken, 26)
+        self.assertEqual(count.values[-4:], [20, 20, 20, 20])
+
+    def test_stop_when_not_running(self):
+        model = CountingModel()
+        stopper = Sampler(lambda model: setattr(
+            model, 'running', model.count < 8))
+        self.assertEqual(model.run(samplers=[stopper]), 8)
+
+
+class WalkingModel(Model):
+    """ A model whose position does a random walk on a grid """
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.grid = Grid(100, 100, 10)
+        self.food = Food(1, (0, 0), 5)
+        self.grid.add_object_to_grid(self.food.location, self.food)
+        self.walk = []
+
+    def step(self):
+        x, y = self.food.location
+        location = (
+            x + self.random.randint(-3, 4), y + self.random.randint(-3, 4))
+        location, _ = self.grid.check_limits(location, 0)
+        self.grid.move_object(self.food.location, self.food, location)
+        self.food.location = location
+        self.walk.append(location)
+
+
+class ConnectedModel(WalkingModel):
+    """ A walking model which logs its walk into its own database """
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.restore()
+
+    def restore(self):
+        self.connect = sqlite3.connect(':memory:')
+
+    def finish(self):
+        self.connect.execute('create table walk (x int, y int)')
+        self.connect.executemany('insert into walk values (?, ?)', self.walk)
+        return self.connect.execute('select count(*) from walk').fetchone()[0]
+
+
+class TestReplicates(TestCase):
+
+    def test_replicates_match_single_runs(self):
+        replicates = Replicates(WalkingModel, 4, seed=7)
+        self.assertEqual(len(replicates), 4)
+        for _ in range(50):
+            replicates.step()
+        walks = [model.walk for model in replicates.models]
+        self.assertEqual(len(set(map(tuple, walks))), 4)
+        for model in replicates.models:
+            single = WalkingModel(model.seed)
+            single.run(50)
+            self.assertEqual(single.walk, model.walk)
+            self.assertIs(
+                model.grid.footprints, replicates.models[0].grid.footprints)
+            self.assertEqual(model.grid.get_objects_from_grid(
+                'Food', model.food.location), [model.food])
+
+    def test_replicates_stop_on_their_own(self):
+        replicates = Replicates(WalkingModel, 3, seed=7)
+
+        def setup(model):
+            distance = Sampler(lambda model: abs(model.food.location[0]))
+            return [distance], [distance.reaches(10)]
+
+        taken = replicates.run(500, setup)
+        for model, steps in zip(replicates.models, taken):
+            self.assertEqual(len(model.walk), steps)
+            single = WalkingModel(model.seed)
+            self.assertEqual(single.run(500, *setup(single)), steps)
+            self.assertTrue(
+                steps == 500 or abs(model.food.location[0]) >= 10)
+
+    def test_forked_replicates_match_in_process(self):
+        samples = []
+
+        def setup(model):
+            distance = Sampler(lambda model: abs(model.food.location[0]))
+            samples.append(distance)
+            return [distance], [distance.reaches(10)]
+
+        replicates = [
+            Replicates(WalkingModel, 5, seed=7, workers=workers)
+            for workers in [None, 2]]
+        taken = [batch.run(500, setup) for batch in replicates]
+        self.assertEqual(taken[0], taken[1])
+        self.assertEqual(
+            [model.walk for model in replicates[0].models],
+            [model.walk for model in replicates[1].models])
+        self.assertEqual(
+            [sampler.values for sampler in samples[:5]],
+            [sampler.values for sampler in samples[5:]])
+        for model in replicates[1].models:
+            self.assertIs(
+                model.grid.footprints, replicates[1].models[0].grid.footprints)
+            self.assertEqual(model.grid.get_objects_from_grid(
+                'Food', model.food.location), [model.food])
+
+    def test_forked_replicates_restore_their_resources(self):
+        replicates = Replicates(ConnectedModel, 4, seed=7, workers=2)
+        replicates.run(20)
+        connections = [model.connect for model in replicates.models]
+        self.assertEqual(len(set(map(id, connections))), 4)
+        for model in replicates.models:
+            self.assertEqual(model.finish(), 20)
@@ -0,0 +1,34 @@
+import unittest
+
+from swarms.lib.objects import (
+    EnvironmentObject, Hub, Sites, Obstacles, Food, Debris, Signal, Cue)
+
+
+class TestObjects(unittest.TestCase):
+    '''
+    Testing the slotted environment objects
+    '''
+
+    def test_objects_have_no_dict(self):
+        food = Food(1, (0, 0), 2)
+        for item in [
+                EnvironmentObject(), Hub(), Sites(), Obstacles(), food,
+                Debris(), Signal(object_to_communicate=food),
+                Cue(object_to_communicate=food)]:
+            self.assertFalse(hasattr(item, '__dict__'))
+
+    def test_attributes_used_by_models(self):
+        food = Food(1, (0, 0), 10)
+        with self.assertRaises(AttributeError):
+            food.agent_name
+        food.agent_name = None
+        food.phenotype = dict()
+        food.location = (5, 5)
+        food.agents[1] = 2
+        self.assertEqual(food.weight, 5)
+        self.assertEqual(food.calc_relative_weight(), 3)
+        signal = Signal(1, (0, 0), 3, object_to_communicate=food)
+        self.assertIsNone(signal.location)
+        self.assertEqual(signal.communicated_location, (5, 5))
+        with self.assertRaises(AttributeError):
+            food.color = 'red'
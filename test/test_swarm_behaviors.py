@@ -5,11 +5,10 @@ from swarms.lib.time import SimultaneousActivation
 from swarms.lib.space import Grid
 from swarms.behaviors.sbehaviors import (
     GoTo, RandomWalk, NeighbourObjects,
-    Away, Towards, DoNotMove, Move
+    Away, Towards, DoNotMove, Move, ObjectsStore
     )
-from swarms.lib.objects import Sites, Hub
+from swarms.lib.objects import Sites, Hub, Food, Signal
 import py_trees
-from py_trees import Blackboard
 import numpy as np
 
 
@@ -51,9 +50,6 @@ class SwarmAgentGoTo(Agent):
 
         root = py_trees.composites.Sequence("Sequence")
 
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
-
         self.shared_content[type(model.target).__name__] = {model.target}
 
         low = GoTo('1')
@@ -85,9 +81,6 @@ class SwarmAgentGoToAway(Agent):
 
         root = py_trees.composites.Sequence("Sequence")
 
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
-
         name = type(model.target).__name__
         self.shared_content[name] = {model.target}
 
@@ -128,13 +121,8 @@ class SwarmAgentGoToTowards(Agent):
 
         root = py_trees.composites.Sequence("Sequence")
 
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
-
         name = type(model.target).__name__
         self.shared_content[name] = {model.target}
-        # self.blackboard.shared_content[
-        # type(model.target).__name__] = [model.target]
 
         low = GoTo('1')
         low.setup(0, self, name)
@@ -184,6 +172,18 @@ class SwarmAgentRandomWalk(Agent):
         pass
 
 
+class SwarmAgentMoveTwice(SwarmAgentRandomWalk):
+    """ A random walking swarm agent which moves twice every step """
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        root = py_trees.composites.Sequence("Sequence")
+        behaviors = [RandomWalk('1'), Move('2'), Move('3')]
+        for behavior in behaviors:
+            behavior.setup(0, self)
+        root.add_children(behaviors)
+        self.behaviour_tree = py_trees.trees.BehaviourTree(root)
+
+
 # class to test random walk behavior
 class SwarmAgentSenseSite(Agent):
     """ An minimalistic behavior tree for swarm agent
@@ -254,15 +254,9 @@ class SwarmAgentSenseHubSite(Agent):
         right_selector = py_trees.composites.Selector("RSelector")
         right1_sequence = py_trees.composites.Sequence("R1Sequence")
 
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
-
         name = type(model.hub).__name__
         self.shared_content[name] = {model.hub}
 
-        # self.blackboard.shared_content[
-        # type(model.hub).__name__] = [model.hub]
-
         hub_dnm = NeighbourObjects('5')
         hub_dnm.setup(0, self, 'Hub')
 
@@ -303,7 +297,6 @@ class SwarmAgentSenseHubSite(Agent):
 
     def step(self):
         self.behaviour_tree.tick()
-        # print (self.blackboard.shared_content)
 
     def advance(self):
         pass
@@ -635,3 +628,107 @@ class TestSenseHubSiteSwarmSmallGrid(TestCase):
 
     def test_agent_path(self):
         self.assertEqual(self.environment.agent.location, (-31, -31))
+
+
+class TestPerceptionSlots(TestCase):
+
+    def setUp(self):
+        self.model = Model(123)
+        self.model.grid = Grid(100, 100, 10)
+        self.site = Sites(id=1, location=(-45, -45), radius=5)
+        self.foods = [Food(i, location=(30, 30), radius=8) for i in range(3)]
+        for item in [self.site] + self.foods:
+            self.model.grid.add_object_to_grid(item.location, item)
+        self.agents = []
+        for i, location in enumerate([(30, 30), (-45, -45)]):
+            agent = SwarmAgentNeighbour(i, self.model)
+            agent.location = location
+            sense = NeighbourObjects(str(i))
+            sense.setup(0, agent, None)
+            agent.behaviour_tree = py_trees.trees.BehaviourTree(sense)
+            self.agents.append(agent)
+
+    def test_senses_keep_other_agents_slots(self):
+        for agent in self.agents:
+            agent.behaviour_tree.tick()
+        forager, scout = self.agents
+        self.assertEqual(forager.perception.slots, {'Food': self.foods})
+        self.assertEqual(scout.perception.slots, {})
+        self.assertEqual(scout.shared_content, {'Sites': {self.site}})
+
+    def test_find_reads_the_slots(self):
+        forager, scout = self.agents
+        self.assertEqual(ObjectsStore.find(forager, 'Food'), ())
+        forager.behaviour_tree.tick()
+        self.assertIs(
+            ObjectsStore.find(forager, 'Food'),
+            forager.perception.slots['Food'])
+        scout.behaviour_tree.tick()
+        self.assertEqual(ObjectsStore.find(scout, 'Sites'), (self.site,))
+        self.assertEqual(ObjectsStore.find(scout, 'Food'), ())
+
+
+class MoveTwiceSwarmEnvironmentModel(Model):
+    """ A environemnt whose agents move twice every step """
+    def __init__(self, N, width, height, grid=10, seed=None):
+        super().__init__(seed)
+        self.grid = Grid(width, height, grid)
+        self.schedule = SimultaneousActivation(self)
+        for i in range(N):
+            a = SwarmAgentMoveTwice(i, self)
+            self.schedule.add(a)
+            a.location = (0, 0)
+            self.grid.add_object_to_grid(a.location, a)
+
+    def step(self):
+        self.schedule.step()
+
+
+class TestBatchMoves(TestCase):
+
+    def setUp(self):
+        self.environments = []
+        for batch_moves in [False, True]:
+            environment = RandomWalkSwarmEnvironmentModel(20, 40, 40, 10, 123)
+            environment.grid.batch_moves = batch_moves
+            agent = environment.agent
+            food = Food(1, location=agent.location, radius=2)
+            agent.attached_objects.append(food)
+            signal = Signal(radius=3, object_to_communicate=food)
+            agent.signals.append(signal)
+            environment.grid.add_object_to_grid(agent.location, signal)
+            self.environments.append(environment)
+
+    def test_batch_moves_match_moves(self):
+        moved, batched = self.environments
+        for _ in range(100):
+            for environment in self.environments:
+                environment.step()
+            self.assertEqual(batched.grid.moves, [])
+            for agent, other in zip(
+                    moved.schedule.agents, batched.schedule.agents):
+                self.assertEqual(agent.location, other.location)
+                self.assertEqual(agent.direction, other.direction)
+                self.assertIn(other, batched.grid.get_objects_from_grid(
+                    'SwarmAgentRandomWalk', other.location))
+            agent = batched.agent
+            self.assertEqual(
+                agent.attached_objects[0].location, agent.location)
+            self.assertEqual(
+                batched.grid.get_objects_from_grid('Signal', agent.location),
+                agent.signals)
+        self.assertNotEqual(
+            len({agent.location for agent in batched.schedule.agents}), 1)
+
+    def test_every_queued_move_is_made(self):
+        moved, batched = [
+            MoveTwiceSwarmEnvironmentModel(20, 40, 40, 10, 123)
+            for _ in range(2)]
+        batched.grid.batch_moves = True
+        for _ in range(100):
+            for environment in [moved, batched]:
+                environment.step()
+            for agent, other in zip(
+                    moved.schedule.agents, batched.schedule.agents):
+                self.assertEqual(agent.location, other.location)
+                self.assertEqual(agent.direction, other.direction)
@@ -10,7 +10,6 @@ from swarms.lib.space import Grid
 from unittest import TestCase
 from swarms.utils.bt import BTConstruct
 
-from py_trees import Blackboard
 import py_trees
 import numpy as np
 
@@ -37,9 +36,6 @@ class GEBTAgent(Agent):
         # Define a BTContruct object
         self.bt = BTConstruct(None, self)
 
-        self.blackboard = Blackboard()
-        self.blackboard.shared_content = dict()
-
         # Grammatical Evolution part
         from ponyge.algorithm.parameters import Parameters
 
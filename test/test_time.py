@@ -5,9 +5,12 @@ Test the advanced schedulers.
 from unittest import TestCase
 from unittest.mock import patch
 from swarms.lib.model import Model
-from swarms.lib.agent import Agent
+from swarms.lib.agent import Agent, BatchAgent, BatchAttribute
 from swarms.lib.time import (
-    BaseScheduler, StagedActivation, RandomActivation, SimultaneousActivation)
+    BaseScheduler, StagedActivation, RandomActivation, SimultaneousActivation,
+    DormantActivation, BatchActivation, ParallelActivation)
+from swarms.lib.space import Grid
+from swarms.lib.objects import Food
 
 RANDOM = 'random'
 STAGED = 'staged'
@@ -136,3 +139,376 @@ class TestRandomActivation(TestCase):
         model.schedule.step()
         assert model.schedule.steps == 1
         assert model.schedule.time == 1
+
+
+class RemovingAgent(Agent):
+    '''
+    Agent which removes another agent from the schedule when stepped.
+    '''
+
+    def __init__(self, name, model, target=None):
+        super().__init__(name, model)
+        self.target = target
+
+    def step(self):
+        self.model.log.append(self.name)
+        if self.target is not None:
+            self.model.schedule.remove(self.target)
+
+
+class TestAgentRegistry(TestCase):
+    '''
+    Test the agent registry of the schedulers.
+    '''
+
+    def test_remove_keeps_order(self):
+        model = MockModel(activation=None)
+        agents = [MockAgent(name, model) for name in ["C", "D", "E"]]
+        for agent in agents:
+            model.schedule.add(agent)
+        model.schedule.add(agents[0])
+        model.schedule.remove(agents[0])
+        model.schedule.remove(agents[0])
+        self.assertEqual(
+            [agent.name for agent in model.schedule.agents],
+            ["A", "B", "D", "E"])
+        self.assertEqual(model.schedule.get_agent_count(), 4)
+        model.schedule.add(agents[0])
+        self.assertEqual(model.schedule.agents[-1], agents[0])
+
+    def test_remove_during_step(self):
+        '''
+        Agents removed during a step are still stepped like with a copy of
+        the agent list, and are gone in the next step.
+        '''
+        model = MockModel(activation=None)
+        model.log = []
+        agents = [RemovingAgent(name, model) for name in ["B", "C", "D"]]
+        model.schedule.agents = [RemovingAgent("A", model, agents[1])] + agents
+        model.schedule.step()
+        self.assertEqual(model.log, ["A", "B", "C", "D"])
+        model.log = []
+        model.schedule.step()
+        self.assertEqual(model.log, ["A", "B", "D"])
+
+    def test_replacing_agents_drops_the_cached_list(self):
+        model = MockModel(activation=None)
+        model.log = []
+        model.schedule.agents = [RemovingAgent("A", model)]
+        model.schedule.step()
+        model.schedule.agents = []
+        model.schedule.step()
+        self.assertEqual(model.log, ["A"])
+
+    def test_shuffle_keeps_the_keys(self):
+        model = MockModel(activation=RANDOM)
+        agents = [MockAgent(name, model) for name in "CDEFGH"]
+        for agent in agents:
+            model.schedule.add(agent)
+        keys = dict(model.schedule.registry_keys)
+        model.schedule.step()
+        self.assertEqual(model.schedule.registry_keys, keys)
+        model.schedule.remove(agents[0])
+        model.schedule.add(agents[0])
+        self.assertNotIn(agents[0], model.schedule.agents[:-1])
+        self.assertEqual(model.schedule.agents[-1], agents[0])
+        self.assertEqual(model.schedule.get_agent_count(), 8)
+
+    def test_random_activation_matches_list_shuffle(self):
+        model = MockModel(activation=RANDOM)
+        for name in "CDEFGH":
+            model.schedule.add(MockAgent(name, model))
+        expected = list(model.schedule.agents)
+        model.random = Model(7).random
+        random = Model(7).random
+        for i in range(3):
+            random.shuffle(expected)
+            model.schedule.step()
+            self.assertEqual(model.schedule.agents, expected)
+
+
+class SleepyAgent(Agent):
+    '''
+    Agent which goes to sleep after each step.
+    '''
+
+    def __init__(self, name, model, **wake):
+        super().__init__(name, model)
+        self.wake = wake
+        self.location = (0, 0)
+        self.radius = 3
+
+    def step(self):
+        self.model.log.append(self.name)
+        self.model.schedule.sleep(self, **self.wake)
+
+
+class TestDormantActivation(TestCase):
+    '''
+    Test the scheduler with dormant agents.
+    '''
+
+    def setUp(self):
+        self.model = Model(7)
+        self.model.log = []
+        self.model.grid = Grid(20, 20, 10)
+        self.model.schedule = DormantActivation(self.model)
+        self.awake = MockAgent("A", self.model)
+        self.awake.step = lambda: self.model.log.append("A")
+        self.model.schedule.add(self.awake)
+
+    def test_wake_on_timer(self):
+        self.model.schedule.add(SleepyAgent("B", self.model, steps=3))
+        for i in range(7):
+            self.model.schedule.step()
+        self.assertEqual(self.model.log.count("B"), 3)
+        self.assertEqual(self.model.log[:4], ["A", "B", "A", "A"])
+        self.assertEqual(
+            self.model.schedule.activity,
+            [(2, 0), (1, 1), (1, 1), (2, 0), (1, 1), (1, 1), (2, 0)])
+
+    def test_wake_on_object_entering_grid(self):
+        sleepy = SleepyAgent("B", self.model, grids=[
+            self.model.grid.find_cell((0, 0))])
+        self.model.schedule.add(sleepy)
+        self.model.grid.add_object_to_grid(sleepy.location, sleepy)
+        for i in range(3):
+            self.model.schedule.step()
+        self.assertEqual(self.model.schedule.dormant_agents, 1)
+        self.model.grid.add_object_to_grid((1, 1), Food(1, (1, 1), 2))
+        self.model.schedule.step()
+        self.assertEqual(self.model.log.count("B"), 2)
+        self.assertEqual(self.model.schedule.active_agents, 2)
+        self.assertEqual(len(self.model.grid.watchers), 1)
+
+    def test_wake_on_signal(self):
+        sleepy = SleepyAgent("B", self.model, signal=True)
+        self.model.schedule.add(sleepy)
+        self.model.schedule.step()
+        self.model.schedule.signal(self.awake)
+        self.model.schedule.step()
+        self.assertEqual(self.model.log.count("B"), 1)
+        self.model.schedule.signal(sleepy)
+        self.model.schedule.step()
+        self.assertEqual(self.model.log.count("B"), 2)
+
+    def test_remove_dormant_agent(self):
+        sleepy = SleepyAgent("B", self.model, steps=1, grids=[1])
+        self.model.schedule.add(sleepy)
+        self.model.schedule.step()
+        self.model.schedule.remove(sleepy)
+        self.assertEqual(self.model.grid.watchers, {})
+        self.model.schedule.step()
+        self.model.schedule.step()
+        self.assertEqual(self.model.log, ["A", "B", "A", "A"])
+        self.assertEqual(self.model.schedule.get_agent_count(), 1)
+
+
+class BatchWalker(BatchAgent):
+    '''
+    Agent which walks one unit along x, stepped by a kernel.
+    '''
+
+    energy = BatchAttribute()
+
+    @classmethod
+    def step_batch(cls, state):
+        state['location'][:, 0] += 1
+        state['energy'][:] -= 0.5
+        state.model.log.append(len(state))
+
+
+class TestBatchActivation(TestCase):
+    '''
+    Test the scheduler with batch kernels.
+    '''
+
+    def setUp(self):
+        self.model = MockModel(activation=None)
+        self.model.log = []
+        self.model.schedule = BatchActivation(self.model)
+        self.walkers = []
+        for i in range(40):
+            walker = BatchWalker(i, self.model)
+            walker.location = (i, -i)
+            walker.energy = 10
+            self.model.schedule.add(walker)
+            self.walkers.append(walker)
+        self.model.schedule.add(MockAgent("A", self.model))
+        self.model.schedule.agents[-1].step = lambda: self.model.log.append(
+            "A")
+
+    def test_kernel_updates_attributes(self):
+        self.model.schedule.step()
+        self.model.schedule.step()
+        self.assertEqual(self.model.log, [40, "A", 40, "A"])
+        self.assertEqual(self.walkers[3].location, (5, -3))
+        self.assertEqual(self.walkers[3].energy, 9.0)
+        self.walkers[3].location = (0, 0)
+        self.assertEqual(
+            self.model.schedule.states[BatchWalker]['location'][3].tolist(),
+            [0, 0])
+
+    def test_remove_keeps_attributes(self):
+        self.model.schedule.step()
+        self.model.schedule.remove(self.walkers[0])
+        self.assertIsNone(self.walkers[0].batch_state)
+        self.assertEqual(self.walkers[0].location, (1, 0))
+        self.model.schedule.step()
+        self.assertEqual(self.walkers[0].location, (1, 0))
+        self.assertEqual(self.walkers[39].location, (41, -39))
+        self.assertEqual(self.walkers[39].energy, 9.0)
+        self.assertEqual(self.model.schedule.get_agent_count(), 40)
+        self.model.schedule.add(self.walkers[0])
+        self.model.schedule.step()
+        self.assertEqual(self.walkers[0].location, (2, 0))
+
+
+class DrawingAgent(Agent):
+    '''
+    Agent drawing a number from its random stream while staged.
+    '''
+
+    def stage(self):
+        return self.random.rand()
+
+    def merge(self, draw):
+        self.model.log.append((self.name, draw))
+
+
+class WealthAgent(Agent):
+    '''
+    Agent staging its wealth.
+    '''
+
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        self.wealth = 1
+
+    def stage(self):
+        return self.wealth
+
+    def merge(self, wealth):
+        self.model.log.append((self.name, wealth))
+
+
+class TestParallelActivation(TestCase):
+
+    def create_model(self, processes):
+        model = Model(7)
+        model.log = []
+        model.schedule = ParallelActivation(model, 2, processes)
+        for i in range(10):
+            model.schedule.add(WealthAgent(i, model))
+        return model
+
+    def test_invalidate_shows_outside_changes(self):
+        logs = []
+        for processes in [False, True]:
+            model = self.create_model(processes)
+            model.schedule.step()
+            for agent in model.schedule.agents:
+                agent.wealth = 100
+            model.schedule.invalidate()
+            model.schedule.step()
+            model.schedule.close()
+            logs.append(model.log)
+        self.assertEqual(logs[1], logs[0])
+        self.assertEqual(
+            [wealth for _, wealth in logs[1]], [1] * 10 + [100] * 10)
+
+    def test_replacing_agents_drops_replicas(self):
+        model = self.create_model(True)
+        model.schedule.step()
+        self.assertIsNotNone(model.schedule.pool)
+        model.schedule.agents = model.schedule.agents[::-1]
+        self.assertIsNone(model.schedule.pool)
+        model.schedule.step()
+        model.schedule.close()
+        self.assertEqual(
+            [name for name, _ in model.log[10:]], list(range(10))[::-1])
+
+    def test_agents_without_stage_raise(self):
+        model = Model(7)
+        model.schedule = ParallelActivation(model, 2)
+        model.schedule.add(Agent(0, model))
+        with self.assertRaisesRegex(ValueError, 'No agent has a stage'):
+            model.schedule.step()
+
+
+class TestRandomStreams(TestCase):
+
+    def create_model(self, schedule, seed=7):
+        model = Model(seed, streams=True)
+        model.log = []
+        model.schedule = schedule(model)
+        for i in range(20):
+            model.schedule.add(DrawingAgent(i, model))
+        return model
+
+    def test_streams_follow_the_seed(self):
+        first, second, other = [
+            self.create_model(BaseScheduler, seed) for seed in [7, 7, 8]]
+        draws = [
+            [agent.random.rand() for agent in model.schedule.agents]
+            for model in [first, second, other]]
+        self.assertEqual(draws[0], draws[1])
+        self.assertNotEqual(draws[0], draws[2])
+        self.assertEqual(len(set(draws[0])), 20)
+
+    def test_draws_do_not_depend_on_order(self):
+        forward = self.create_model(BaseScheduler)
+        backward = self.create_model(RandomActivation)
+        for _ in range(3):
+            forward.schedule.step()
+            backward.schedule.step()
+        for model in [forward, backward]:
+            for agent in model.schedule.agents:
+                agent.step = lambda agent=agent: agent.merge(agent.stage())
+        forward.schedule.step()
+        backward.schedule.step()
+        self.assertNotEqual(forward.log, backward.log)
+        self.assertEqual(sorted(forward.log), sorted(backward.log))
+
+    def test_draws_do_not_depend_on_workers(self):
+        logs = []
+        for workers, processes in [(1, False), (4, False), (4, True)]:
+            model = self.create_model(
+                lambda model: ParallelActivation(model, workers, processes))
+            for _ in range(3):
+                model.schedule.step()
+            model.schedule.close()
+            logs.append(model.log)
+        self.assertEqual(logs[0], logs[1])
+        self.assertEqual(logs[2], logs[0])
+
+    def test_model_stream_without_spawning(self):
+        model = MockModel(activation=RANDOM)
+        self.assertIsNone(model.schedule.stream)
+        agent = model.schedule.agents[0]
+        self.assertIsNone(agent.stream)
+        self.assertIs(agent.random, model.random)
+
+
+class TestBufferedRandom(TestCase):
+
+    def test_buffered_draws_follow_the_seed(self):
+        draws = []
+        for seed in [7, 7, 8]:
+            model = Model(seed, streams=True, buffer_size=16)
+            agent = Agent(1, model)
+            draws.append(
+                [agent.random.normal(0, .1) for _ in range(40)] +
+                [agent.random.randint(100, 200) for _ in range(40)] +
+                [agent.random.rand()])
+        self.assertEqual(draws[0], draws[1])
+        self.assertNotEqual(draws[0], draws[2])
+        self.assertTrue(all(100 <= value < 200 for value in draws[0][40:80]))
+
+    def test_buffered_draws_match_the_blocks(self):
+        model = Model(7, buffer_size=4)
+        block = Model(7).random.standard_normal(4)
+        draws = [model.random.normal(1, 2) for _ in range(4)]
+        self.assertEqual(draws, (1 + 2 * block[::-1]).tolist())
+        self.assertEqual(model.random.randint(0, 10, 3).shape, (3,))
+        self.assertEqual(model.random.normal([0, 1], 1).shape, (2,))
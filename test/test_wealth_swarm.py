@@ -1,8 +1,9 @@
 from unittest import TestCase
-from swarms.lib.agent import Agent
+from swarms.lib.agent import Agent, BatchAgent, BatchAttribute
 from swarms.lib.model import Model
-from swarms.lib.time import SimultaneousActivation
-from swarms.lib.space import Grid
+from swarms.lib.time import (
+    SimultaneousActivation, ParallelActivation, BatchActivation)
+from swarms.lib.space import Grid, AgentIndex
 
 import numpy as np
 
@@ -52,6 +53,8 @@ class SwarmAgent(Agent):
 
 class EnvironmentModel(Model):
     """ A environemnt to model swarms """
+    agent_class = SwarmAgent
+
     def __init__(self, N, width, height, grid=10, seed=None):
         if seed is None:
             super(EnvironmentModel, self).__init__(seed=None)
@@ -62,10 +65,10 @@ class EnvironmentModel(Model):
 
         self.grid = Grid(width, height, grid)
 
-        self.schedule = SimultaneousActivation(self)
+        self.schedule = self.create_schedule()
 
         for i in range(self.num_agents):
-            a = SwarmAgent(i, self)
+            a = self.agent_class(i, self)
             self.schedule.add(a)
 
             # Add the agent to a random grid cell
@@ -77,6 +80,9 @@ class EnvironmentModel(Model):
             a.location = (x, y)
             self.grid.add_object_to_grid((x, y), a)
 
+    def create_schedule(self):
+        return SimultaneousActivation(self)
+
     def step(self):
         self.schedule.step()
 
@@ -125,3 +131,246 @@ class TestWealthSwarmBigGrid(TestCase):
 
     def test_maximum_wealth_agent(self):
         self.assertEqual(self.max_agent, 9)
+
+
+class IndexedSwarmAgent(SwarmAgent):
+    """ A swarm agent which finds its cellmates with the agent index """
+    def give_money(self):
+        cellmates = self.model.agent_index.cellmates(self)
+
+        if len(cellmates) > 1:
+            other = self.model.random.choice(cellmates)
+            other.wealth += 1
+            self.wealth -= 1
+
+
+class IndexedEnvironmentModel(EnvironmentModel):
+    """ A environemnt whose agents find their cellmates with the index """
+    agent_class = IndexedSwarmAgent
+
+    def __init__(self, N, width, height, grid=10, seed=None):
+        super().__init__(N, width, height, grid, seed)
+        self.agent_index = AgentIndex(self)
+
+
+class TestWealthSwarmAgentIndex(TestCase):
+
+    def setUp(self):
+        self.environment = IndexedEnvironmentModel(100, width, height, 10, 123)
+
+    def test_cellmates_match_grid(self):
+        for i in range(50):
+            for agent in self.environment.schedule.agents:
+                self.assertEqual(
+                    set(self.environment.agent_index.cellmates(agent)),
+                    set(self.environment.grid.get_objects_from_grid(
+                        'IndexedSwarmAgent', agent.location)))
+            self.environment.step()
+
+    def test_total_wealth(self):
+        for i in range(50):
+            self.environment.step()
+        self.assertEqual(
+            sum(agent.wealth for agent in self.environment.schedule.agents),
+            100)
+
+
+class BatchMovedSwarmAgent(SwarmAgent):
+    """ A swarm agent moved by the swarm wide movement pass """
+    def advance(self):
+        pass
+
+    def give_money(self):
+        cellmates = self.model.grid.get_objects_from_grid(
+            'BatchMovedSwarmAgent', self.location)
+
+        if len(cellmates) > 1:
+            other = self.model.random.choice(cellmates)
+            other.wealth += 1
+            self.wealth -= 1
+
+
+class BatchMovedEnvironmentModel(EnvironmentModel):
+    """ A environemnt moving all its agents in one pass """
+    agent_class = BatchMovedSwarmAgent
+
+    def step(self):
+        self.schedule.step()
+        self.grid.move_objects_forward(self.schedule.agents, 2)
+
+
+class TestWealthSwarmBatchMove(TestCase):
+
+    def setUp(self):
+        self.environment = EnvironmentModel(100, width, height, 10, 123)
+        self.batched = BatchMovedEnvironmentModel(
+            100, width, height, 10, 123)
+
+    def test_moves_match_agent_moves(self):
+        for i in range(50):
+            self.environment.step()
+            self.batched.step()
+            for agent, batched in zip(
+                    self.environment.schedule.agents,
+                    self.batched.schedule.agents):
+                self.assertEqual(agent.location, batched.location)
+                self.assertEqual(agent.direction, batched.direction)
+                self.assertEqual(agent.wealth, batched.wealth)
+
+
+class ParallelSwarmAgent(SwarmAgent):
+    """ A swarm agent which stages its step for parallel activation """
+    def stage(self):
+        return [agent.name for agent in self.model.grid.get_objects_from_grid(
+            'ParallelSwarmAgent', self.location)]
+
+    def merge(self, cellmates):
+        if self.wealth > 0 and len(cellmates) > 1:
+            other = self.model.agents[self.model.random.choice(cellmates)]
+            other.wealth += 1
+            self.wealth -= 1
+
+
+class ParallelEnvironmentModel(EnvironmentModel):
+    """ A environemnt staging its agents in parallel """
+    agent_class = ParallelSwarmAgent
+
+    def __init__(
+            self, N, width, height, grid=10, seed=None, workers=2,
+            processes=False):
+        self.workers = workers
+        self.processes = processes
+        super().__init__(N, width, height, grid, seed)
+        self.agents = {
+            agent.name: agent for agent in self.schedule.agents}
+
+    def create_schedule(self):
+        return ParallelActivation(self, self.workers, self.processes)
+
+
+class TestWealthSwarmParallel(TestCase):
+
+    def setUp(self):
+        self.environment = EnvironmentModel(100, width, height, 10, 123)
+        for i in range(50):
+            self.environment.step()
+
+    def check_matches_serial(self, environment):
+        for i in range(50):
+            environment.step()
+        self.check_same_agents(environment)
+
+    def check_same_agents(self, environment):
+        environment.schedule.close()
+        for agent, parallel in zip(
+                self.environment.schedule.agents,
+                environment.schedule.agents):
+            self.assertEqual(agent.wealth, parallel.wealth)
+            self.assertEqual(agent.location, parallel.location)
+
+    def test_threads_match_serial(self):
+        for workers in [1, 2, 3, 8]:
+            self.check_matches_serial(ParallelEnvironmentModel(
+                100, width, height, 10, 123, workers))
+
+    def test_processes_match_serial(self):
+        self.check_matches_serial(ParallelEnvironmentModel(
+            100, width, height, 10, 123, processes=True))
+
+    def test_process_workers_persist(self):
+        environment = ParallelEnvironmentModel(
+            100, width, height, 10, 123, processes=True)
+        environment.step()
+        workers = [process.pid for process, _ in environment.schedule.pool]
+        for i in range(49):
+            environment.step()
+        self.assertEqual(
+            [process.pid for process, _ in environment.schedule.pool],
+            workers)
+        self.check_same_agents(environment)
+
+    def test_process_workers_follow_outside_changes(self):
+        environment = ParallelEnvironmentModel(
+            100, width, height, 10, 123, processes=True)
+        for i in range(50):
+            environment.step()
+        for model in [self.environment, environment]:
+            agent = model.schedule.agents[0]
+            model.grid.move_object(agent.location, agent, (0, 0))
+            agent.location = (0, 0)
+            for i in range(50):
+                model.step()
+        self.check_same_agents(environment)
+
+
+class BatchSwarmAgent(BatchAgent):
+    """ A swarm agent whose population is stepped by one kernel """
+    wealth = BatchAttribute((), int)
+
+    def __init__(self, name, model):
+        super().__init__(name, model)
+        self.wealth = 1
+        self.direction = model.random.rand() * (2 * np.pi)
+        self.speed = 2
+        self.radius = 3
+
+    @classmethod
+    def step_batch(cls, state):
+        model = state.model
+        # Every agent with money gives one unit to a random cellmate
+        wealth = state['wealth']
+        cells = model.grid.find_cells(state['location'])
+        order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells)
+        starts = np.cumsum(counts) - counts
+        givers = np.flatnonzero((wealth > 0) & (counts[cells] > 1))
+        picks = starts[cells[givers]] + (model.random.rand(
+            len(givers)) * counts[cells[givers]]).astype(int)
+        np.add.at(wealth, order[picks], 1)
+        wealth[givers] -= 1
+
+        directions = state['direction']
+        locations = state['location']
+        steps = np.column_stack([
+            locations[:, 0] + np.cos(directions) * 2,
+            locations[:, 1] + np.sin(directions) * 2]).astype(int)
+        new_locations, directions[:] = model.grid.check_limits_batch(
+            steps, directions)
+        state.move(new_locations.astype(int))
+
+
+class KernelEnvironmentModel(EnvironmentModel):
+    """ A environemnt stepping its agents with one kernel """
+    agent_class = BatchSwarmAgent
+
+    def create_schedule(self):
+        return BatchActivation(self)
+
+
+class TestWealthSwarmBatchKernel(TestCase):
+
+    def setUp(self):
+        self.environment = EnvironmentModel(100, width, height, 10, 123)
+        self.kernel = KernelEnvironmentModel(
+            100, width, height, 10, 123)
+
+    def test_moves_match_agent_moves(self):
+        for i in range(50):
+            self.environment.step()
+            self.kernel.step()
+            for agent, batched in zip(
+                    self.environment.schedule.agents,
+                    self.kernel.schedule.agents):
+                self.assertEqual(agent.location, batched.location)
+                self.assertEqual(agent.direction, batched.direction)
+                self.assertIn(
+                    batched, self.kernel.grid.get_objects_from_grid(
+                        'BatchSwarmAgent', batched.location))
+
+    def test_total_wealth(self):
+        for i in range(50):
+            self.kernel.step()
+        wealth = [agent.wealth for agent in self.kernel.schedule.agents]
+        self.assertEqual(sum(wealth), 100)
+        self.assertTrue(min(wealth) >= 0)
+        self.assertTrue(max(wealth) > 1)